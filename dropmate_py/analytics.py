@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import operator
+import typing as t
+from collections import abc
+from dataclasses import asdict, dataclass, fields
+from enum import Enum
+
+from dropmate_py.parser import Dropmate, Health
+
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+
+
+class StatsFormat(str, Enum):  # noqa: D101
+    CSV = "csv"
+    JSON = "json"
+
+
+@dataclass(frozen=True)
+class DeviceStats:
+    """
+    Per-device drop statistics.
+
+    The following statistics are provided:
+        * `n_drops` - Number of drop records
+        * `drops_per_week` - Drop rate over the span from the device's first to last drop start
+        time, with a minimum span of one week; `None` if the device has no drops
+        * `total_altitude_loss_ft` - Cumulative altitude loss across all drops
+        * `mean_descent_duration_sec` - Mean drop duration; `None` if the device has no drops
+        * `battery_degradations` - Number of times battery health went from good to poor between
+        consecutive drops
+        * `device_health_degradations` - Number of times device health went from good to poor
+        between consecutive drops
+    """
+
+    uid: str
+    n_drops: int
+    drops_per_week: float | None
+    total_altitude_loss_ft: int
+    mean_descent_duration_sec: float | None
+    battery_degradations: int
+    device_health_degradations: int
+
+
+STATS_HEADERS = tuple(f.name for f in fields(DeviceStats))
+
+
+@dataclass
+class _DropColumns:
+    """Flattened drop data for a fleet, with each device's drops in a contiguous slice."""
+
+    uids: list[str]
+    offsets: list[int]
+    start_times: list[float]
+    durations: list[float]
+    altitude_losses: list[int]
+    battery: list[Health]
+    device_health: list[Health]
+
+    @classmethod
+    def from_dropmates(cls, dropmates: abc.Iterable[Dropmate]) -> _DropColumns:
+        uids = []
+        offsets = [0]
+        drops = []
+        for dropmate in dropmates:
+            uids.append(dropmate.uid)
+            drops.extend(dropmate.drops)
+            offsets.append(len(drops))
+
+        # Empty logs have already had their drops cleared by Dropmate, so there are no None values
+        start_times = [ts.timestamp() for ts in map(operator.attrgetter("start_time_utc"), drops)]
+        end_times = [ts.timestamp() for ts in map(operator.attrgetter("end_time_utc"), drops)]
+        start_alts = map(operator.attrgetter("start_barometric_altitude_msl_ft"), drops)
+        end_alts = map(operator.attrgetter("end_barometric_altitude_msl_ft"), drops)
+
+        return cls(
+            uids=uids,
+            offsets=offsets,
+            start_times=start_times,
+            durations=list(map(operator.sub, end_times, start_times)),
+            altitude_losses=list(map(operator.sub, start_alts, end_alts)),
+            battery=[drop.battery for drop in drops],
+            device_health=[drop.device_health for drop in drops],
+        )
+
+
+def _prefix_sums(vals: abc.Iterable[float]) -> list[float]:
+    """Cumulative sum of the provided values, with a leading `0` so slice sums are a difference."""
+    return list(itertools.accumulate(vals, initial=0))
+
+
+def _degradations(health: abc.Sequence[Health]) -> list[bool]:
+    """
+    Flag each record whose health is poor following a record whose health is good.
+
+    The flag for record `i` describes the transition from record `i - 1`; the first record is never
+    flagged.
+    """
+    return [False, *map(_is_degradation, health, health[1:])]
+
+
+def _is_degradation(prev: Health, curr: Health) -> bool:
+    return prev is Health.GOOD and curr is Health.POOR
+
+
+def fleet_stats(dropmates: abc.Iterable[Dropmate]) -> list[DeviceStats]:
+    """
+    Calculate drop statistics for each of the provided Dropmates, see `DeviceStats`.
+
+    Drop data is flattened into columns once for the whole fleet, and each statistic is then
+    reduced per device from prefix sums over its column, rather than by looping over each device's
+    drop records.
+
+    NOTE: Drops are assumed to be sorted by flight index within each device, as provided by
+    `log_parse_pipeline` & `merge_dropmates`.
+    """
+    cols = _DropColumns.from_dropmates(dropmates)
+    duration_sums = _prefix_sums(cols.durations)
+    loss_sums = _prefix_sums(cols.altitude_losses)
+    battery_sums = _prefix_sums(_degradations(cols.battery))
+    health_sums = _prefix_sums(_degradations(cols.device_health))
+
+    stats = []
+    for uid, start, end in zip(cols.uids, cols.offsets, cols.offsets[1:], strict=False):
+        n_drops = end - start
+        if n_drops == 0:
+            stats.append(DeviceStats(uid, 0, None, 0, None, 0, 0))
+            continue
+
+        span_sec = cols.start_times[end - 1] - cols.start_times[start]
+        # Transitions are flagged on the later record, so exclude the device's first record to avoid
+        # counting a transition from the previous device
+        stats.append(
+            DeviceStats(
+                uid=uid,
+                n_drops=n_drops,
+                drops_per_week=n_drops / max(span_sec / SECONDS_PER_WEEK, 1),
+                total_altitude_loss_ft=int(loss_sums[end] - loss_sums[start]),
+                mean_descent_duration_sec=(duration_sums[end] - duration_sums[start]) / n_drops,
+                battery_degradations=int(battery_sums[end] - battery_sums[start + 1]),
+                device_health_degradations=int(health_sums[end] - health_sums[start + 1]),
+            )
+        )
+
+    return stats
+
+
+def write_stats(stats: abc.Iterable[DeviceStats], out: t.TextIO, out_format: StatsFormat) -> None:
+    """Write the provided device statistics to the provided text stream as CSV or JSON."""
+    if out_format is StatsFormat.JSON:
+        json.dump([asdict(device_stats) for device_stats in stats], out, indent=2)
+        out.write("\n")
+    else:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(STATS_HEADERS)
+        for device_stats in stats:
+            writer.writerow("" if val is None else val for val in asdict(device_stats).values())
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from collections import abc
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+
+from dropmate_py.log_io import (
+    LogSource,
+    expand_log_path,
+    iter_log_sources,
+    sequential_archive_reads,
+)
+from dropmate_py.log_utils import (
+    CONSOLIDATED_HEADERS,
+    PartitionScheme,
+    ShortenedLog,
+    _keyer,
+    _merge_shortened,
+    _shorten_mapped_log,
+    write_consolidated,
+)
+from dropmate_py.parser import (
+    DropRecord,
+    Dropmate,
+    RecordFilter,
+    _group_by_uid,
+    _parse_mapped_log,
+)
+from dropmate_py.progress import (
+    ProgressCallback,
+    ProgressCounts,
+    ProgressTracker,
+    as_tracker,
+)
+
+DEFAULT_MAX_CONCURRENT_READS = 32
+
+
+def _read_sources(sources: abc.Sequence[LogSource]) -> list[bytes]:
+    """Read the full contents of the provided logs, decompressing as necessary."""
+    log_data = []
+    with sequential_archive_reads():
+        for source in sources:
+            with source.open_binary() as f:
+                log_data.append(f.read())
+
+    return log_data
+
+
+def _parse_log_data(
+    log_data: abc.Sequence[bytes],
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    count: bool = False,
+) -> tuple[list[Dropmate], ProgressCounts]:
+    """
+    Parse the provided in-memory logs, grouping their records by device.
+
+    If `count` is `True`, the rows, records, & bytes processed are counted for progress reporting.
+    """
+    counter = ProgressTracker.counter() if count else None
+    parsed_records: list[DropRecord] = []
+    for data in log_data:
+        parsed_records.extend(
+            _parse_mapped_log(io.BytesIO(data), batch_convert, record_filter, counter)
+        )
+
+    counts = (0, 0, 0) if counter is None else counter.counts
+    return _group_by_uid(parsed_records), counts
+
+
+def _shorten_log_data(
+    data: bytes,
+    keep_headers: abc.Sequence[str],
+    record_filter: RecordFilter | None = None,
+    count: bool = False,
+) -> tuple[ShortenedLog, ProgressCounts]:
+    """
+    Shorten & deduplicate the records of the provided in-memory log, see `_shorten_mapped_log`.
+
+    If `count` is `True`, the rows, records, & bytes processed are counted for progress reporting.
+    """
+    counter = ProgressTracker.counter() if count else None
+    shortened = _shorten_mapped_log(io.BytesIO(data), keep_headers, record_filter, counter)
+
+    counts = (0, 0, 0) if counter is None else counter.counts
+    return shortened, counts
+
+
+class _LogReader:
+    """
+    Read logs concurrently, with at most `max_concurrent_reads` logs in flight at once.
+
+    A log is in flight from the start of its read until the caller is done processing its data, so
+    logs that have been read can't pile up in memory while waiting to be processed.
+
+    Reads are blocking, so they are run in a dedicated thread pool sized to the concurrency limit
+    rather than competing with parsing for the event loop's default executor.
+    """
+
+    def __init__(self, max_concurrent_reads: int) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrent_reads)
+        self._pool = ThreadPoolExecutor(max_concurrent_reads, thread_name_prefix="dropmate-read")
+
+    @asynccontextmanager
+    async def read(self, sources: abc.Sequence[LogSource]) -> abc.AsyncIterator[list[bytes]]:
+        """Read the contents of the provided logs, holding their slot until the context exits."""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            yield await loop.run_in_executor(self._pool, _read_sources, sources)
+
+    def close(self) -> None:  # noqa: D102
+        self._pool.shutdown()
+
+
+async def log_parse_pipeline_async(
+    log_filepaths: abc.Iterable[Path | LogSource],
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    max_concurrent_reads: int = DEFAULT_MAX_CONCURRENT_READS,
+    executor: Executor | None = None,
+    progress: ProgressTracker | ProgressCallback | None = None,
+) -> list[Dropmate]:
+    """
+    Parse the provided compiled Dropmate logs concurrently.
+
+    Logs are read concurrently, with at most `max_concurrent_reads` reads in flight at once, so the
+    open & read latency of each log (e.g. on a network share) is overlapped rather than paid in
+    series. Parsing is CPU-bound, so each log is handed off to `executor` once read; if not
+    provided, the event loop's default executor is used. A `ProcessPoolExecutor` may be provided
+    to parse logs in parallel.
+
+    The result is equivalent to concatenating the output of `log_parse_pipeline` for each of the
+    provided logs, in order; use `merge_dropmates` to combine devices across logs.
+
+    See `log_parse_pipeline` for a description of the remaining parameters.
+
+    NOTE: Each log is read into memory in full before it is parsed, so this is best suited to many
+    small logs. At most `max_concurrent_reads` logs are being read or parsed at once, which bounds
+    the raw log data held in memory; parsed devices are accumulated for every log.
+    """
+    loop = asyncio.get_running_loop()
+
+    def expand(log_filepath: Path | LogSource) -> list[LogSource]:
+        if isinstance(log_filepath, LogSource):
+            return [log_filepath]
+        return expand_log_path(log_filepath)
+
+    sources = await asyncio.to_thread(lambda: [expand(path) for path in log_filepaths])
+    tracker = await asyncio.to_thread(as_tracker, progress, [s for srcs in sources for s in srcs])
+    reader = _LogReader(max_concurrent_reads)
+
+    async def parse(log_sources: list[LogSource]) -> list[Dropmate]:
+        async with reader.read(log_sources) as log_data:
+            parse_data = partial(
+                _parse_log_data, log_data, batch_convert, record_filter, tracker is not None
+            )
+            dropmates, counts = await loop.run_in_executor(executor, parse_data)
+
+        if tracker is not None:
+            tracker.add(*counts)
+            for _ in log_sources:
+                tracker.finish_file()
+
+        return dropmates
+
+    try:
+        parsed = await asyncio.gather(*(parse(log_sources) for log_sources in sources))
+    finally:
+        reader.close()
+
+    if tracker is not None and tracker is not progress:
+        tracker.close()
+
+    return [dropmate for dropmates in parsed for dropmate in dropmates]
+
+
+async def consolidate_drop_records_async(
+    log_dir: Path,
+    log_pattern: str,
+    out_filepath: Path,
+    keep_headers: abc.Sequence[str] = CONSOLIDATED_HEADERS,
+    write_file: bool = True,
+    record_filter: RecordFilter | None = None,
+    partition_by: PartitionScheme | None = None,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+    max_concurrent_reads: int = DEFAULT_MAX_CONCURRENT_READS,
+    executor: Executor | None = None,
+    progress: ProgressTracker | ProgressCallback | None = None,
+    sources: abc.Sequence[LogSource] | None = None,
+) -> list[str]:
+    """
+    Consolidate a directory of Dropmate drop record outputs, reading logs concurrently.
+
+    Logs are read & shortened concurrently, see `log_parse_pipeline_async` for a description of
+    `max_concurrent_reads` and `executor`, then merged in log order so the consolidated records are
+    identical to those of `consolidate_drop_records`.
+
+    See `consolidate_drop_records` for a description of the remaining parameters.
+    """
+    loop = asyncio.get_running_loop()
+    if sources is None:
+        sources = await asyncio.to_thread(lambda: list(iter_log_sources(log_dir, log_pattern)))
+    tracker = await asyncio.to_thread(as_tracker, progress, sources)
+    reader = _LogReader(max_concurrent_reads)
+
+    async def shorten(source: LogSource) -> ShortenedLog:
+        async with reader.read([source]) as (data,):
+            shorten_data = partial(
+                _shorten_log_data, data, keep_headers, record_filter, tracker is not None
+            )
+            shortened, counts = await loop.run_in_executor(executor, shorten_data)
+
+        if tracker is not None:
+            tracker.add(*counts)
+            tracker.finish_file()
+
+        return shortened
+
+    try:
+        shortened_logs = await asyncio.gather(*(shorten(source) for source in sources))
+    finally:
+        reader.close()
+
+    if tracker is not None and tracker is not progress:
+        tracker.close()
+
+    seen_logs: set[tuple[bytes, ...]] = set()
+    consolidated_records: list[str] = []
+    for shortened in shortened_logs:
+        _merge_shortened(shortened, seen_logs, consolidated_records)
+
+    consolidated_records.sort(key=_keyer)
+    if write_file:
+        await asyncio.to_thread(
+            write_consolidated,
+            consolidated_records,
+            out_filepath,
+            keep_headers,
+            partition_by,
+            n_partitions,
+            prefix_length,
+        )
+
+    return consolidated_records
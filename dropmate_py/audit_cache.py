@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import typing as t
+from collections import abc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from dropmate_py import audit_errors
+from dropmate_py.audit_errors import AuditErrorP
+from dropmate_py.audits import _audit_device
+from dropmate_py.parser import Dropmate
+
+AUDIT_CACHE_VERSION = 2
+
+# Audit errors that can be rebuilt from a cached finding, keyed by class name
+CACHEABLE_ERRORS: dict[str, type[audit_errors.AuditErrorBase]] = {
+    err.__name__: err
+    for err in (
+        audit_errors.EmptyDropLogError,
+        audit_errors.OutdatedFirmwareError,
+        audit_errors.InternalClockDeltaError,
+        audit_errors.ClockDriftRateError,
+        audit_errors.BatteryHealthError,
+        audit_errors.DeviceHealthError,
+        audit_errors.AltitudeLossError,
+        audit_errors.TimeDeltaError,
+    )
+}
+
+
+def fingerprint_dropmate(dropmate: Dropmate) -> str:
+    """
+    Generate a fingerprint of the audited state of the provided Dropmate.
+
+    The fingerprint covers the device-level values along with each of the device's drop records &
+    scans, so any change in the device's drop set or scan history will result in a new fingerprint.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    device_state = (
+        dropmate.uid,
+        dropmate.battery.value,
+        dropmate.device_health.value,
+        dropmate.firmware_version,
+        dropmate.dropmate_internal_time_utc.isoformat(),
+        dropmate.last_scanned_time_utc.isoformat(),
+    )
+    hasher.update(repr(device_state).encode())
+
+    for drop in dropmate.drops:
+        drop_state = (
+            drop.flight_index,
+            drop.start_time_utc.isoformat() if drop.start_time_utc else None,
+            drop.end_time_utc.isoformat() if drop.end_time_utc else None,
+            drop.start_barometric_altitude_msl_ft,
+            drop.end_barometric_altitude_msl_ft,
+        )
+        hasher.update(repr(drop_state).encode())
+
+    hasher.update(repr(tuple(dropmate.scan_history)).encode())
+
+    return hasher.hexdigest()
+
+
+def _serialize_finding(err: AuditErrorP) -> dict[str, t.Any]:
+    finding: dict[str, t.Any] = {"type": type(err).__name__}
+    if isinstance(err, audit_errors.DropRecordError):
+        finding["flight_index"] = err.drop_record.flight_index
+
+    val = getattr(err, "val", None)
+    if val is not None:
+        finding["val"] = val
+
+    return finding
+
+
+def _deserialize_finding(finding: dict[str, t.Any], dropmate: Dropmate) -> AuditErrorP:
+    err_type = CACHEABLE_ERRORS[finding["type"]]
+    if issubclass(err_type, audit_errors.DropRecordError):
+        drop_record = next(d for d in dropmate.drops if d.flight_index == finding["flight_index"])
+        return err_type(dropmate, drop_record, finding["val"])
+    elif issubclass(
+        err_type, (audit_errors.InternalClockDeltaError, audit_errors.ClockDriftRateError)
+    ):
+        return err_type(dropmate, finding["val"])
+    else:
+        return err_type(dropmate)
+
+
+@dataclass
+class CachedAudit:  # noqa: D101
+    fingerprint: str
+    thresholds: list[float | None]
+    findings: list[dict[str, t.Any]]
+
+
+@dataclass
+class AuditResultStore:
+    """
+    Persisted per-device audit results, keyed by Dropmate UID.
+
+    Each device's results are stored alongside the fingerprint of its drop set and the audit
+    thresholds used, allowing audit results for unchanged devices to be reused across runs.
+    """
+
+    filepath: Path
+    devices: dict[str, CachedAudit] = field(default_factory=dict)
+    n_reused: int = 0
+    n_audited: int = 0
+
+    @classmethod
+    def load(cls, filepath: Path) -> AuditResultStore:
+        """
+        Load the audit result store from the provided filepath.
+
+        If the file does not exist, or was written by an incompatible cache version, an empty store
+        is returned.
+        """
+        store = cls(filepath)
+        if not filepath.exists():
+            return store
+
+        raw = json.loads(filepath.read_text())
+        if raw.get("version") != AUDIT_CACHE_VERSION:
+            return store
+
+        store.devices = {uid: CachedAudit(**cached) for uid, cached in raw["devices"].items()}
+        return store
+
+    def save(self) -> None:
+        """
+        Write the audit result store to disk, replacing any existing file.
+
+        The store is written to a temporary file alongside the existing file & then moved into
+        place, so an interrupted or concurrent save can't leave behind a truncated store.
+        """
+        out = {
+            "version": AUDIT_CACHE_VERSION,
+            "devices": {
+                uid: {
+                    "fingerprint": cached.fingerprint,
+                    "thresholds": cached.thresholds,
+                    "findings": cached.findings,
+                }
+                for uid, cached in self.devices.items()
+            },
+        }
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.filepath.parent, prefix=f"{self.filepath.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(out, f)
+            os.replace(tmp_name, self.filepath)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def audit(
+        self,
+        dropmate: Dropmate,
+        min_alt_loss_ft: int,
+        min_delta_to_next_sec: int,
+        min_firmware: float,
+        max_scanned_time_delta_sec: int,
+        max_drift_rate_sec_per_day: float | None = None,
+    ) -> list[AuditErrorP]:
+        """
+        Audit the provided Dropmate, reusing its cached findings if it has not changed.
+
+        Devices are only re-audited if their fingerprint or the audit thresholds have changed since
+        their cached findings were generated.
+        """
+        thresholds = [
+            min_alt_loss_ft,
+            min_delta_to_next_sec,
+            min_firmware,
+            max_scanned_time_delta_sec,
+            max_drift_rate_sec_per_day,
+        ]
+        fingerprint = fingerprint_dropmate(dropmate)
+
+        cached = self.devices.get(dropmate.uid)
+        if cached and cached.fingerprint == fingerprint and cached.thresholds == thresholds:
+            self.n_reused += 1
+            return [_deserialize_finding(finding, dropmate) for finding in cached.findings]
+
+        found_issues = _audit_device(
+            dropmate,
+            min_alt_loss_ft=min_alt_loss_ft,
+            min_delta_to_next_sec=min_delta_to_next_sec,
+            min_firmware=min_firmware,
+            max_scanned_time_delta_sec=max_scanned_time_delta_sec,
+            max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+        )
+        self.devices[dropmate.uid] = CachedAudit(
+            fingerprint=fingerprint,
+            thresholds=thresholds,
+            findings=[_serialize_finding(err) for err in found_issues],
+        )
+        self.n_audited += 1
+
+        return found_issues
+
+
+def cached_audit_pipeline(
+    consolidated_log: abc.Iterable[Dropmate],
+    cache_filepath: Path,
+    min_alt_loss_ft: int,
+    min_delta_to_next_sec: int,
+    min_firmware: float,
+    max_scanned_time_delta_sec: int,
+    max_drift_rate_sec_per_day: float | None = None,
+) -> tuple[list[AuditErrorP], AuditResultStore]:
+    """
+    Run the desired audits over all Dropmate devices, reusing persisted results where possible.
+
+    Per-device results are loaded from and saved back to `cache_filepath`; only devices whose drop
+    set or audit thresholds have changed since the previous run are re-audited. The updated result
+    store is returned alongside the found issues.
+
+    NOTE: Cached results for devices not present in `consolidated_log` are retained.
+    """
+    store = AuditResultStore.load(cache_filepath)
+
+    found_issues: list[AuditErrorP] = []
+    for dropmate in consolidated_log:
+        found_issues.extend(
+            store.audit(
+                dropmate,
+                min_alt_loss_ft=min_alt_loss_ft,
+                min_delta_to_next_sec=min_delta_to_next_sec,
+                min_firmware=min_firmware,
+                max_scanned_time_delta_sec=max_scanned_time_delta_sec,
+                max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+            )
+        )
+
+    store.save()
+    return found_issues, store
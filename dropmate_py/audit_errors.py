@@ -35,6 +35,15 @@ class InternalClockDeltaError(DropmateAuditErrorBase):
         return f"UID {self.device.uid} internal time delta from scanned time exceeds threshold: {self.val} seconds"
 
 
+class ClockDriftRateError(DropmateAuditErrorBase):
+    def __init__(self, device: Dropmate, val: float) -> None:
+        self.device = device
+        self.val = val
+
+    def __str__(self) -> str:
+        return f"UID {self.device.uid} internal clock drift rate exceeds threshold: {self.val:.1f} seconds/day"
+
+
 class BatteryHealthError(DropmateAuditErrorBase):
     def __str__(self) -> str:
         return f"UID {self.device.uid} showing poor battery health."
@@ -4,6 +4,7 @@ from dropmate_py.audit_errors import (
     AltitudeLossError,
     AuditErrorP,
     BatteryHealthError,
+    ClockDriftRateError,
     DeviceHealthError,
     EmptyDropLogError,
     InternalClockDeltaError,
@@ -64,6 +65,7 @@ def _audit_dropmate(
     dropmate: Dropmate,
     min_firmware: float,
     max_scanned_time_delta_sec: int,
+    max_drift_rate_sec_per_day: float | None = None,
 ) -> list[AuditErrorP]:
     """
     Audit for device-specific issues.
@@ -71,6 +73,8 @@ def _audit_dropmate(
     Currently included audits:
         * Firmware version
         * Delta between internal and external clocks
+        * Drift rate of the internal clock across the device's scan history, if
+        `max_drift_rate_sec_per_day` is provided
         * Battery health
         * Device health
     """
@@ -83,6 +87,12 @@ def _audit_dropmate(
     if abs(internal_timedelta.total_seconds()) > max_scanned_time_delta_sec:
         found_issues.append(InternalClockDeltaError(dropmate, internal_timedelta.total_seconds()))
 
+    # A fast drifting clock can be caught before its absolute delta exceeds the threshold
+    if max_drift_rate_sec_per_day is not None:
+        drift_rate = dropmate.scan_history.drift_rate_sec_per_day()
+        if drift_rate is not None and abs(drift_rate) > max_drift_rate_sec_per_day:
+            found_issues.append(ClockDriftRateError(dropmate, drift_rate))
+
     if dropmate.battery is Health.POOR:
         found_issues.append(BatteryHealthError(dropmate))
 
@@ -92,29 +102,56 @@ def _audit_dropmate(
     return found_issues
 
 
+def _audit_device(
+    dropmate: Dropmate,
+    min_alt_loss_ft: int,
+    min_delta_to_next_sec: int,
+    min_firmware: float,
+    max_scanned_time_delta_sec: int,
+    max_drift_rate_sec_per_day: float | None = None,
+) -> list[AuditErrorP]:
+    """Run the desired audits over the provided Dropmate device and its drop records."""
+    found_issues = _audit_dropmate(
+        dropmate,
+        min_firmware=min_firmware,
+        max_scanned_time_delta_sec=max_scanned_time_delta_sec,
+        max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+    )
+    found_issues.extend(
+        _audit_drops(
+            dropmate,
+            min_alt_loss_ft=min_alt_loss_ft,
+            min_delta_to_next_sec=min_delta_to_next_sec,
+        )
+    )
+
+    return found_issues
+
+
 def audit_pipeline(
     consolidated_log: abc.Iterable[Dropmate],
     min_alt_loss_ft: int,
     min_delta_to_next_sec: int,
     min_firmware: float,
     max_scanned_time_delta_sec: int,
+    max_drift_rate_sec_per_day: float | None = None,
 ) -> list[AuditErrorP]:
-    """Run the desired audits over all Dropmate devices and their respective drop records."""
+    """
+    Run the desired audits over all Dropmate devices and their respective drop records.
+
+    The internal clock drift rate audit is only run if `max_drift_rate_sec_per_day` is provided.
+    """
     found_issues: list[AuditErrorP] = []
 
     for dropmate in consolidated_log:
         found_issues.extend(
-            _audit_dropmate(
-                dropmate,
-                min_firmware=min_firmware,
-                max_scanned_time_delta_sec=max_scanned_time_delta_sec,
-            )
-        )
-        found_issues.extend(
-            _audit_drops(
+            _audit_device(
                 dropmate,
                 min_alt_loss_ft=min_alt_loss_ft,
                 min_delta_to_next_sec=min_delta_to_next_sec,
+                min_firmware=min_firmware,
+                max_scanned_time_delta_sec=max_scanned_time_delta_sec,
+                max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
             )
         )
 
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import lzma
+import os
+import pickle
+import tarfile
+import typing as t
+import zipfile
+import zlib
+from collections import abc
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+
+from dropmate_py.log_io import LogSource
+
+if t.TYPE_CHECKING:
+    from dropmate_py.parser import RecordFilter
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = ".checkpoint"
+REJECTS_FILENAME = "rejects.csv"
+
+# Errors raised by a malformed log line, e.g. missing columns or an unparseable value
+LINE_ERRORS = (ValueError, IndexError, KeyError)
+
+# Errors raised by a log that cannot be read in full, e.g. a truncated or corrupt archive
+CORRUPT_LOG_ERRORS = (
+    OSError,
+    EOFError,
+    UnicodeDecodeError,
+    zlib.error,
+    lzma.LZMAError,
+    zipfile.BadZipFile,
+    tarfile.TarError,
+)
+
+
+@dataclass(frozen=True)
+class RejectedLine:
+    """
+    Log line quarantined during processing.
+
+    `line_number` is the 1-indexed line number within the log, including the header line; lines
+    that could not be attributed to a single line of the log, e.g. a corrupt archive, are given a
+    line number of `0`.
+    """
+
+    source: str
+    line_number: int
+    error: str
+    line: str
+
+
+REJECT_HEADERS = tuple(f.name for f in fields(RejectedLine))
+
+
+@dataclass
+class FileResult:
+    """Checkpointed processing result of a single log, alongside any lines rejected from it."""
+
+    result: t.Any
+    rejects: list[RejectedLine]
+
+
+def _source_fingerprint(source: LogSource) -> tuple[str, str | None, int, int]:
+    """Identify the provided log by its location along with the size & modification time on disk."""
+    stat = source.path.stat()
+    return (str(source.path.resolve()), source.member, stat.st_size, stat.st_mtime_ns)
+
+
+def filter_key(record_filter: RecordFilter | None) -> tuple[t.Any, ...] | None:
+    """Build a stable description of the provided record filter for use in a checkpoint key."""
+    if not record_filter:
+        return None
+
+    uids = None if record_filter.uids is None else tuple(sorted(record_filter.uids))
+    return (uids, record_filter.since, record_filter.until)
+
+
+class WorkDir:
+    """
+    Local work directory for checkpointing bulk runs on a per-file basis.
+
+    The processing result of each log is pickled to the work directory once the log is complete,
+    keyed by the log's identity (path, archive member, size, & modification time) along with any
+    processing parameters that affect the result. If `resume` is `True` then existing checkpoints
+    are reused, so a rerun after a failure only processes the remaining logs; otherwise any
+    existing checkpoints are discarded.
+
+    Lines rejected from each log are checkpointed alongside its result, and are written to
+    `rejects.csv` in the work directory by `write_rejects`.
+    """
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            for checkpoint in self.path.glob(f"*{CHECKPOINT_SUFFIX}"):
+                checkpoint.unlink()
+
+        self.rejects: list[RejectedLine] = []
+        self.n_resumed = 0
+        self.n_processed = 0
+
+    @property
+    def rejects_filepath(self) -> Path:  # noqa: D102
+        return self.path / REJECTS_FILENAME
+
+    def _checkpoint_path(self, source: LogSource, params: abc.Hashable) -> Path:
+        key = repr((CHECKPOINT_VERSION, _source_fingerprint(source), params))
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return self.path / f"{digest}{CHECKPOINT_SUFFIX}"
+
+    def run(
+        self,
+        source: LogSource,
+        params: abc.Hashable,
+        process: abc.Callable[[list[RejectedLine]], t.Any],
+    ) -> t.Any:
+        """
+        Process the provided log, reusing its checkpointed result if available.
+
+        `process` is called with a list to collect any rejected lines, and its result is
+        checkpointed along with the rejected lines. `params` should describe any processing
+        parameters that affect the result, and must have a stable `repr`.
+        """
+        checkpoint_path = self._checkpoint_path(source, params)
+        if checkpoint_path.exists():
+            with checkpoint_path.open("rb") as f:
+                file_result: FileResult = pickle.load(f)  # noqa: S301
+
+            self.n_resumed += 1
+        else:
+            rejects: list[RejectedLine] = []
+            file_result = FileResult(process(rejects), rejects)
+
+            # Write to a temporary file first so a crash can't leave behind a partial checkpoint
+            tmp_path = checkpoint_path.with_suffix(".tmp")
+            with tmp_path.open("wb") as f:
+                pickle.dump(file_result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, checkpoint_path)
+
+            self.n_processed += 1
+
+        self.rejects.extend(file_result.rejects)
+        return file_result.result
+
+    def write_rejects(self) -> Path:
+        """Write all lines rejected so far to the work directory's reject file, overwriting it."""
+        with self.rejects_filepath.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(REJECT_HEADERS)
+            writer.writerows(astuple(reject) for reject in self.rejects)
+
+        return self.rejects_filepath
+
+
+def quarantine_lines(
+    source: LogSource,
+    rejects: list[RejectedLine],
+    prepare: abc.Callable[[str], abc.Callable[[str], None]],
+) -> bool:
+    """
+    Feed each line of the provided log to a line handler, quarantining any lines that fail.
+
+    `prepare` is called with the log's header line & returns the handler for each subsequent line.
+    Lines whose handler raises one of `LINE_ERRORS` are added to `rejects` & processing continues.
+    If the header is rejected by `prepare`, or the log cannot be read in full, the entire log is
+    rejected & `False` is returned; any results collected by the handler should then be discarded.
+    """
+    try:
+        lines = source.iter_lines()
+        header = next(lines, None)
+        if header is None:
+            return True
+
+        try:
+            handle = prepare(header)
+        except LINE_ERRORS as e:
+            rejects.append(RejectedLine(source.name, 1, repr(e), header))
+            return False
+
+        for line_number, line in enumerate(lines, start=2):
+            try:
+                handle(line)
+            except LINE_ERRORS as e:
+                rejects.append(RejectedLine(source.name, line_number, repr(e), line))
+    except CORRUPT_LOG_ERRORS as e:
+        rejects.append(RejectedLine(source.name, 0, repr(e), ""))
+        return False
+
+    return True
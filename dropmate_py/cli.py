@@ -1,4 +1,10 @@
+import asyncio
 import os
+import sys
+import typing as t
+from collections import abc
+from enum import Enum
+from functools import partial
 from pathlib import Path
 
 import click
@@ -6,14 +12,40 @@ import typer
 from dotenv import load_dotenv
 from sco1_misc.prompts import prompt_for_dir, prompt_for_file
 
+from dropmate_py.analytics import StatsFormat, fleet_stats, write_stats
+from dropmate_py.async_pipeline import consolidate_drop_records_async, log_parse_pipeline_async
+from dropmate_py.audit_cache import cached_audit_pipeline
+from dropmate_py.audit_errors import AuditErrorP
 from dropmate_py.audits import audit_pipeline
-from dropmate_py.log_utils import consolidate_drop_records
-from dropmate_py.parser import log_parse_pipeline, merge_dropmates
+from dropmate_py.checkpoint import WorkDir
+from dropmate_py.dedup import LineDeduplicator, skip_duplicate_logs
+from dropmate_py.dmcol import DMCOL_SUFFIX, DmcolFleet, write_dmcol
+from dropmate_py.log_io import (
+    LogSource,
+    STDIN_PATH,
+    expand_log_path,
+    iter_log_sources,
+    sequential_archive_reads,
+)
+from dropmate_py.log_utils import (
+    CONSOLIDATED_HEADERS,
+    FULL_CONSOLIDATED_HEADERS,
+    PartitionScheme,
+    consolidate_drop_records,
+    write_records,
+)
+from dropmate_py.parallel import consolidate_drop_records_parallel
+from dropmate_py.parser import Dropmate, RecordFilter, log_parse_pipeline, merge_dropmates
+from dropmate_py.progress import ProgressTracker, print_progress
+from dropmate_py.sampling import UidSample, estimate_error_rates, sample_uids, scan_uids
+from dropmate_py.server import FleetServer, FleetState
+from dropmate_py.sweep import sweep_thresholds
 
 MIN_ALT_LOSS = 200  # feet
 MIN_FIRMWARE = 5
 MIN_TIME_DELTA_MINUTES = 60
 MIN_DELTA_BETWEEN_MINUTES = 10
+ESTIMATE_CONFIDENCE = 0.95
 
 load_dotenv()
 start_dir = os.environ.get("PROMPT_START_DIR", ".")
@@ -22,13 +54,270 @@ PROMPT_START_DIR = Path(start_dir)
 dropmate_cli = typer.Typer(add_completion=False)
 
 
+@dropmate_cli.callback()
+def main(ctx: typer.Context, profile: bool = typer.Option(False)) -> None:
+    """Audit & consolidate Dropmate logs."""
+    if not profile:
+        return
+
+    # Profiling machinery is only imported when requested
+    from dropmate_py.cpu_profile import CommandProfiler
+
+    profiler = CommandProfiler(Path(f"dropmate_{ctx.invoked_subcommand}"))
+    # Reported on stderr so it doesn't interleave with any piped output
+    ctx.call_on_close(partial(profiler.finish, out=sys.stderr))
+    profiler.start()
+
+
+def _check_log_input(log_path: Path, dir_okay: bool = False) -> None:
+    """
+    Check that the provided log file or directory exists.
+
+    Typer's existence checks would reject `-`, which streams a single log from stdin.
+    """
+    if log_path == STDIN_PATH:
+        return
+
+    if dir_okay and not log_path.is_dir():
+        raise click.ClickException(f"Log directory '{log_path}' does not exist.")
+    if not dir_okay and not log_path.is_file():
+        raise click.ClickException(f"Log file '{log_path}' does not exist.")
+
+
+def _build_record_filter(
+    uid: list[str] | None,
+    uid_file: Path | None,
+    since: str | None,
+    until: str | None,
+) -> RecordFilter | None:
+    """Build a raw log line filter from the provided CLI filter options, if any were specified."""
+    uids = set(uid or [])
+    if uid_file is not None:
+        uids.update(line.strip() for line in uid_file.read_text().splitlines() if line.strip())
+
+    try:
+        record_filter = RecordFilter(
+            uids=uids if (uid or uid_file) else None, since=since, until=until
+        )
+    except ValueError as e:
+        raise click.ClickException(f"Invalid ISO-8601 timestamp: {e}") from None
+
+    return record_filter if record_filter else None
+
+
+def _check_sampling(sample: int | None, sample_frac: float | None) -> bool:
+    """Check whether a sampled audit was requested, allowing only one sample specification."""
+    if sample is not None and sample_frac is not None:
+        raise click.ClickException("Only one of --sample or --sample-frac may be specified.")
+
+    return sample is not None or sample_frac is not None
+
+
+def _draw_sample(
+    uids: abc.Collection[str], sample: int | None, sample_frac: float | None, seed: int
+) -> UidSample:
+    """Draw the requested sample of devices from the provided fleet UIDs."""
+    try:
+        uid_sample = sample_uids(uids, n=sample, frac=sample_frac, seed=seed)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from None
+
+    print(f"Sampled {len(uid_sample)} of {uid_sample.population} devices for audit.")
+    return uid_sample
+
+
+def _report_estimates(found_errs: list[AuditErrorP], uid_sample: UidSample | None) -> None:
+    """Print the estimated fleet-wide error rates of a sampled audit."""
+    if uid_sample is None:
+        return
+
+    estimates = estimate_error_rates(found_errs, uid_sample, ESTIMATE_CONFIDENCE)
+    print(f"\nEstimated fleet error rates ({ESTIMATE_CONFIDENCE:.0%} confidence intervals):")
+    if not estimates:
+        print("No errors found in sampled devices.")
+    for estimate in estimates:
+        print(estimate)
+
+
+def _open_work_dir(
+    work_dir: Path | None, resume: bool, concurrent: bool = False, stdin: bool = False
+) -> WorkDir | None:
+    """Open the checkpoint work directory, if one was specified."""
+    if work_dir is not None and concurrent:
+        raise click.ClickException(
+            "Checkpointing is not supported with concurrent reads or parallel workers."
+        )
+    if work_dir is not None and stdin:
+        raise click.ClickException("Checkpointing is not supported when reading from stdin.")
+
+    if work_dir is None:
+        if resume:
+            raise click.ClickException("A work directory must be specified in order to resume.")
+        return None
+
+    return WorkDir(work_dir, resume=resume)
+
+
+def _report_work_dir(work_dir: WorkDir | None, out: t.TextIO | None = None) -> None:
+    """
+    Summarize checkpoint reuse & write out any quarantined lines.
+
+    The summary is printed to `out` if provided, otherwise to stdout.
+    """
+    if work_dir is None:
+        return
+
+    print(
+        f"Resumed {work_dir.n_resumed} logs from checkpoints, processed {work_dir.n_processed}.",
+        file=out,
+    )
+    rejects_filepath = work_dir.write_rejects()
+    if work_dir.rejects:
+        print(
+            f"Quarantined {len(work_dir.rejects)} malformed lines to {rejects_filepath}", file=out
+        )
+
+
+def _find_log_files(
+    log_dir: Path, log_pattern: str, skip_duplicates: bool, out: t.TextIO | None = None
+) -> list[LogSource]:
+    """Locate the logs to process, skipping any exact duplicate log files if specified."""
+    log_files = list(iter_log_sources(log_dir, log_pattern))
+    if not skip_duplicates:
+        return log_files
+
+    log_files, duplicates = skip_duplicate_logs(log_files)
+    if duplicates:
+        print(f"Skipped {len(duplicates)} duplicate log files:", file=out)
+        for duplicate in duplicates:
+            print(f"    {duplicate}", file=out)
+
+    return log_files
+
+
+# Progress is reported on stderr so it doesn't interleave with any piped output
+report_progress = partial(print_progress, out=sys.stderr)
+
+
+def _parse_logs(
+    log_files: list[LogSource],
+    record_filter: RecordFilter | None = None,
+    progress: bool = False,
+    work_dir: WorkDir | None = None,
+    concurrent_reads: int = 0,
+    dedup_lines: bool = False,
+    out: t.TextIO | None = None,
+) -> list[Dropmate]:
+    """Parse the provided logs & merge their records into a single fleet, see `merge_dropmates`."""
+    tracker = ProgressTracker.for_sources(log_files, report_progress) if progress else None
+    compiled_logs: list[Dropmate] = []
+    skipped_lines: dict[str, int] = {}
+    if concurrent_reads:
+        compiled_logs = asyncio.run(
+            log_parse_pipeline_async(
+                log_files,
+                record_filter=record_filter,
+                max_concurrent_reads=concurrent_reads,
+                progress=tracker,
+            )
+        )
+    else:
+        line_dedup = LineDeduplicator() if dedup_lines else None
+        with sequential_archive_reads():
+            for log_source in log_files:
+                n_skipped = line_dedup.n_skipped if line_dedup is not None else 0
+                compiled_logs.extend(
+                    log_parse_pipeline(
+                        log_source,
+                        record_filter=record_filter,
+                        progress=tracker,
+                        work_dir=work_dir,
+                        line_dedup=line_dedup,
+                    )
+                )
+                if line_dedup is not None and line_dedup.n_skipped > n_skipped:
+                    skipped_lines[log_source.name] = line_dedup.n_skipped - n_skipped
+
+    if tracker is not None:
+        tracker.close()
+    _report_work_dir(work_dir, out)
+    if dedup_lines:
+        print(f"Skipped {sum(skipped_lines.values())} duplicate log lines.", file=out)
+        for log_name, n_skipped in skipped_lines.items():
+            print(f"    {log_name}: {n_skipped}", file=out)
+
+    return merge_dropmates(compiled_logs)
+
+
+def _load_fleet(
+    log_dir: Path,
+    log_pattern: str,
+    record_filter: RecordFilter | None = None,
+    skip_duplicates: bool = True,
+    progress: bool = False,
+    out: t.TextIO | None = None,
+) -> list[Dropmate]:
+    """Locate the logs matching the log pattern & parse them into a single fleet."""
+    log_files = _find_log_files(log_dir, log_pattern, skip_duplicates, out)
+    print(f"Found {len(log_files)} log files to process.", file=out)
+    return _parse_logs(log_files, record_filter=record_filter, progress=progress, out=out)
+
+
+def _audit_and_report(
+    dropmates: list[Dropmate],
+    audit_cache: Path | None,
+    min_alt_loss_ft: int,
+    min_firmware: float,
+    internal_time_delta_minutes: int,
+    time_delta_between_minutes: int,
+    max_drift_rate_sec_per_day: float | None = None,
+) -> list[AuditErrorP]:
+    """Audit the provided Dropmates & print the results, reusing cached results if specified."""
+    if audit_cache is None:
+        found_errs = audit_pipeline(
+            consolidated_log=dropmates,
+            min_alt_loss_ft=min_alt_loss_ft,
+            min_firmware=min_firmware,
+            max_scanned_time_delta_sec=internal_time_delta_minutes * 60,
+            min_delta_to_next_sec=time_delta_between_minutes * 60,
+            max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+        )
+    else:
+        found_errs, store = cached_audit_pipeline(
+            consolidated_log=dropmates,
+            cache_filepath=audit_cache,
+            min_alt_loss_ft=min_alt_loss_ft,
+            min_firmware=min_firmware,
+            max_scanned_time_delta_sec=internal_time_delta_minutes * 60,
+            min_delta_to_next_sec=time_delta_between_minutes * 60,
+            max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+        )
+        print(f"Audited {store.n_audited} changed devices, reused {store.n_reused} cached results.")
+
+    print(f"Found {len(found_errs)} errors.")
+    if found_errs:
+        for err in found_errs:
+            print(err)
+
+    return found_errs
+
+
 @dropmate_cli.command()
 def audit(
-    log_filepath: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    log_filepath: Path = typer.Option(None, file_okay=True, dir_okay=False),
     min_alt_loss_ft: int = typer.Option(default=MIN_ALT_LOSS),
     min_firmware: float = typer.Option(default=MIN_FIRMWARE),
     internal_time_delta_minutes: int = typer.Option(default=MIN_TIME_DELTA_MINUTES),
     time_delta_between_minutes: int = typer.Option(default=MIN_DELTA_BETWEEN_MINUTES),
+    max_drift_rate_sec_per_day: float = typer.Option(None, min=0),
+    audit_cache: Path = typer.Option(None, file_okay=True, dir_okay=False),
+    uid: list[str] = typer.Option(None),
+    uid_file: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    since: str = typer.Option(None),
+    until: str = typer.Option(None),
+    sample: int = typer.Option(None, min=1),
+    sample_frac: float = typer.Option(None, min=0, max=1),
+    seed: int = typer.Option(0, min=0),
 ) -> None:
     """Audit a consolidated Dropmate log."""
     if log_filepath is None:
@@ -38,35 +327,78 @@ def audit(
                 start_dir=PROMPT_START_DIR,
                 filetypes=[
                     ("Compiled Dropmate Logs", ("*.csv", ".txt")),
+                    ("Compressed Dropmate Logs", ("*.gz", "*.xz", "*.bz2", "*.zip", "*.tar")),
+                    ("Exported Dropmate Fleets", f"*{DMCOL_SUFFIX}"),
                     ("All Files", "*.*"),
                 ],
             )
         except ValueError:
             raise click.ClickException("No file selected for processing, aborting.") from None
 
-    conslidated_log = log_parse_pipeline(log_filepath)
-    found_errs = audit_pipeline(
-        consolidated_log=conslidated_log,
+    _check_log_input(log_filepath)
+    record_filter = _build_record_filter(uid, uid_file, since, until)
+    sampling = _check_sampling(sample, sample_frac)
+    if sampling and log_filepath == STDIN_PATH:
+        raise click.ClickException("Sampling is not supported when reading from stdin.")
+    uid_sample = None
+    if log_filepath.suffix == DMCOL_SUFFIX:
+        if record_filter is not None:
+            raise click.ClickException("Record filters are not supported for exported fleets.")
+
+        with DmcolFleet(log_filepath) as fleet:
+            if sampling:
+                # UIDs are read directly from the fleet's columns, so only sampled devices are built
+                fleet_uids = {fleet.uid(idx).strip().casefold(): idx for idx in range(len(fleet))}
+                uid_sample = _draw_sample(fleet_uids, sample, sample_frac, seed)
+                conslidated_log = [
+                    fleet.dropmate(idx)
+                    for fleet_uid, idx in fleet_uids.items()
+                    if fleet_uid in uid_sample.uids
+                ]
+            else:
+                conslidated_log = list(fleet)
+    else:
+        if sampling:
+            log_uids = scan_uids(expand_log_path(log_filepath), record_filter)
+            uid_sample = _draw_sample(log_uids, sample, sample_frac, seed)
+            record_filter = uid_sample.record_filter(record_filter)
+
+        conslidated_log = log_parse_pipeline(log_filepath, record_filter=record_filter)
+    found_errs = _audit_and_report(
+        conslidated_log,
+        audit_cache=audit_cache,
         min_alt_loss_ft=min_alt_loss_ft,
         min_firmware=min_firmware,
-        max_scanned_time_delta_sec=internal_time_delta_minutes * 60,
-        min_delta_to_next_sec=time_delta_between_minutes * 60,
+        internal_time_delta_minutes=internal_time_delta_minutes,
+        time_delta_between_minutes=time_delta_between_minutes,
+        max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
     )
-
-    print(f"Found {len(found_errs)} errors.")
-    if found_errs:
-        for err in found_errs:
-            print(err)
+    _report_estimates(found_errs, uid_sample)
 
 
 @dropmate_cli.command()
 def audit_bulk(
-    log_dir: Path = typer.Option(None, exists=True, file_okay=False, dir_okay=True),
+    log_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
     log_pattern: str = typer.Option("*.csv"),
     min_alt_loss_ft: int = typer.Option(default=MIN_ALT_LOSS),
     min_firmware: float = typer.Option(default=MIN_FIRMWARE),
     internal_time_delta_minutes: int = typer.Option(default=MIN_TIME_DELTA_MINUTES),
     time_delta_between_minutes: int = typer.Option(default=MIN_DELTA_BETWEEN_MINUTES),
+    max_drift_rate_sec_per_day: float = typer.Option(None, min=0),
+    audit_cache: Path = typer.Option(None, file_okay=True, dir_okay=False),
+    uid: list[str] = typer.Option(None),
+    uid_file: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    since: str = typer.Option(None),
+    until: str = typer.Option(None),
+    progress: bool = typer.Option(False),
+    work_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
+    resume: bool = typer.Option(False),
+    concurrent_reads: int = typer.Option(0, min=0),
+    sample: int = typer.Option(None, min=1),
+    sample_frac: float = typer.Option(None, min=0, max=1),
+    seed: int = typer.Option(0, min=0),
+    skip_duplicates: bool = typer.Option(True),
+    dedup_lines: bool = typer.Option(False),
 ) -> None:
     """Audit a directory of consolidated Dropmate logs."""
     if log_dir is None:
@@ -77,33 +409,255 @@ def audit_bulk(
         except ValueError:
             raise click.ClickException("No directory selected for processing, aborting.") from None
 
-    log_files = list(log_dir.glob(log_pattern))
+    _check_log_input(log_dir, dir_okay=True)
+    if dedup_lines and concurrent_reads:
+        raise click.ClickException("Line deduplication is not supported with concurrent reads.")
+    if dedup_lines and work_dir is not None:
+        raise click.ClickException("Line deduplication is not supported with checkpointing.")
+
+    checkpoints = _open_work_dir(
+        work_dir, resume, bool(concurrent_reads), stdin=log_dir == STDIN_PATH
+    )
+    log_files = _find_log_files(log_dir, log_pattern, skip_duplicates)
     print(f"Found {len(log_files)} log files to process.")
 
-    compiled_logs = log_parse_pipeline(log_files[0])
-    for log_filepath in log_files[1:]:
-        compiled_logs.extend(log_parse_pipeline(log_filepath))
+    record_filter = _build_record_filter(uid, uid_file, since, until)
+    uid_sample = None
+    if _check_sampling(sample, sample_frac):
+        if log_dir == STDIN_PATH:
+            raise click.ClickException("Sampling is not supported when reading from stdin.")
+        uid_sample = _draw_sample(scan_uids(log_files, record_filter), sample, sample_frac, seed)
+        record_filter = uid_sample.record_filter(record_filter)
 
-    compiled_logs = merge_dropmates(compiled_logs)
-    found_errs = audit_pipeline(
-        consolidated_log=compiled_logs,
+    compiled_logs = _parse_logs(
+        log_files,
+        record_filter=record_filter,
+        progress=progress,
+        work_dir=checkpoints,
+        concurrent_reads=concurrent_reads,
+        dedup_lines=dedup_lines,
+    )
+    found_errs = _audit_and_report(
+        compiled_logs,
+        audit_cache=audit_cache,
         min_alt_loss_ft=min_alt_loss_ft,
         min_firmware=min_firmware,
-        max_scanned_time_delta_sec=internal_time_delta_minutes * 60,
-        min_delta_to_next_sec=time_delta_between_minutes * 60,
+        internal_time_delta_minutes=internal_time_delta_minutes,
+        time_delta_between_minutes=time_delta_between_minutes,
+        max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
     )
+    _report_estimates(found_errs, uid_sample)
 
-    print(f"Found {len(found_errs)} errors.")
-    if found_errs:
-        for err in found_errs:
-            print(err)
+
+@dropmate_cli.command()
+def sweep(
+    log_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
+    log_pattern: str = typer.Option("*.csv"),
+    min_alt_loss_ft: list[int] = typer.Option(None),
+    min_firmware: list[float] = typer.Option(None),
+    internal_time_delta_minutes: list[int] = typer.Option(None),
+    time_delta_between_minutes: list[int] = typer.Option(None),
+    progress: bool = typer.Option(False),
+    skip_duplicates: bool = typer.Option(True),
+) -> None:
+    """Count the devices & drops flagged by each audit across a grid of thresholds."""
+    if not any(
+        (min_alt_loss_ft, min_firmware, internal_time_delta_minutes, time_delta_between_minutes)
+    ):
+        raise click.ClickException("No threshold values specified, aborting.")
+
+    if log_dir is None:
+        try:
+            log_dir = prompt_for_dir(
+                title="Select directory for batch processing", start_dir=PROMPT_START_DIR
+            )
+        except ValueError:
+            raise click.ClickException("No directory selected for processing, aborting.") from None
+
+    _check_log_input(log_dir, dir_okay=True)
+    compiled_logs = _load_fleet(
+        log_dir, log_pattern, skip_duplicates=skip_duplicates, progress=progress
+    )
+    results = sweep_thresholds(
+        compiled_logs,
+        min_alt_loss_ft=min_alt_loss_ft or (),
+        min_firmware=min_firmware or (),
+        max_scanned_time_delta_sec=[minutes * 60 for minutes in internal_time_delta_minutes or ()],
+        min_delta_to_next_sec=[minutes * 60 for minutes in time_delta_between_minutes or ()],
+    )
+
+    # Report thresholds using the same units as their CLI options
+    threshold_units = {
+        "min_alt_loss_ft": ("feet", 1),
+        "min_firmware": ("version", 1),
+        "max_scanned_time_delta_sec": ("minutes", 60),
+        "min_delta_to_next_sec": ("minutes", 60),
+    }
+    for result in results:
+        units, divisor = threshold_units[result.parameter]
+        print(f"\n{result.audit}:")
+        print(f"{units:>10} {'devices':>8} {'drops':>8}")
+        for point in result.points:
+            n_drops = "-" if point.n_drops is None else point.n_drops
+            print(f"{point.threshold / divisor:>10g} {point.n_devices:>8} {n_drops:>8}")
 
 
 @dropmate_cli.command()
-def consolidate(
+def stats(
+    log_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
+    log_pattern: str = typer.Option("*.csv"),
+    out_filepath: Path = typer.Option(None, file_okay=True, dir_okay=False),
+    out_format: StatsFormat = typer.Option(StatsFormat.CSV, "--format"),
+    uid: list[str] = typer.Option(None),
+    uid_file: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    since: str = typer.Option(None),
+    until: str = typer.Option(None),
+    progress: bool = typer.Option(False),
+    skip_duplicates: bool = typer.Option(True),
+) -> None:
+    """Summarize per-device drop statistics for a directory of Dropmate logs."""
+    if log_dir is None:
+        try:
+            log_dir = prompt_for_dir(
+                title="Select directory for batch processing", start_dir=PROMPT_START_DIR
+            )
+        except ValueError:
+            raise click.ClickException("No directory selected for processing, aborting.") from None
+
+    _check_log_input(log_dir, dir_okay=True)
+    record_filter = _build_record_filter(uid, uid_file, since, until)
+    # Statistics may be written to stdout, so report status on stderr to keep the output clean
+    status_out = sys.stderr if out_filepath is None else None
+    compiled_logs = _load_fleet(
+        log_dir,
+        log_pattern,
+        record_filter=record_filter,
+        skip_duplicates=skip_duplicates,
+        progress=progress,
+        out=status_out,
+    )
+
+    device_stats = fleet_stats(compiled_logs)
+    if out_filepath is None:
+        write_stats(device_stats, sys.stdout, out_format)
+    else:
+        with out_filepath.open("w", newline="") as f:
+            write_stats(device_stats, f, out_format)
+
+        print(f"Wrote statistics for {len(device_stats)} devices to {out_filepath}")
+
+
+class ExportFormat(str, Enum):  # noqa: D101
+    DMCOL = "dmcol"
+
+
+@dropmate_cli.command()
+def export(
+    log_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
+    log_pattern: str = typer.Option("*.csv"),
+    out_filepath: Path = typer.Option(None, file_okay=True, dir_okay=False),
+    out_format: ExportFormat = typer.Option(ExportFormat.DMCOL, "--format"),
+    uid: list[str] = typer.Option(None),
+    uid_file: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    since: str = typer.Option(None),
+    until: str = typer.Option(None),
+    progress: bool = typer.Option(False),
+    skip_duplicates: bool = typer.Option(True),
+) -> None:
+    """Export a directory of Dropmate logs as a parsed fleet for downstream tooling."""
+    if log_dir is None:
+        try:
+            log_dir = prompt_for_dir(
+                title="Select directory for batch processing", start_dir=PROMPT_START_DIR
+            )
+        except ValueError:
+            raise click.ClickException("No directory selected for processing, aborting.") from None
+
+    _check_log_input(log_dir, dir_okay=True)
+    record_filter = _build_record_filter(uid, uid_file, since, until)
+    fleet = _load_fleet(
+        log_dir,
+        log_pattern,
+        record_filter=record_filter,
+        skip_duplicates=skip_duplicates,
+        progress=progress,
+    )
+    if out_filepath is None:
+        # Fleets exported from stdin are written to the current directory
+        out_dir = Path() if log_dir == STDIN_PATH else log_dir
+        out_filepath = out_dir / f"dropmate_fleet.{out_format.value}"
+
+    write_dmcol(fleet, out_filepath)
+    print(f"Exported {len(fleet)} devices to {out_filepath}")
+
+
+@dropmate_cli.command()
+def serve(
     log_dir: Path = typer.Option(None, exists=True, file_okay=False, dir_okay=True),
+    log_pattern: str = typer.Option("*.csv"),
+    host: str = typer.Option("127.0.0.1"),
+    port: int = typer.Option(8765),
+    poll_interval: float = typer.Option(2.0, min=0),
+    min_alt_loss_ft: int = typer.Option(default=MIN_ALT_LOSS),
+    min_firmware: float = typer.Option(default=MIN_FIRMWARE),
+    internal_time_delta_minutes: int = typer.Option(default=MIN_TIME_DELTA_MINUTES),
+    time_delta_between_minutes: int = typer.Option(default=MIN_DELTA_BETWEEN_MINUTES),
+    max_drift_rate_sec_per_day: float = typer.Option(None, min=0),
+    skip_duplicates: bool = typer.Option(True),
+    verbose: bool = typer.Option(False),
+) -> None:
+    """Serve audits & queries of a directory of Dropmate logs, reloading when logs change."""
+    if log_dir is None:
+        try:
+            log_dir = prompt_for_dir(
+                title="Select directory for batch processing", start_dir=PROMPT_START_DIR
+            )
+        except ValueError:
+            raise click.ClickException("No directory selected for processing, aborting.") from None
+
+    state = FleetState(log_dir, log_pattern, skip_duplicates=skip_duplicates)
+    server = FleetServer(
+        (host, port),
+        state,
+        default_thresholds={
+            "min_alt_loss_ft": min_alt_loss_ft,
+            "min_firmware": min_firmware,
+            "max_scanned_time_delta_sec": internal_time_delta_minutes * 60,
+            "min_delta_to_next_sec": time_delta_between_minutes * 60,
+            "max_drift_rate_sec_per_day": max_drift_rate_sec_per_day,
+        },
+        poll_interval_sec=poll_interval or None,
+        verbose=verbose,
+    )
+
+    print(f"Serving {len(state.fleet)} devices on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@dropmate_cli.command()
+def consolidate(
+    log_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
     log_pattern: str = typer.Option("dropmate_records_*"),
     out_filename: str = typer.Option("consolidated_dropmate_records.csv"),
+    full: bool = typer.Option(False),
+    partition_by: PartitionScheme = typer.Option(None),
+    n_partitions: int = typer.Option(16, min=1),
+    prefix_length: int = typer.Option(8, min=1),
+    uid: list[str] = typer.Option(None),
+    uid_file: Path = typer.Option(None, exists=True, file_okay=True, dir_okay=False),
+    since: str = typer.Option(None),
+    until: str = typer.Option(None),
+    progress: bool = typer.Option(False),
+    work_dir: Path = typer.Option(None, file_okay=False, dir_okay=True),
+    resume: bool = typer.Option(False),
+    concurrent_reads: int = typer.Option(0, min=0),
+    workers: int = typer.Option(1, min=0),
+    skip_duplicates: bool = typer.Option(True),
 ) -> None:
     """Merge a directory of logs into a simplified drop record."""
     if log_dir is None:
@@ -114,15 +668,83 @@ def consolidate(
         except ValueError:
             raise click.ClickException("No directory selected for processing, aborting.") from None
 
-    log_files = list(log_dir.glob(log_pattern))
-    print(f"Found {len(log_files)} log files to consolidate.")
+    _check_log_input(log_dir, dir_okay=True)
+    from_stdin = log_dir == STDIN_PATH
+    to_stdout = out_filename == "-"
+    if concurrent_reads and workers != 1:
+        raise click.ClickException("Concurrent reads are not supported with parallel workers.")
+    if from_stdin and workers != 1:
+        raise click.ClickException("Parallel workers are not supported when reading from stdin.")
+    if to_stdout and partition_by is not None:
+        raise click.ClickException("Partitioned output can't be written to stdout.")
 
-    out_filepath = log_dir / out_filename
-    consolidated_records = consolidate_drop_records(
-        log_dir=log_dir, log_pattern=log_pattern, out_filepath=out_filepath
+    # Status messages are diverted to stderr so they don't interleave with the consolidated records
+    status_out = sys.stderr if to_stdout else None
+    checkpoints = _open_work_dir(
+        work_dir, resume, bool(concurrent_reads) or workers != 1, stdin=from_stdin
     )
+    log_files = _find_log_files(log_dir, log_pattern, skip_duplicates, status_out)
+    print(f"Found {len(log_files)} log files to consolidate.", file=status_out)
+
+    # Output from stdin is written relative to the current directory
+    out_filepath = (Path() if from_stdin else log_dir) / out_filename
+    keep_headers = FULL_CONSOLIDATED_HEADERS if full else CONSOLIDATED_HEADERS
+    record_filter = _build_record_filter(uid, uid_file, since, until)
+    if concurrent_reads:
+        consolidated_records = asyncio.run(
+            consolidate_drop_records_async(
+                log_dir=log_dir,
+                log_pattern=log_pattern,
+                sources=log_files,
+                out_filepath=out_filepath,
+                keep_headers=keep_headers,
+                write_file=not to_stdout,
+                record_filter=record_filter,
+                partition_by=partition_by,
+                n_partitions=n_partitions,
+                prefix_length=prefix_length,
+                max_concurrent_reads=concurrent_reads,
+                progress=report_progress if progress else None,
+            )
+        )
+    elif workers != 1:
+        consolidated_records = consolidate_drop_records_parallel(
+            log_dir=log_dir,
+            log_pattern=log_pattern,
+            sources=log_files,
+            out_filepath=out_filepath,
+            keep_headers=keep_headers,
+            write_file=not to_stdout,
+            record_filter=record_filter,
+            partition_by=partition_by,
+            n_partitions=n_partitions,
+            prefix_length=prefix_length,
+            # Use all available cores if no worker count is specified
+            max_workers=workers or None,
+            progress=report_progress if progress else None,
+        )
+    else:
+        consolidated_records = consolidate_drop_records(
+            log_dir=log_dir,
+            log_pattern=log_pattern,
+            sources=log_files,
+            out_filepath=out_filepath,
+            keep_headers=keep_headers,
+            write_file=not to_stdout,
+            record_filter=record_filter,
+            partition_by=partition_by,
+            n_partitions=n_partitions,
+            prefix_length=prefix_length,
+            progress=report_progress if progress else None,
+            work_dir=checkpoints,
+        )
+    _report_work_dir(checkpoints, status_out)
+
+    if to_stdout:
+        write_records(consolidated_records, sys.stdout, keep_headers)
+        sys.stdout.flush()
 
-    print(f"Identified {len(consolidated_records)} unique drop records.")
+    print(f"Identified {len(consolidated_records)} unique drop records.", file=status_out)
 
 
 if __name__ == "__main__":
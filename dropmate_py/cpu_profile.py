@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import typing as t
+from collections import abc, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from dropmate_py import audits, log_utils, parser
+
+# (filename, line number, function name), as keyed by `pstats`
+FuncKey: t.TypeAlias = tuple[str, int, str]
+
+HOT_PATH_MODULES = (parser, audits, log_utils)
+N_TOP_FUNCTIONS = 15
+
+# Stack samples are weighted in microseconds; paths contributing less time are dropped
+_STACK_RESOLUTION_SEC = 1e-6
+
+
+@dataclass(frozen=True)
+class FunctionTiming:
+    """Profiled timing of a single function, in seconds."""
+
+    module: str
+    function: str
+    lineno: int
+    n_calls: int
+    total_time: float
+    cumulative_time: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.cumulative_time:>10.3f} {self.total_time:>10.3f} {self.n_calls:>10} "
+            f"{self.module}.{self.function}:{self.lineno}"
+        )
+
+
+def top_functions(
+    stats: pstats.Stats,
+    modules: abc.Iterable[t.Any] = HOT_PATH_MODULES,
+    n: int = N_TOP_FUNCTIONS,
+) -> list[FunctionTiming]:
+    """Select the `n` functions defined in the provided modules with the most cumulative time."""
+    module_names = {str(Path(module.__file__)): module.__name__ for module in modules}
+
+    entries = stats.stats  # type: ignore[attr-defined]
+    timings = []
+    for (filename, lineno, funcname), (_, n_calls, tt, ct, _) in entries.items():
+        module_name = module_names.get(str(Path(filename)))
+        if module_name is not None:
+            timings.append(
+                FunctionTiming(
+                    module=module_name.rpartition(".")[-1],
+                    function=funcname,
+                    lineno=lineno,
+                    n_calls=n_calls,
+                    total_time=tt,
+                    cumulative_time=ct,
+                )
+            )
+
+    return sorted(timings, key=lambda timing: timing.cumulative_time, reverse=True)[:n]
+
+
+def _frame_label(func: FuncKey) -> str:
+    filename, lineno, funcname = func
+    if filename == "~":
+        # Built-in functions have no source location
+        return funcname
+
+    # Semicolons delimit frames in the collapsed stack format
+    return f"{Path(filename).name}:{lineno}({funcname})".replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> list[str]:
+    """
+    Convert the provided profile into collapsed stacks, one `frame;frame;frame weight` per line.
+
+    Deterministic profiles only record caller/callee pairs rather than full call stacks, so stacks
+    are reconstructed by walking down from each uncalled root function, splitting each function's
+    time across its callers in proportion to the cumulative time spent in the function when called
+    by each caller. Recursive calls are folded into their first occurrence in a stack.
+
+    Weights are in integer microseconds, so the output may be provided directly to flamegraph
+    tools (e.g. `flamegraph.pl`, speedscope).
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: defaultdict[FuncKey, dict[FuncKey, float]] = defaultdict(dict)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            callees[caller][func] = edge_ct
+
+    weights: defaultdict[str, float] = defaultdict(float)
+
+    def visit(func: FuncKey, stack: tuple[str, ...], path_time: float) -> None:
+        _, _, tt, ct, _ = entries[func]
+        share = min(path_time / ct, 1.0) if ct else 1.0
+        stack = (*stack, _frame_label(func))
+        weights[";".join(stack)] += tt * share
+
+        for callee, edge_ct in callees[func].items():
+            callee_time = edge_ct * share
+            if callee_time >= _STACK_RESOLUTION_SEC and _frame_label(callee) not in stack:
+                visit(callee, stack, callee_time)
+
+    for func, (_, _, _, ct, callers) in entries.items():
+        if not callers:
+            visit(func, (), ct)
+
+    return [
+        f"{stack} {round(weight / _STACK_RESOLUTION_SEC)}"
+        for stack, weight in weights.items()
+        if weight >= _STACK_RESOLUTION_SEC
+    ]
+
+
+class CommandProfiler:
+    """
+    Profile a CLI command with `cProfile`, writing the profile to disk once the command completes.
+
+    Two files are written alongside `out_stem`:
+        * `<out_stem>.pstats` - The raw profile, readable by `pstats` & tools such as `snakeviz`
+        * `<out_stem>.collapsed.txt` - Collapsed stacks for flamegraph tools, see `collapsed_stacks`
+
+    NOTE: Only the calling thread is profiled; work done by thread or process pools (i.e.
+    concurrent reads & parallel workers) is not captured.
+    """
+
+    def __init__(self, out_stem: Path) -> None:
+        self.out_stem = out_stem
+        self._profiler = cProfile.Profile()
+
+    @property
+    def pstats_filepath(self) -> Path:  # noqa: D102
+        return self.out_stem.with_name(f"{self.out_stem.name}.pstats")
+
+    @property
+    def collapsed_filepath(self) -> Path:  # noqa: D102
+        return self.out_stem.with_name(f"{self.out_stem.name}.collapsed.txt")
+
+    def start(self) -> None:
+        """Begin profiling the calling thread."""
+        self._profiler.enable()
+
+    def finish(self, out: t.TextIO | None = None) -> list[FunctionTiming]:
+        """
+        Stop profiling, write the profile to disk, & print the top hot path functions.
+
+        The top functions of the `parser`, `audits`, & `log_utils` modules by cumulative time are
+        returned.
+        """
+        self._profiler.disable()
+        stats = pstats.Stats(self._profiler)
+        stats.dump_stats(self.pstats_filepath)
+        self.collapsed_filepath.write_text("".join(f"{line}\n" for line in collapsed_stacks(stats)))
+
+        timings = top_functions(stats)
+        module_names = ", ".join(module.__name__.rpartition(".")[-1] for module in HOT_PATH_MODULES)
+        print(f"Top {len(timings)} functions in {module_names} by cumulative time:", file=out)
+        print(f"{'cumtime':>10} {'tottime':>10} {'ncalls':>10} function", file=out)
+        for timing in timings:
+            print(timing, file=out)
+        print(
+            f"Profile written to {self.pstats_filepath} & {self.collapsed_filepath}",
+            file=out,
+        )
+
+        return timings
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+from collections import abc, defaultdict
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from dropmate_py.log_io import LogSource
+
+# 128-bit digests make an accidental collision, which would silently drop a log or line, negligible
+DIGEST_SIZE = 16
+
+
+def file_fingerprint(filepath: Path) -> bytes:
+    """Hash the raw contents of the provided file, streaming it from disk."""
+    with filepath.open("rb") as f:
+        return hashlib.file_digest(f, partial(hashlib.blake2b, digest_size=DIGEST_SIZE)).digest()
+
+
+@dataclass(frozen=True)
+class DuplicateLog:
+    """A log file skipped as an exact duplicate of the previously seen `original` file."""
+
+    path: Path
+    original: Path
+
+    def __str__(self) -> str:
+        return f"{self.path} (duplicate of {self.original})"
+
+
+def skip_duplicate_logs(
+    sources: abc.Iterable[LogSource],
+) -> tuple[list[LogSource], list[DuplicateLog]]:
+    """
+    Remove the sources of any log files whose contents exactly match a previously seen file.
+
+    Files are compared by size, and only files sharing a size with another file are fingerprinted,
+    see `file_fingerprint`, so distinct logs are typically never read. The first occurrence of each
+    file, in source order, is kept. Files are compared as stored on disk, so an archive is skipped
+    in its entirety if it duplicates another archive, and compressed logs are only duplicates of
+    identically compressed logs.
+
+    The remaining sources are returned, in order, along with each skipped duplicate.
+    """
+    sources = list(sources)
+    paths = list(dict.fromkeys(source.path for source in sources if not source.is_stdin))
+
+    by_size: defaultdict[int, list[Path]] = defaultdict(list)
+    for path in paths:
+        by_size[path.stat().st_size].append(path)
+
+    originals: dict[Path, Path] = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+
+        first_seen: dict[bytes, Path] = {}
+        for path in same_size:
+            original = first_seen.setdefault(file_fingerprint(path), path)
+            if original != path:
+                originals[path] = original
+
+    kept = [source for source in sources if source.path not in originals]
+    duplicates = [DuplicateLog(path, originals[path]) for path in paths if path in originals]
+    return kept, duplicates
+
+
+class LineDeduplicator:
+    """
+    Skip raw log lines that have already been seen, across any number of logs.
+
+    Lines are tracked by their hash so that rows repeated across overlapping exports are skipped
+    before they are decoded into drop records. Lines are compared with their line endings
+    stripped, and text lines are compared by their UTF-8 encoding, so a line matches regardless of
+    whether it was read from a memory-mapped or streamed log.
+
+    `n_skipped` is the running count of duplicate lines skipped.
+
+    NOTE: Only the hash of each distinct line is retained, roughly 100 bytes per line.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[bytes] = set()
+        self.n_skipped = 0
+
+    def __call__(self, line: bytes | str) -> bool:
+        """Check whether the provided raw line is new, marking it as seen if so."""
+        if isinstance(line, str):
+            line = line.encode()
+
+        digest = hashlib.blake2b(line, digest_size=DIGEST_SIZE).digest()
+        if digest in self._seen:
+            self.n_skipped += 1
+            return False
+
+        self._seen.add(digest)
+        return True
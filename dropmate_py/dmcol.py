@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import mmap
+import struct
+import sys
+import typing as t
+from array import array
+from collections import abc
+from pathlib import Path
+
+from dropmate_py.parser import DropRecord, Dropmate, Health, ScanHistory
+
+DMCOL_SUFFIX = ".dmcol"
+DMCOL_MAGIC = b"DMCOL\x00"
+DMCOL_VERSION = 1
+
+# Magic, version, number of devices, drops, & scans, number of columns
+HEADER = struct.Struct("<6sHQQQI4x")
+# Column name, array typecode, byte offset from the start of the file, number of items
+COLUMN_ENTRY = struct.Struct("<32sc7xQQ")
+
+# Column blocks are aligned so they can be cast in place
+BLOCK_ALIGNMENT = 8
+
+# Missing integer values are stored as the minimum int64, missing timestamps as NaN
+INT_NA = -(2**63)
+
+# Health codes are only ever appended to, so previously exported fleets keep their meaning
+HEALTH_CODES = (Health.GOOD, Health.POOR, Health.UNKNOWN)
+_HEALTH_LOOKUP = {health: code for code, health in enumerate(HEALTH_CODES)}
+
+# Offset tables hold one more item than the number of devices, so device `i` spans the half-open
+# interval `[offsets[i], offsets[i + 1])` of the corresponding block
+DEVICE_COLUMNS = (
+    ("uid_offsets", "Q"),
+    ("uid_bytes", "B"),
+    ("serial_offsets", "Q"),
+    ("serial_bytes", "B"),
+    ("battery", "B"),
+    ("device_health", "B"),
+    ("firmware_version", "d"),
+    ("dropmate_internal_time_utc", "d"),
+    ("last_scanned_time_utc", "d"),
+    ("drop_offsets", "Q"),
+    ("scan_offsets", "Q"),
+)
+DROP_COLUMNS = (
+    ("drop_uid", "I"),
+    ("flight_index", "q"),
+    ("start_time_utc", "d"),
+    ("end_time_utc", "d"),
+    ("start_barometric_altitude_msl_ft", "q"),
+    ("end_barometric_altitude_msl_ft", "q"),
+    ("drop_battery", "B"),
+    ("drop_device_health", "B"),
+    ("drop_firmware_version", "d"),
+    ("drop_internal_time_utc", "d"),
+    ("drop_scanned_time_utc", "d"),
+)
+SCAN_COLUMNS = (
+    ("scanned", "d"),
+    ("internal", "d"),
+)
+DMCOL_COLUMNS = (*DEVICE_COLUMNS, *DROP_COLUMNS, *SCAN_COLUMNS)
+
+
+def _to_int(val: int | None) -> int:
+    return INT_NA if val is None else val
+
+
+def _from_int(val: int) -> int | None:
+    return None if val == INT_NA else val
+
+
+def _to_timestamp(val: dt.datetime | None) -> float:
+    return math.nan if val is None else val.timestamp()
+
+
+def _from_timestamp(val: float) -> dt.datetime | None:
+    return None if math.isnan(val) else dt.datetime.fromtimestamp(val, dt.timezone.utc)
+
+
+def _aligned(n_bytes: int) -> int:
+    return -(-n_bytes // BLOCK_ALIGNMENT) * BLOCK_ALIGNMENT
+
+
+def write_dmcol(dropmates: abc.Sequence[Dropmate], out_filepath: Path) -> None:
+    """
+    Write the provided Dropmates to a self-describing, memory-mappable, columnar binary file.
+
+    The file consists of a fixed header, followed by a table describing each column block, followed
+    by the column blocks themselves, each stored as a little-endian typed array:
+        * Device columns - UID & serial number dictionaries, health codes, firmware version, clock
+        timestamps, and per-UID offset tables into the drop & scan columns
+        * Drop columns - UID dictionary code, flight index, start & end timestamps and altitudes,
+        along with the device state reported alongside each drop
+        * Scan columns - The device's scan history, see `ScanHistory`
+
+    Timestamps are stored as POSIX timestamps, and health values as indices into `HEALTH_CODES`.
+
+    NOTE: Drop records are assumed to share the serial number of their device.
+    """
+    if len(dropmates) >= 2**32:
+        raise ValueError("Too many devices to encode UID dictionary codes.")
+
+    columns: dict[str, array[t.Any]] = {name: array(typecode) for name, typecode in DMCOL_COLUMNS}
+    uid_bytes = bytearray()
+    serial_bytes = bytearray()
+    columns["uid_offsets"].append(0)
+    columns["serial_offsets"].append(0)
+    columns["drop_offsets"].append(0)
+    columns["scan_offsets"].append(0)
+
+    for uid_code, dropmate in enumerate(dropmates):
+        uid_bytes += dropmate.uid.encode()
+        serial_bytes += dropmate.serial_number.encode()
+        columns["uid_offsets"].append(len(uid_bytes))
+        columns["serial_offsets"].append(len(serial_bytes))
+        columns["battery"].append(_HEALTH_LOOKUP[dropmate.battery])
+        columns["device_health"].append(_HEALTH_LOOKUP[dropmate.device_health])
+        columns["firmware_version"].append(dropmate.firmware_version)
+        columns["dropmate_internal_time_utc"].append(
+            dropmate.dropmate_internal_time_utc.timestamp()
+        )
+        columns["last_scanned_time_utc"].append(dropmate.last_scanned_time_utc.timestamp())
+
+        for drop in dropmate.drops:
+            columns["drop_uid"].append(uid_code)
+            columns["flight_index"].append(_to_int(drop.flight_index))
+            columns["start_time_utc"].append(_to_timestamp(drop.start_time_utc))
+            columns["end_time_utc"].append(_to_timestamp(drop.end_time_utc))
+            columns["start_barometric_altitude_msl_ft"].append(
+                _to_int(drop.start_barometric_altitude_msl_ft)
+            )
+            columns["end_barometric_altitude_msl_ft"].append(
+                _to_int(drop.end_barometric_altitude_msl_ft)
+            )
+            columns["drop_battery"].append(_HEALTH_LOOKUP[drop.battery])
+            columns["drop_device_health"].append(_HEALTH_LOOKUP[drop.device_health])
+            columns["drop_firmware_version"].append(drop.firmware_version)
+            columns["drop_internal_time_utc"].append(drop.dropmate_internal_time_utc.timestamp())
+            columns["drop_scanned_time_utc"].append(drop.last_scanned_time_utc.timestamp())
+
+        columns["scanned"].extend(dropmate.scan_history.scanned)
+        columns["internal"].extend(dropmate.scan_history.internal)
+        columns["drop_offsets"].append(len(columns["drop_uid"]))
+        columns["scan_offsets"].append(len(columns["scanned"]))
+
+    columns["uid_bytes"].frombytes(uid_bytes)
+    columns["serial_bytes"].frombytes(serial_bytes)
+    if sys.byteorder == "big":  # pragma: no cover
+        for column in columns.values():
+            column.byteswap()
+
+    offset = _aligned(HEADER.size + len(columns) * COLUMN_ENTRY.size)
+    with out_filepath.open("wb") as f:
+        f.write(
+            HEADER.pack(
+                DMCOL_MAGIC,
+                DMCOL_VERSION,
+                len(dropmates),
+                len(columns["drop_uid"]),
+                len(columns["scanned"]),
+                len(columns),
+            )
+        )
+        for name, column in columns.items():
+            f.write(COLUMN_ENTRY.pack(name.encode(), column.typecode.encode(), offset, len(column)))
+            offset += _aligned(column.itemsize * len(column))
+
+        for column in columns.values():
+            f.seek(_aligned(f.tell()))
+            column.tofile(f)
+
+        # Pad out the final block to match the size given by the column table
+        f.write(b"\x00" * (offset - f.tell()))
+
+
+class DmcolFleet:
+    """
+    Read-only, memory-mapped view of a fleet written by `write_dmcol`.
+
+    Loading only reads the header & column table; each column is exposed as a zero-copy typed
+    `memoryview` into the mapped file via `columns`, so loading is effectively constant time
+    regardless of fleet size. `Dropmate` instances are only built on access, so a fleet may be
+    provided directly to anything that iterates over Dropmates, e.g. `audit_pipeline`.
+
+    The fleet should be closed once it is no longer needed, which releases all column views; any
+    views sliced from the columns by the caller must be released beforehand.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        with filepath.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.columns = self._map_columns()
+        except (ValueError, TypeError, struct.error):
+            self._mmap.close()
+            raise
+
+    def _map_columns(self) -> dict[str, memoryview]:
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Not a dmcol file: {self.filepath}")
+
+        magic, version, n_devices, n_drops, n_scans, n_columns = HEADER.unpack_from(self._mmap)
+        if magic != DMCOL_MAGIC:
+            raise ValueError(f"Not a dmcol file: {self.filepath}")
+        if version != DMCOL_VERSION:
+            raise ValueError(f"Unsupported dmcol version: {version}")
+
+        self.n_devices: int = n_devices
+        self.n_drops: int = n_drops
+        self.n_scans: int = n_scans
+
+        entries = {}
+        for idx in range(n_columns):
+            raw_name, typecode, offset, n_items = COLUMN_ENTRY.unpack_from(
+                self._mmap, HEADER.size + idx * COLUMN_ENTRY.size
+            )
+            fmt = typecode.decode()
+            n_bytes = array(fmt).itemsize * n_items
+            if offset + n_bytes > len(self._mmap):
+                raise ValueError(f"Truncated dmcol file: {self.filepath}")
+
+            entries[raw_name.rstrip(b"\x00").decode()] = (fmt, offset, n_bytes)
+
+        missing = {name for name, _ in DMCOL_COLUMNS} - entries.keys()
+        if missing:
+            raise ValueError(f"dmcol file is missing columns: {', '.join(sorted(missing))}")
+
+        # Views are only taken once the file is validated, so the map can be closed on failure
+        buffer = memoryview(self._mmap)
+        columns = {}
+        for name, (fmt, offset, n_bytes) in entries.items():
+            view = buffer[offset : offset + n_bytes].cast(fmt)
+            if sys.byteorder == "big":  # pragma: no cover
+                swapped = array(fmt, view)
+                swapped.byteswap()
+                view = memoryview(swapped)
+
+            columns[name] = view
+
+        return columns
+
+    def __len__(self) -> int:
+        return self.n_devices
+
+    def __getitem__(self, idx: int) -> Dropmate:
+        if not 0 <= idx < self.n_devices:
+            raise IndexError(f"Device index out of range: {idx}")
+
+        return self.dropmate(idx)
+
+    def __iter__(self) -> abc.Iterator[Dropmate]:
+        return (self.dropmate(idx) for idx in range(self.n_devices))
+
+    def __enter__(self) -> DmcolFleet:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _string(self, name: str, idx: int) -> str:
+        offsets = self.columns[f"{name}_offsets"]
+        return bytes(self.columns[f"{name}_bytes"][offsets[idx] : offsets[idx + 1]]).decode()
+
+    def uid(self, idx: int) -> str:
+        """Decode the UID of the device at the provided index."""
+        return self._string("uid", idx)
+
+    def drop_range(self, idx: int) -> range:
+        """Locate the drop column indices of the device at the provided index."""
+        offsets = self.columns["drop_offsets"]
+        return range(offsets[idx], offsets[idx + 1])
+
+    def dropmate(self, idx: int) -> Dropmate:
+        """Build the `Dropmate` at the provided index, along with its drop records."""
+        c = self.columns
+        uid = sys.intern(self.uid(idx))
+        serial_number = sys.intern(self._string("serial", idx))
+
+        drops = [
+            DropRecord(
+                serial_number=serial_number,
+                uid=uid,
+                battery=HEALTH_CODES[c["drop_battery"][i]],
+                device_health=HEALTH_CODES[c["drop_device_health"][i]],
+                firmware_version=c["drop_firmware_version"][i],
+                flight_index=_from_int(c["flight_index"][i]),
+                start_time_utc=_from_timestamp(c["start_time_utc"][i]),
+                end_time_utc=_from_timestamp(c["end_time_utc"][i]),
+                start_barometric_altitude_msl_ft=_from_int(
+                    c["start_barometric_altitude_msl_ft"][i]
+                ),
+                end_barometric_altitude_msl_ft=_from_int(c["end_barometric_altitude_msl_ft"][i]),
+                dropmate_internal_time_utc=dt.datetime.fromtimestamp(
+                    c["drop_internal_time_utc"][i], dt.timezone.utc
+                ),
+                last_scanned_time_utc=dt.datetime.fromtimestamp(
+                    c["drop_scanned_time_utc"][i], dt.timezone.utc
+                ),
+            )
+            for i in self.drop_range(idx)
+        ]
+
+        scan_start, scan_end = c["scan_offsets"][idx], c["scan_offsets"][idx + 1]
+        return Dropmate(
+            uid=uid,
+            drops=drops,
+            battery=HEALTH_CODES[c["battery"][idx]],
+            device_health=HEALTH_CODES[c["device_health"][idx]],
+            firmware_version=c["firmware_version"][idx],
+            dropmate_internal_time_utc=dt.datetime.fromtimestamp(
+                c["dropmate_internal_time_utc"][idx], dt.timezone.utc
+            ),
+            last_scanned_time_utc=dt.datetime.fromtimestamp(
+                c["last_scanned_time_utc"][idx], dt.timezone.utc
+            ),
+            serial_number=serial_number,
+            scan_history=ScanHistory(
+                array("d", c["scanned"][scan_start:scan_end]),
+                array("d", c["internal"][scan_start:scan_end]),
+            ),
+        )
+
+    def close(self) -> None:
+        """Release the column views & unmap the file."""
+        for view in self.columns.values():
+            view.release()
+
+        self.columns = {}
+        self._mmap.close()
+
+
+def load_dmcol(filepath: Path) -> DmcolFleet:
+    """Memory-map the provided `.dmcol` fleet, see `DmcolFleet`."""
+    return DmcolFleet(filepath)
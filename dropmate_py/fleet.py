@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import operator
+from collections import abc, defaultdict
+
+from dropmate_py.parser import DropRecord, Dropmate, merge_dropmates
+
+
+class DropmateFleet:
+    """
+    Indexed collection of Dropmate devices.
+
+    Devices are indexed by UID & serial number, and sorted indices are built for drop start time,
+    firmware version, and last scanned time to support fast range queries.
+
+    If the provided devices contain duplicate UIDs, e.g. the concatenated output of
+    `log_parse_pipeline` for several logs, they are merged using `merge_dropmates`.
+
+    NOTE: Time-based queries assume timezone-aware datetimes, matching the parsed Dropmate logs.
+    """
+
+    def __init__(self, dropmates: abc.Iterable[Dropmate]) -> None:
+        self.dropmates = list(dropmates)
+        if len({dropmate.uid for dropmate in self.dropmates}) != len(self.dropmates):
+            self.dropmates = merge_dropmates(self.dropmates)
+
+        self._by_uid = {dropmate.uid: dropmate for dropmate in self.dropmates}
+        self._by_serial: dict[str, list[Dropmate]] = defaultdict(list)
+        for dropmate in self.dropmates:
+            self._by_serial[dropmate.serial_number].append(dropmate)
+
+        drops = sorted(
+            (
+                (drop.start_time_utc, dropmate, drop)
+                for dropmate in self.dropmates
+                for drop in dropmate.drops
+                if drop.start_time_utc is not None
+            ),
+            key=operator.itemgetter(0),
+        )
+        self._drop_start_times = [start for start, _, _ in drops]
+        self._drops = [(dropmate, drop) for _, dropmate, drop in drops]
+
+        by_firmware = sorted(self.dropmates, key=operator.attrgetter("firmware_version"))
+        self._firmware_versions = [dropmate.firmware_version for dropmate in by_firmware]
+        self._by_firmware = by_firmware
+
+        by_scanned = sorted(self.dropmates, key=operator.attrgetter("last_scanned_time_utc"))
+        self._scanned_times = [dropmate.last_scanned_time_utc for dropmate in by_scanned]
+        self._by_scanned = by_scanned
+
+    def __len__(self) -> int:
+        return len(self.dropmates)
+
+    def __iter__(self) -> abc.Iterator[Dropmate]:
+        return iter(self.dropmates)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._by_uid
+
+    def __getitem__(self, uid: str) -> Dropmate:
+        return self._by_uid[uid]
+
+    def get(self, uid: str) -> Dropmate | None:
+        """Get the Dropmate with the provided UID, or `None` if it is not present."""
+        return self._by_uid.get(uid)
+
+    def by_serial(self, serial_number: str) -> list[Dropmate]:
+        """
+        Get the Dropmate(s) with the provided serial number.
+
+        NOTE: Serial numbers are not guaranteed to be unique across devices.
+        """
+        return list(self._by_serial.get(serial_number, []))
+
+    def drops_in_window(
+        self, start: dt.datetime, end: dt.datetime
+    ) -> list[tuple[Dropmate, DropRecord]]:
+        """
+        Get all drops, along with their device, whose start time is in the provided window.
+
+        The window includes `start` and excludes `end`. Drops are returned sorted by start time.
+        """
+        lo = bisect.bisect_left(self._drop_start_times, start)
+        hi = bisect.bisect_left(self._drop_start_times, end, lo=lo)
+        return self._drops[lo:hi]
+
+    def scanned_before(self, when: dt.datetime) -> list[Dropmate]:
+        """Get all devices last scanned before the provided time, sorted by last scanned time."""
+        return self._by_scanned[: bisect.bisect_left(self._scanned_times, when)]
+
+    def scanned_since(self, when: dt.datetime) -> list[Dropmate]:
+        """Get all devices last scanned at or after the provided time, sorted by scanned time."""
+        return self._by_scanned[bisect.bisect_left(self._scanned_times, when) :]
+
+    def below_firmware(self, firmware_version: float) -> list[Dropmate]:
+        """Get all devices with firmware below the provided version, sorted by firmware version."""
+        return self._by_firmware[: bisect.bisect_left(self._firmware_versions, firmware_version)]
+
+    def at_or_above_firmware(self, firmware_version: float) -> list[Dropmate]:
+        """Get all devices with firmware at or above the provided version, sorted by version."""
+        return self._by_firmware[bisect.bisect_left(self._firmware_versions, firmware_version) :]
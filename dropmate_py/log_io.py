@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import bz2
+import fnmatch
+import gzip
+import io
+import lzma
+import mmap
+import operator
+import sys
+import tarfile
+import typing as t
+import zipfile
+from collections import abc
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+# Log inputs given as `-` are streamed from stdin
+STDIN_PATH = Path("-")
+
+# Single-file stream compression, keyed by file suffix
+COMPRESSION_OPENERS: dict[str, abc.Callable[[t.IO[bytes]], t.IO[bytes]]] = {
+    ".gz": lambda f: t.cast(t.IO[bytes], gzip.GzipFile(fileobj=f)),
+    ".xz": lambda f: t.cast(t.IO[bytes], lzma.LZMAFile(f)),
+    ".bz2": lambda f: t.cast(t.IO[bytes], bz2.BZ2File(f)),
+}
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.xz", ".txz", ".tar.bz2", ".tbz2")
+
+
+def _has_suffix(name: str, suffixes: abc.Iterable[str]) -> bool:
+    lowered = name.lower()
+    return any(lowered.endswith(s) for s in suffixes)
+
+
+def is_archive(name: str) -> bool:
+    """Check whether the provided filename corresponds to a supported zip or tar archive."""
+    return _has_suffix(name, ZIP_SUFFIXES) or _has_suffix(name, TAR_SUFFIXES)
+
+
+def strip_compression_suffix(name: str) -> str:
+    """Remove a trailing stream compression suffix (e.g. `.gz`), if present."""
+    for suffix in COMPRESSION_OPENERS:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+
+    return name
+
+
+def _member_matches(member_name: str, pattern: str) -> bool:
+    """
+    Check if the provided archive member matches the filename portion of the glob pattern.
+
+    Members are matched both with and without any stream compression suffix, so e.g. a
+    `dropmate_records_1.csv.gz` member is matched by a `*.csv` pattern.
+    """
+    name = PurePosixPath(member_name).name
+    name_pattern = PurePosixPath(pattern).name
+    return fnmatch.fnmatch(name, name_pattern) or fnmatch.fnmatch(
+        strip_compression_suffix(name), name_pattern
+    )
+
+
+def _decompress(raw: t.IO[bytes], name: str) -> t.IO[bytes]:
+    for suffix, opener in COMPRESSION_OPENERS.items():
+        if name.lower().endswith(suffix):
+            return opener(raw)
+
+    return raw
+
+
+class _StreamedMember(io.RawIOBase):
+    """Tar members extracted from a stream can't report whether they're seekable, so wrap them."""
+
+    def __init__(self, f: t.IO[bytes]) -> None:
+        self._f = f
+
+    def readable(self) -> bool:  # noqa: D102
+        return True
+
+    def readinto(self, buffer: t.Any) -> int:  # noqa: D102
+        data = self._f.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class _TarStream:
+    """
+    Forward-only pass over the members of a tar archive.
+
+    Compressed tar archives can only be read sequentially, so extracting each member independently
+    decompresses the archive up to that member once per member. Members read in archive order
+    instead share a single decompression pass, see `sequential_archive_reads`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.signature = _file_signature(path)
+        self._tar = tarfile.open(path, mode="r|*")
+        self._current = self._tar.next()
+        self._extracted = False
+
+    def extract(self, member: str) -> t.IO[bytes] | None:
+        """Advance to the provided member, or return `None` if it isn't ahead of the stream."""
+        while self._current is not None:
+            if not self._extracted and self._current.isfile() and self._current.name == member:
+                extracted = self._tar.extractfile(self._current)
+                if extracted is not None:
+                    self._extracted = True
+                    return t.cast(t.IO[bytes], io.BufferedReader(_StreamedMember(extracted)))
+
+            self._current = self._tar.next()
+            self._extracted = False
+
+        return None
+
+    def close(self) -> None:  # noqa: D102
+        self._tar.close()
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Open tar streams, keyed by archive path, if sequential archive reads are active
+_tar_streams: ContextVar[dict[Path, _TarStream] | None] = ContextVar("_tar_streams", default=None)
+
+
+@contextmanager
+def sequential_archive_reads() -> abc.Iterator[None]:
+    """
+    Share a single pass over each tar archive between the members opened within the context.
+
+    Members opened in archive order, as yielded by `iter_archive_members`, continue from the member
+    previously read rather than decompressing the archive from its start. Any archive modified since
+    its pass began is read from its start again. All open passes are closed when the context exits.
+
+    Outside of this context each tar member is read using its own pass over the archive.
+
+    NOTE: Passes are tracked using a context variable, so members read by threads that don't share
+    the caller's context (e.g. a thread pool's workers) use their own passes.
+    """
+    if _tar_streams.get() is not None:
+        # Nested contexts share the outermost context's passes
+        yield
+        return
+
+    streams: dict[Path, _TarStream] = {}
+    token = _tar_streams.set(streams)
+    try:
+        yield
+    finally:
+        _tar_streams.reset(token)
+        for stream in streams.values():
+            stream.close()
+
+
+@contextmanager
+def _open_tar_member(path: Path, member: str) -> abc.Iterator[t.IO[bytes]]:
+    streams = _tar_streams.get()
+
+    # Streams are checked out while a member is being read so a member opened in the meantime
+    # doesn't move the stream out from under it
+    stream = streams.pop(path, None) if streams is not None else None
+    if stream is not None and stream.signature != _file_signature(path):
+        # The archive was modified since its pass began, so the stream's data is stale
+        stream.close()
+        stream = None
+
+    extracted = stream.extract(member) if stream is not None else None
+    if stream is None or extracted is None:
+        if stream is not None:
+            stream.close()
+
+        # The member was behind the stream, or no stream was open, so start a new pass
+        stream = _TarStream(path)
+        extracted = stream.extract(member)
+        if extracted is None:
+            stream.close()
+            raise KeyError(f"Archive member not found: {path}!{member}")
+
+    try:
+        yield extracted
+    except BaseException:
+        stream.close()
+        raise
+
+    if streams is None:
+        stream.close()
+        return
+
+    # Keep the stream positioned after this member so the next member can continue the pass
+    replaced = streams.pop(path, None)
+    if replaced is not None:
+        replaced.close()
+    streams[path] = stream
+
+
+@dataclass(frozen=True)
+class LogSource:
+    """
+    Represent a single Dropmate log.
+
+    Logs may be a plain file, a stream-compressed file, or a member of a zip or tar archive. `path`
+    is the file on disk; `member` is the name of the log inside of the archive at `path`, or
+    `None` if `path` is itself the log.
+
+    A `path` of `-` (see `STDIN_PATH`) represents an uncompressed log streamed from stdin.
+    """
+
+    path: Path
+    member: str | None = None
+
+    @property
+    def name(self) -> str:
+        """Human-readable log identifier, archive members are given as `<archive>!<member>`."""
+        if self.is_stdin:
+            return "<stdin>"
+        if self.member is None:
+            return str(self.path)
+
+        return f"{self.path}!{self.member}"
+
+    @property
+    def is_stdin(self) -> bool:
+        """Check whether the log is streamed from stdin."""
+        return self.member is None and self.path == STDIN_PATH
+
+    @property
+    def is_compressed(self) -> bool:
+        """Check whether the log data must be decompressed or extracted before being read."""
+        return self.member is not None or strip_compression_suffix(self.path.name) != self.path.name
+
+    @contextmanager
+    def open_binary(self) -> abc.Iterator[t.IO[bytes]]:
+        """
+        Open a binary stream of the log data, transparently decompressing as necessary.
+
+        Tar archive members opened in archive order within `sequential_archive_reads` share a single
+        pass over the archive.
+        """
+        if self.is_stdin:
+            # stdin is owned by the interpreter, so it is left open
+            yield sys.stdin.buffer
+            return
+
+        with ExitStack() as stack:
+            if self.member is None:
+                raw: t.IO[bytes] = stack.enter_context(self.path.open("rb"))
+            elif _has_suffix(self.path.name, ZIP_SUFFIXES):
+                archive = stack.enter_context(zipfile.ZipFile(self.path))
+                raw = stack.enter_context(archive.open(self.member))
+            else:
+                raw = stack.enter_context(_open_tar_member(self.path, self.member))
+
+            yield stack.enter_context(_decompress(raw, self.member or self.path.name))
+
+    @contextmanager
+    def open(self) -> abc.Iterator[t.TextIO]:
+        """Open a text stream of the log data, transparently decompressing as necessary."""
+        with self.open_binary() as raw:
+            f = io.TextIOWrapper(raw)
+            try:
+                yield f
+            finally:
+                # Closing the wrapper would also close stdin, so it is detached instead
+                if self.is_stdin:
+                    f.detach()
+                else:
+                    f.close()
+
+    def iter_lines(self) -> abc.Iterator[str]:
+        """Stream the lines of the log, with line endings stripped."""
+        with self.open() as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+
+    @contextmanager
+    def open_mapped(self) -> abc.Iterator[mmap.mmap | None]:
+        """
+        Memory-map the log data for zero-copy access, see `iter_columns`.
+
+        Compressed logs, stdin, and empty files cannot be mapped, so `None` is yielded instead;
+        callers should fall back to `iter_lines`.
+        """
+        if self.is_compressed or self.is_stdin:
+            yield None
+            return
+
+        with self.path.open("rb") as f:
+            if self.path.stat().st_size == 0:
+                yield None
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+
+def iter_columns(
+    buffer: mmap.mmap | abc.Iterable[bytes],
+    columns: abc.Sequence[int],
+    line_filter: abc.Callable[[bytes], bool] | None = None,
+) -> abc.Iterator[tuple[bytes, ...]]:
+    """
+    Yield the selected raw columns of each remaining line of the memory-mapped log.
+
+    Lines are read directly from the mapping and are only split as far as the last selected column;
+    no data is decoded, so callers only pay to decode the fields they actually use. Selected
+    columns are yielded in the order of `columns`.
+
+    If provided, `line_filter` is applied to each raw line, with line endings stripped, before it is
+    split.
+
+    Lines may also be provided as an iterable of raw lines read from a mapping, e.g. to count them
+    as they are consumed.
+
+    NOTE: Reading starts from the current position of `buffer`, so the header line is expected to
+    have already been consumed.
+    """
+    max_split = max(columns) + 1
+    picker = operator.itemgetter(*columns)
+    # itemgetter returns a bare value rather than a tuple when only selecting one item
+    single_column = len(columns) == 1
+
+    lines = iter(buffer.readline, b"") if isinstance(buffer, mmap.mmap) else buffer
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if line_filter is not None and not line_filter(line):
+            continue
+
+        picked = picker(line.split(b",", max_split))
+        yield (picked,) if single_column else picked
+
+
+def iter_archive_members(archive_path: Path, pattern: str = "*") -> abc.Iterator[LogSource]:
+    """Yield a `LogSource` for each regular file in the archive matching the provided pattern."""
+    if _has_suffix(archive_path.name, ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [m.filename for m in archive.infolist() if not m.is_dir()]
+    else:
+        with tarfile.open(archive_path, mode="r:*") as tar:
+            members = [m.name for m in tar.getmembers() if m.isfile()]
+
+    for member in members:
+        if _member_matches(member, pattern):
+            yield LogSource(archive_path, member)
+
+
+def expand_log_path(log_filepath: Path) -> list[LogSource]:
+    """Expand the provided log filepath into its log sources, including all archive members."""
+    if log_filepath != STDIN_PATH and is_archive(log_filepath.name):
+        return list(iter_archive_members(log_filepath))
+
+    return [LogSource(log_filepath)]
+
+
+def iter_log_sources(log_dir: Path, log_pattern: str) -> abc.Iterator[LogSource]:
+    """
+    Yield all Dropmate logs in the provided directory matching the provided glob pattern.
+
+    In addition to plain files, the following are supported:
+        * Stream-compressed logs (`.gz`, `.xz`, `.bz2`) are matched with or without their
+        compression suffix, e.g. `*.csv` will match `log.csv.gz`
+        * Zip & tar archives matched directly by the pattern yield all of their members
+        * Zip & tar archives that are not matched directly yield any of their members whose
+        filenames match the filename portion of the pattern
+
+    If `log_dir` is `-` (see `STDIN_PATH`), stdin is yielded as the only log & `log_pattern` is
+    ignored.
+
+    NOTE: Archives are searched for using the same directory portion of `log_pattern`, so e.g.
+    `**/*.csv` will search all nested archives.
+    """
+    if log_dir == STDIN_PATH:
+        yield LogSource(STDIN_PATH)
+        return
+
+    seen: set[Path] = set()
+    for suffix in ("", *COMPRESSION_OPENERS):
+        for log_filepath in log_dir.glob(f"{log_pattern}{suffix}"):
+            if log_filepath in seen or not log_filepath.is_file():
+                continue
+
+            seen.add(log_filepath)
+            yield from expand_log_path(log_filepath)
+
+    archive_dir = PurePosixPath(log_pattern).parent
+    for archive_suffix in (*ZIP_SUFFIXES, *TAR_SUFFIXES):
+        for archive_path in log_dir.glob(str(archive_dir / f"*{archive_suffix}")):
+            if archive_path in seen or not archive_path.is_file():
+                continue
+
+            seen.add(archive_path)
+            yield from iter_archive_members(archive_path, log_pattern)
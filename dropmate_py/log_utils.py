@@ -1,7 +1,34 @@
-from collections import abc
+from __future__ import annotations
+
+import io
+import json
+import mmap
+import typing as t
+import zlib
+from collections import abc, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from enum import Enum
+from functools import partial
 from pathlib import Path
 
-from dropmate_py.parser import ColumnIndices, FauxSeries
+from dropmate_py.checkpoint import (
+    CORRUPT_LOG_ERRORS,
+    LINE_ERRORS,
+    RejectedLine,
+    WorkDir,
+    filter_key,
+    quarantine_lines,
+)
+from dropmate_py.log_io import (
+    LogSource,
+    iter_columns,
+    iter_log_sources,
+    sequential_archive_reads,
+)
+from dropmate_py.parser import DROP_RECORD_COLUMNS, RecordFilter, _line_filter
+from dropmate_py.progress import ProgressCallback, ProgressTracker, as_tracker
+from dropmate_py.schema import CompiledSchema, RowPlan, compile_schema
 
 CONSOLIDATED_HEADERS = (
     "uid",
@@ -12,16 +39,388 @@ CONSOLIDATED_HEADERS = (
     "end_barometric_altitude_msl_ft",
 )
 
+# All columns required to build a drop record, so fully consolidated logs may be audited directly;
+# the UID & flight index are kept as the leading columns, see `_keyer`
+FULL_CONSOLIDATED_HEADERS = (
+    "uid",
+    "flight_index",
+    *(col for col in DROP_RECORD_COLUMNS if col not in {"uid", "flight_index"}),
+)
+
 
-def _keyer(short_record: str) -> tuple[str, int]:  # pragma: no cover
+def _keyer(short_record: str) -> tuple[str, int]:
     """
     Sorting key based on consolidated drop record.
 
+    Dropmates without any drop records have an `na` flight index, which is sorted ahead of any
+    drops.
+
     NOTE: It is assumed that the first column is the Dropmate UID and second column is the flight
     index.
     """
-    split_record = short_record.split(",")
-    return (split_record[0], int(split_record[1]))
+    uid, flight_index, *_ = short_record.split(",", 2)
+    return (uid, -1 if flight_index == "na" else int(flight_index))
+
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def _bare_filename(filename: str) -> str:
+    """Check that the provided filename can't resolve outside of the directory it's joined to."""
+    if filename in {"", ".", ".."} or Path(filename).name != filename:
+        raise ValueError(f"Expected a bare filename, received: '{filename}'")
+
+    return filename
+
+
+class PartitionScheme(str, Enum):  # noqa: D101
+    UID_HASH = "uid-hash"
+    UID_PREFIX = "uid-prefix"
+    DATE = "date"
+
+
+@dataclass(frozen=True)
+class PartitionManifest:
+    """
+    Summary of a single consolidated record partition.
+
+    Key ranges are inclusive, and the start time range is `None` if the partition contains no drops.
+    """
+
+    partition: str
+    filename: str
+    n_rows: int
+    min_uid: str
+    max_uid: str
+    min_start_time_utc: str | None
+    max_start_time_utc: str | None
+
+    @classmethod
+    def from_file(cls, manifest_filepath: Path) -> PartitionManifest:
+        """Load a partition manifest from the provided JSON file."""
+        return cls(**json.loads(manifest_filepath.read_text()))
+
+    def data_filepath(self, partition_dir: Path) -> Path:
+        """
+        Resolve the partition's CSV file within the provided partition directory.
+
+        Manifests are read from disk, so a filename that could resolve outside of `partition_dir`
+        (e.g. `../records.csv`) raises a `ValueError`.
+        """
+        return partition_dir / _bare_filename(self.filename)
+
+    def may_contain(self, record_filter: RecordFilter) -> bool:
+        """Check whether the partition may contain any records matching the provided filter."""
+        if record_filter.uids is not None:
+            min_uid, max_uid = self.min_uid.casefold(), self.max_uid.casefold()
+            if not any(min_uid <= uid <= max_uid for uid in record_filter.uids):
+                return False
+
+        if record_filter.since is not None or record_filter.until is not None:
+            if self.min_start_time_utc is None or self.max_start_time_utc is None:
+                return False
+            if record_filter.since is not None and self.max_start_time_utc < record_filter.since:
+                return False
+            if record_filter.until is not None and self.min_start_time_utc >= record_filter.until:
+                return False
+
+        return True
+
+
+def partition_key(
+    uid: str,
+    start_time_utc: str,
+    scheme: PartitionScheme,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+) -> str:
+    """
+    Determine the partition of a consolidated record.
+
+    The following partitioning schemes are supported:
+        * `UID_HASH` - Stable hash of the Dropmate UID into one of `n_partitions` partitions
+        * `UID_PREFIX` - The first `prefix_length` characters of the Dropmate UID
+        * `DATE` - The UTC date of the drop start time; records without drops are partitioned into
+        `undated`
+    """
+    if scheme is PartitionScheme.UID_HASH:
+        return f"{zlib.crc32(uid.upper().encode()) % n_partitions:04d}"
+    elif scheme is PartitionScheme.UID_PREFIX:
+        return uid[:prefix_length].upper()
+    else:
+        return "undated" if start_time_utc == "na" else start_time_utc[:10]
+
+
+def write_partitioned(
+    consolidated_records: abc.Sequence[str],
+    out_dir: Path,
+    keep_headers: abc.Sequence[str],
+    scheme: PartitionScheme,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+    max_workers: int | None = None,
+) -> list[PartitionManifest]:
+    """
+    Write the provided consolidated records into partitioned CSV files, in parallel.
+
+    Each partition is written to `<out_dir>/<partition>.csv` along with a corresponding
+    `<partition>.manifest.json` summarizing the partition's row count & key ranges, which can be
+    used by downstream tooling to skip irrelevant partitions. Record ordering is maintained within
+    each partition. Any existing partitions in `out_dir` are removed prior to writing.
+
+    See `partition_key` for a description of the supported partitioning schemes.
+
+    NOTE: The `uid` and `start_time_utc` columns are required to be present in `keep_headers`.
+    """
+    uid_idx = keep_headers.index("uid")
+    start_idx = keep_headers.index("start_time_utc")
+
+    partitions: dict[str, list[str]] = defaultdict(list)
+    for record in consolidated_records:
+        split_record = record.split(",")
+        key = partition_key(
+            split_record[uid_idx], split_record[start_idx], scheme, n_partitions, prefix_length
+        )
+        partitions[key].append(record)
+
+    header = f"{','.join(keep_headers)}\n"
+
+    def _write_partition(partition: str, records: list[str]) -> PartitionManifest:
+        # Partition keys may be derived from UIDs, which are read from the logs
+        filename = _bare_filename(f"{partition}.csv")
+        with (out_dir / filename).open("w") as f:
+            f.write(header)
+            f.writelines(f"{record}\n" for record in records)
+
+        uids = [record.split(",")[uid_idx] for record in records]
+        start_times = [
+            start for record in records if (start := record.split(",")[start_idx]) != "na"
+        ]
+        manifest = PartitionManifest(
+            partition=partition,
+            filename=filename,
+            n_rows=len(records),
+            min_uid=min(uids),
+            max_uid=max(uids),
+            min_start_time_utc=min(start_times, default=None),
+            max_start_time_utc=max(start_times, default=None),
+        )
+        (out_dir / f"{partition}{MANIFEST_SUFFIX}").write_text(json.dumps(asdict(manifest)))
+
+        return manifest
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for manifest_filepath in out_dir.glob(f"*{MANIFEST_SUFFIX}"):
+        # The partition's CSV is derived from the manifest's own filename rather than its contents,
+        # so a stale or edited manifest can't point the cleanup at another file
+        partition = manifest_filepath.name.removesuffix(MANIFEST_SUFFIX)
+        (out_dir / f"{partition}.csv").unlink(missing_ok=True)
+        manifest_filepath.unlink()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_write_partition, partition, records)
+            for partition, records in sorted(partitions.items())
+        ]
+        return [future.result() for future in futures]
+
+
+def select_partitions(partition_dir: Path, record_filter: RecordFilter) -> list[Path]:
+    """Select the partitioned CSV files whose manifests indicate they may match the filter."""
+    selected = []
+    for manifest_filepath in sorted(partition_dir.glob(f"*{MANIFEST_SUFFIX}")):
+        manifest = PartitionManifest.from_file(manifest_filepath)
+        if manifest.may_contain(record_filter):
+            selected.append(manifest.data_filepath(partition_dir))
+
+    return selected
+
+
+ShortenedLog = dict[tuple[bytes, ...], bytes]
+
+
+def _key_plan(schema: CompiledSchema, keep_headers: abc.Sequence[str]) -> RowPlan:
+    """Plan the selection of the drop key (`uid`, `flight_index`) columns & the kept columns."""
+    return schema.plan(("uid", "flight_index", *keep_headers))
+
+
+def _shorten_mapped_log(
+    buffer: mmap.mmap | io.BytesIO,
+    keep_headers: abc.Sequence[str],
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | None = None,
+    skip_keys: abc.Container[tuple[bytes, ...]] = frozenset(),
+) -> ShortenedLog:
+    """
+    Shorten the records of the provided memory-mapped log, keyed by their raw UID & flight index.
+
+    Logs already read into memory may also be provided as a `BytesIO` buffer.
+
+    Only the key & kept columns are scanned from the mapped bytes, and records are left undecoded
+    so that the cost of decoding is only paid for records that survive deduplication across logs.
+    Records whose keys are in `skip_keys` are skipped without being joined.
+    """
+    header = buffer.readline().decode().rstrip("\r\n")
+    if not header:
+        return {}
+
+    schema = compile_schema(header)
+    plan = _key_plan(schema, keep_headers)
+    line_filter = _line_filter(record_filter, schema, as_bytes=True)
+
+    lines: mmap.mmap | abc.Iterable[bytes] = buffer
+    if progress is not None:
+        lines = progress.track_lines(iter(buffer.readline, b""))
+
+    rows = iter_columns(lines, plan.indices, line_filter)
+    if plan.adapt is not None:
+        rows = map(plan.adapt_bytes, rows)
+    if progress is not None:
+        rows = progress.track_records(rows)
+
+    shortened: ShortenedLog = {}
+    for row in rows:
+        drop_key = row[:2]
+        if drop_key not in shortened and drop_key not in skip_keys:
+            shortened[drop_key] = b",".join(row[2:])
+
+    return shortened
+
+
+def _shorten_record(
+    drop_record: str, picker: abc.Callable[[str], abc.Sequence[str]]
+) -> tuple[tuple[bytes, ...], bytes]:
+    uid, flight_index, *kept = picker(drop_record)
+    # Keys & records are kept as raw bytes to be shared with records from memory-mapped logs
+    return (uid.encode(), flight_index.encode()), ",".join(kept).encode()
+
+
+def _shorten_quarantined(
+    log: LogSource,
+    keep_headers: abc.Sequence[str],
+    record_filter: RecordFilter | None,
+    rejects: list[RejectedLine],
+) -> ShortenedLog:
+    """Shorten the provided log line by line, quarantining malformed lines."""
+    shortened: ShortenedLog = {}
+
+    def prepare(header: str) -> abc.Callable[[str], None]:
+        schema = compile_schema(header)
+        picker = _key_plan(schema, keep_headers).picker()
+        line_filter = _line_filter(record_filter, schema)
+
+        def handle(line: str) -> None:
+            if line_filter is None or line_filter(line):
+                drop_key, record = _shorten_record(line, picker)
+                shortened.setdefault(drop_key, record)
+
+        return handle
+
+    if not quarantine_lines(log, rejects, prepare):
+        return {}
+
+    return shortened
+
+
+def _shorten_log(
+    log: LogSource,
+    keep_headers: abc.Sequence[str],
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | None = None,
+    rejects: list[RejectedLine] | None = None,
+    skip_keys: abc.Container[tuple[bytes, ...]] = frozenset(),
+) -> ShortenedLog:
+    """
+    Shorten & deduplicate the records of the provided log, keyed by their raw UID & flight index.
+
+    Uncompressed logs are memory-mapped, see `_shorten_mapped_log`, all others are streamed.
+    Records whose keys are in `skip_keys`, e.g. the keys already consolidated from previous logs,
+    are omitted.
+
+    If `rejects` is provided and the log can't be processed in full, it is re-processed line by line
+    with any malformed lines quarantined to `rejects`, see `_shorten_quarantined`.
+    """
+    try:
+        with log.open_mapped() as buffer:
+            if buffer is not None:
+                return _shorten_mapped_log(buffer, keep_headers, record_filter, progress, skip_keys)
+
+        log_lines = log.iter_lines()
+        header = next(log_lines, None)
+        if header is None:
+            return {}
+
+        schema = compile_schema(header)
+        picker = _key_plan(schema, keep_headers).picker()
+        line_filter = _line_filter(record_filter, schema)
+        if progress is not None:
+            log_lines = progress.track_lines(log_lines)
+        if line_filter is not None:
+            log_lines = filter(line_filter, log_lines)
+        if progress is not None:
+            log_lines = progress.track_records(log_lines)
+
+        shortened: ShortenedLog = {}
+        for drop_record in log_lines:
+            drop_key, record = _shorten_record(drop_record, picker)
+            if drop_key not in shortened and drop_key not in skip_keys:
+                shortened[drop_key] = record
+
+        return shortened
+    except (*LINE_ERRORS, *CORRUPT_LOG_ERRORS):
+        if rejects is None:
+            raise
+
+    return _shorten_quarantined(log, keep_headers, record_filter, rejects)
+
+
+def _merge_shortened(
+    shortened: ShortenedLog,
+    seen_logs: set[tuple[bytes, ...]],
+    consolidated_records: list[str],
+) -> None:
+    """Decode & append the shortened records of a log whose keys are not already in `seen_logs`."""
+    for drop_key, record in shortened.items():
+        if drop_key not in seen_logs:
+            consolidated_records.append(record.decode())
+            seen_logs.add(drop_key)
+
+
+def write_consolidated(
+    consolidated_records: abc.Sequence[str],
+    out_filepath: Path,
+    keep_headers: abc.Sequence[str] = CONSOLIDATED_HEADERS,
+    partition_by: PartitionScheme | None = None,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+) -> None:
+    """
+    Write the provided consolidated records to a single CSV, or as partitioned files.
+
+    See `consolidate_drop_records` for a description of the partitioning parameters.
+    """
+    if partition_by is not None:
+        write_partitioned(
+            consolidated_records,
+            out_dir=out_filepath.with_suffix(""),
+            keep_headers=keep_headers,
+            scheme=partition_by,
+            n_partitions=n_partitions,
+            prefix_length=prefix_length,
+        )
+    else:
+        with out_filepath.open("w") as f:
+            write_records(consolidated_records, f, keep_headers)
+
+
+def write_records(
+    consolidated_records: abc.Iterable[str],
+    out: t.TextIO,
+    keep_headers: abc.Sequence[str] = CONSOLIDATED_HEADERS,
+) -> None:
+    """Write the provided consolidated records, with a header row, to the provided text stream."""
+    out.write(f"{','.join(keep_headers)}\n")
+    out.writelines(f"{record}\n" for record in consolidated_records)
 
 
 def consolidate_drop_records(
@@ -30,6 +429,13 @@ def consolidate_drop_records(
     out_filepath: Path,
     keep_headers: abc.Sequence[str] = CONSOLIDATED_HEADERS,
     write_file: bool = True,
+    record_filter: RecordFilter | None = None,
+    partition_by: PartitionScheme | None = None,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+    progress: ProgressTracker | ProgressCallback | None = None,
+    work_dir: WorkDir | None = None,
+    sources: abc.Sequence[LogSource] | None = None,
 ) -> list[str]:
     """
     Merge a directory of Dropmate drop record outputs into a deduplicated, simplified drop record.
@@ -44,27 +450,63 @@ def consolidate_drop_records(
         * `end_barometric_altitude_msl_ft`
 
     It is assumed that these headers are present, no checking is done on the input log files.
+    Alternatively, `FULL_CONSOLIDATED_HEADERS` may be kept so the consolidated log can be audited.
+
+    Compressed logs and archive members matching `log_pattern` are streamed directly, see
+    `iter_log_sources` for details. Each log is shortened & deduplicated independently, see
+    `_shorten_log`, then merged into the consolidated records in log order; only the first
+    occurrence of each record is decoded.
+
+    If provided, `sources` are consolidated rather than the logs matched by `log_pattern`, e.g. with
+    duplicate logs removed, see `skip_duplicate_logs`.
+
+    If provided, `record_filter` is applied to the raw log lines before they are processed.
+
+    If `partition_by` is specified, the consolidated records are written as partitioned files into
+    a directory named after `out_filepath` (without its suffix) rather than a single file; see
+    `write_partitioned` for details.
+
+    Progress may be reported by providing either a callback or a `ProgressTracker`, see
+    `log_parse_pipeline` for details.
+
+    If a `work_dir` is provided, the shortened records of each log are checkpointed so they can be
+    reused by a resumed run, and malformed lines are quarantined to the work directory rather than
+    aborting the run; see `WorkDir` for details.
     """
-    seen_logs = set()
-    consolidated_records = []
-    for log in log_dir.glob(log_pattern):
-        log_lines = log.read_text().splitlines()
-        indices = ColumnIndices.from_header(log_lines[0])
+    if sources is None:
+        sources = list(iter_log_sources(log_dir, log_pattern))
+    tracker = as_tracker(progress, sources)
 
-        for drop_record in log_lines[1:]:
-            record_series = FauxSeries(drop_record.split(","), indices)
-            drop_key = (record_series["uid"], record_series["flight_index"])
+    seen_logs: set[tuple[bytes, ...]] = set()
+    consolidated_records: list[str] = []
+    with sequential_archive_reads():
+        for log in sources:
+            if work_dir is None:
+                shortened = _shorten_log(
+                    log, keep_headers, record_filter, tracker, skip_keys=seen_logs
+                )
+            else:
+                # Checkpointed results must not depend on the previous logs, so nothing is skipped
+                params = ("consolidate", tuple(keep_headers), filter_key(record_filter))
+                shorten = partial(_shorten_log, log, keep_headers, record_filter, tracker)
+                shortened = work_dir.run(log, params, shorten)
 
-            if drop_key not in seen_logs:
-                shortened = ",".join(record_series[col] for col in keep_headers)
-                consolidated_records.append(shortened)
-                seen_logs.add(drop_key)
+            _merge_shortened(shortened, seen_logs, consolidated_records)
+            if tracker is not None:
+                tracker.finish_file()
 
-    consolidated_records.sort(key=_keyer)
+    if tracker is not None and tracker is not progress:
+        tracker.close()
 
+    consolidated_records.sort(key=_keyer)
     if write_file:
-        with out_filepath.open("w") as f:
-            f.write(f"{','.join(keep_headers)}\n")
-            f.writelines(f"{record}\n" for record in consolidated_records)
+        write_consolidated(
+            consolidated_records,
+            out_filepath,
+            keep_headers,
+            partition_by,
+            n_partitions,
+            prefix_length,
+        )
 
     return consolidated_records
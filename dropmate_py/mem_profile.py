@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import datetime as dt
+import gc
+import sys
+import tempfile
+import tracemalloc
+import typing as t
+from collections import abc
+from dataclasses import dataclass
+from pathlib import Path
+
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import log_parse_pipeline, merge_dropmates
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+SYNTHETIC_HEADER = "serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version"  # noqa: E501
+SYNTHETIC_START = dt.datetime(2023, 4, 20, tzinfo=dt.timezone.utc)
+DEFAULT_FLEET_SIZES = (100, 1_000, 10_000)
+
+
+def synthetic_log_lines(n_devices: int, drops_per_device: int = 10) -> list[str]:
+    """
+    Generate a synthetic compiled Dropmate log, including the header line.
+
+    Each device is given `drops_per_device` hourly drops, with all drops for a device sharing a
+    single scan.
+    """
+    log_lines = [SYNTHETIC_HEADER]
+    for device_idx in range(n_devices):
+        uid = f"E00227{device_idx:010X}"
+        scanned = SYNTHETIC_START + dt.timedelta(days=1, seconds=device_idx)
+        scanned_iso = scanned.strftime(r"%Y-%m-%dT%H:%M:%SZ")
+        for flight_index in range(1, drops_per_device + 1):
+            start = SYNTHETIC_START + dt.timedelta(hours=flight_index)
+            end = start + dt.timedelta(minutes=2)
+            log_lines.append(
+                f"{device_idx},{uid},Good,good,5.1,true,true,{drops_per_device},0,"
+                f"{drops_per_device},{flight_index},{start.strftime(r'%Y-%m-%dT%H:%M:%SZ')},"
+                f"{end.strftime(r'%Y-%m-%dT%H:%M:%SZ')},1500,200,{scanned_iso},{scanned_iso},"
+                "SM S901U1,31,1.5.16"
+            )
+
+    return log_lines
+
+
+@dataclass(frozen=True)
+class StageMemory:
+    """
+    Memory usage of a single pipeline stage.
+
+    `retained_bytes` is the traced memory still allocated once the stage has completed, i.e. the
+    size of the stage's output; `peak_bytes` is the peak traced memory during the stage.
+    """
+
+    stage: str
+    n_records: int
+    retained_bytes: int
+    peak_bytes: int
+
+    @property
+    def bytes_per_record(self) -> float:
+        """Retained bytes per input drop record."""
+        return self.retained_bytes / max(self.n_records, 1)
+
+    @property
+    def peak_bytes_per_record(self) -> float:
+        """Peak bytes per input drop record."""
+        return self.peak_bytes / max(self.n_records, 1)
+
+
+def trace_stage(stage: str, n_records: int, func: abc.Callable[[], t.Any]) -> StageMemory:
+    """
+    Trace the memory usage of the provided callable using `tracemalloc`.
+
+    The callable's return value is kept alive until the retained memory has been measured. A full
+    garbage collection is run prior to measuring, which also releases the interpreter's free lists,
+    so freed temporaries (e.g. row tuples) are not counted as retained.
+
+    If memory is already being traced, e.g. by the caller, tracing is left running once the stage
+    has been measured; note that the caller's traced peak is reset.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    del result
+    return StageMemory(
+        stage=stage,
+        n_records=n_records,
+        retained_bytes=current - baseline,
+        peak_bytes=peak - baseline,
+    )
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of the current process, if it can be determined."""
+    if resource is None:  # pragma: no cover
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # pragma: no cover
+        # macOS reports in bytes, Linux reports in kilobytes
+        return max_rss
+
+    return max_rss * 1024
+
+
+def profile_pipeline(n_devices: int, drops_per_device: int = 10) -> list[StageMemory]:
+    """
+    Profile the memory usage of the parse, merge, audit, and consolidate stages.
+
+    A synthetic log of the specified fleet size is written to a temporary directory and used as the
+    input to each stage.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_dir = Path(tmp_dir)
+        log_filepath = log_dir / "dropmate_records_synthetic.csv"
+        log_filepath.write_text("\n".join(synthetic_log_lines(n_devices, drops_per_device)))
+        n_records = n_devices * drops_per_device
+
+        # Parsed up front & kept alive so the fleet's UIDs & serial numbers are already interned;
+        # rebuilding the interpreter's intern table would otherwise be charged to whichever stage
+        # happens to trigger it
+        parsed = log_parse_pipeline(log_filepath)
+        stages = [
+            trace_stage("parse", n_records, lambda: log_parse_pipeline(log_filepath)),
+            trace_stage(
+                "parse_batch",
+                n_records,
+                lambda: log_parse_pipeline(log_filepath, batch_convert=True),
+            ),
+        ]
+        stages.append(trace_stage("merge", n_records, lambda: merge_dropmates([*parsed, *parsed])))
+        stages.append(
+            trace_stage(
+                "audit",
+                n_records,
+                lambda: audit_pipeline(
+                    parsed,
+                    min_alt_loss_ft=200,
+                    min_delta_to_next_sec=600,
+                    min_firmware=5,
+                    max_scanned_time_delta_sec=3600,
+                ),
+            )
+        )
+        stages.append(
+            trace_stage(
+                "consolidate",
+                n_records,
+                lambda: consolidate_drop_records(
+                    log_dir, "dropmate_records_*", out_filepath=Path(), write_file=False
+                ),
+            )
+        )
+
+    return stages
+
+
+def main(fleet_sizes: abc.Iterable[int] = DEFAULT_FLEET_SIZES) -> None:  # pragma: no cover
+    """Print a memory usage report for each pipeline stage at each of the provided fleet sizes."""
+    print(f"{'devices':>8} {'stage':>12} {'records':>9} {'B/record':>9} {'peak KiB':>10}")
+    for n_devices in fleet_sizes:
+        for stage in profile_pipeline(n_devices):
+            print(
+                f"{n_devices:>8} {stage.stage:>12} {stage.n_records:>9} "
+                f"{stage.bytes_per_record:>9.0f} {stage.peak_bytes / 1024:>10.0f}"
+            )
+
+    rss = peak_rss_bytes()
+    if rss is not None:
+        print(f"Peak RSS: {rss / 1024**2:.1f} MiB")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    if len(sys.argv) > 1:
+        main(int(arg) for arg in sys.argv[1:])
+    else:
+        main()
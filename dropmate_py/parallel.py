@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import zlib
+from collections import abc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dropmate_py.log_io import LogSource, iter_log_sources
+from dropmate_py.log_utils import (
+    CONSOLIDATED_HEADERS,
+    PartitionScheme,
+    ShortenedLog,
+    _keyer,
+    _merge_shortened,
+    _shorten_log,
+    write_consolidated,
+)
+from dropmate_py.parser import RecordFilter
+from dropmate_py.progress import (
+    ProgressCallback,
+    ProgressCounts,
+    ProgressTracker,
+    as_tracker,
+)
+
+DEFAULT_N_BUCKETS = 64
+
+# Logs are split into several chunks per worker so uneven log sizes are balanced across workers
+CHUNKS_PER_WORKER = 4
+
+
+def bucket_index(drop_key: tuple[bytes, ...], n_buckets: int) -> int:
+    """
+    Determine the dedup bucket of a shortened record from its raw (`uid`, `flight_index`) key.
+
+    Records are bucketed on their UID alone, so every record of a device lands in the same bucket;
+    records that compare equal when sorted (see `_keyer`) can then never be split across buckets.
+    """
+    return zlib.crc32(drop_key[0]) % n_buckets
+
+
+def _shorten_chunk(
+    sources: abc.Sequence[LogSource],
+    keep_headers: abc.Sequence[str],
+    record_filter: RecordFilter | None,
+    n_buckets: int,
+    count: bool = False,
+) -> tuple[list[ShortenedLog], ProgressCounts]:
+    """
+    Map a contiguous chunk of logs into dedup buckets of shortened records.
+
+    Records are deduplicated within the chunk, keeping the first occurrence in log order, and the
+    insertion order of each bucket is the order in which its records were first seen.
+
+    If `count` is `True`, the rows, records, & bytes processed are counted for progress reporting.
+    """
+    counter = ProgressTracker.counter() if count else None
+    shortened: ShortenedLog = {}
+    for source in sources:
+        shortened.update(
+            _shorten_log(source, keep_headers, record_filter, counter, skip_keys=shortened)
+        )
+
+    buckets: list[ShortenedLog] = [{} for _ in range(n_buckets)]
+    for drop_key, record in shortened.items():
+        buckets[bucket_index(drop_key, n_buckets)][drop_key] = record
+
+    return buckets, ((0, 0, 0) if counter is None else counter.counts)
+
+
+def _reduce_bucket(chunk_buckets: abc.Sequence[ShortenedLog]) -> list[str]:
+    """Deduplicate & sort a single bucket, given its shortened records from each chunk in order."""
+    seen_logs: set[tuple[bytes, ...]] = set()
+    records: list[str] = []
+    for shortened in chunk_buckets:
+        _merge_shortened(shortened, seen_logs, records)
+
+    records.sort(key=_keyer)
+    return records
+
+
+def consolidate_drop_records_parallel(
+    log_dir: Path,
+    log_pattern: str,
+    out_filepath: Path,
+    keep_headers: abc.Sequence[str] = CONSOLIDATED_HEADERS,
+    write_file: bool = True,
+    record_filter: RecordFilter | None = None,
+    partition_by: PartitionScheme | None = None,
+    n_partitions: int = 16,
+    prefix_length: int = 8,
+    max_workers: int | None = None,
+    n_buckets: int = DEFAULT_N_BUCKETS,
+    progress: ProgressTracker | ProgressCallback | None = None,
+    sources: abc.Sequence[LogSource] | None = None,
+) -> list[str]:
+    """
+    Consolidate a directory of Dropmate drop record outputs across multiple processes.
+
+    Consolidation is split into map & reduce phases, each run across a pool of `max_workers`
+    processes; if not specified, all available cores are used:
+        * Map - Logs are split into contiguous chunks, and each chunk is shortened & deduplicated
+        then hash-partitioned into `n_buckets` buckets by its records' UIDs, see `bucket_index`
+        * Reduce - Each bucket is deduplicated across chunks, in chunk order, then sorted
+
+    The sorted buckets are then merged into the consolidated records. Since chunks are contiguous
+    and reduced in log order, the first occurrence of each record is kept, and the consolidated
+    records are identical to those of `consolidate_drop_records`.
+
+    See `consolidate_drop_records` for a description of the remaining parameters.
+
+    NOTE: Each log is processed by a single worker, so a directory of a few large logs will not
+    benefit from additional workers beyond the number of logs.
+    """
+    if sources is None:
+        sources = list(iter_log_sources(log_dir, log_pattern))
+    tracker = as_tracker(progress, sources)
+
+    n_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(math.ceil(len(sources) / (n_workers * CHUNKS_PER_WORKER)), 1)
+    chunks = [sources[idx : idx + chunk_size] for idx in range(0, len(sources), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _shorten_chunk, chunk, keep_headers, record_filter, n_buckets, tracker is not None
+            )
+            for chunk in chunks
+        ]
+
+        chunk_buckets = []
+        for chunk, future in zip(chunks, futures, strict=True):
+            buckets, counts = future.result()
+            chunk_buckets.append(buckets)
+
+            if tracker is not None:
+                tracker.add(*counts)
+                for _ in chunk:
+                    tracker.finish_file()
+
+        sorted_buckets = list(
+            executor.map(
+                _reduce_bucket,
+                ([buckets[idx] for buckets in chunk_buckets] for idx in range(n_buckets)),
+            )
+        )
+
+    if tracker is not None and tracker is not progress:
+        tracker.close()
+
+    # Buckets are disjoint in UID, so no ties need to be broken when merging
+    consolidated_records = list(heapq.merge(*sorted_buckets, key=_keyer))
+    if write_file:
+        write_consolidated(
+            consolidated_records,
+            out_filepath,
+            keep_headers,
+            partition_by,
+            n_partitions,
+            prefix_length,
+        )
+
+    return consolidated_records
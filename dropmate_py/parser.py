@@ -1,14 +1,38 @@
 from __future__ import annotations
 
 import datetime as dt
+import io
 import itertools
+import math
+import mmap
 import operator
+import sys
 import typing as t
-from collections import abc
-from dataclasses import dataclass, fields
+from array import array
+from collections import abc, defaultdict
+from dataclasses import dataclass, field, fields
 from enum import Enum
+from functools import partial
 from pathlib import Path
 
+from dropmate_py.checkpoint import (
+    CORRUPT_LOG_ERRORS,
+    LINE_ERRORS,
+    RejectedLine,
+    WorkDir,
+    filter_key,
+    quarantine_lines,
+)
+from dropmate_py.dedup import LineDeduplicator
+from dropmate_py.log_io import (
+    LogSource,
+    expand_log_path,
+    iter_columns,
+    sequential_archive_reads,
+)
+from dropmate_py.progress import ProgressCallback, ProgressTracker, as_tracker
+from dropmate_py.schema import CompiledSchema, RawConverter, RowPlan, compile_schema
+
 
 @dataclass
 class ColumnIndices:
@@ -69,6 +93,8 @@ class ColumnIndices:
 class Health(str, Enum):  # noqa: D101
     GOOD = "good"
     POOR = "poor"
+    # Not reported by the device, e.g. by legacy log exports; never flagged by the health audits
+    UNKNOWN = "unknown"
 
 
 @dataclass
@@ -95,6 +121,166 @@ class FauxSeries:
         return val
 
 
+def normalize_timestamp(timestamp: str) -> str:
+    """
+    Normalize the provided ISO-8601 date or datetime for lexical comparison with raw log timestamps.
+
+    Dates are returned as `YYYY-MM-DD`, and datetimes as a UTC `YYYY-MM-DDTHH:MM:SS`; timezone-naive
+    datetimes are assumed to already be in UTC.
+    """
+    parsed = dt.datetime.fromisoformat(timestamp)
+    if len(timestamp) == 10:
+        return parsed.strftime(r"%Y-%m-%d")
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(dt.timezone.utc)
+
+    return parsed.strftime(r"%Y-%m-%dT%H:%M:%S")
+
+
+@dataclass
+class RecordFilter:
+    """
+    Filter raw log lines prior to decoding them into drop records.
+
+    Filters are applied to the raw, undecoded, column values, so filtering is significantly cheaper
+    than building the full drop record:
+        * `uids` - Only retain records for the provided Dropmate UIDs (case-insensitive)
+        * `since` - Only retain records whose drop start time is at or after the provided timestamp
+        * `until` - Only retain records whose drop start time is before the provided timestamp
+
+    Since ISO-8601 timestamps sort lexically, time filters are compared directly against the raw
+    timestamp strings; bounds are normalized on instantiation, see `normalize_timestamp`.
+
+    NOTE: If a time bound is specified, records without a drop (i.e. Dropmates with no drops) are
+    excluded.
+    """
+
+    uids: abc.Collection[str] | None = None
+    since: str | None = None
+    until: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.uids is not None:
+            self.uids = frozenset(uid.strip().casefold() for uid in self.uids)
+        if self.since is not None:
+            self.since = normalize_timestamp(self.since)
+        if self.until is not None:
+            self.until = normalize_timestamp(self.until)
+
+    def __bool__(self) -> bool:
+        return self.uids is not None or self.since is not None or self.until is not None
+
+    def compile(
+        self, indices: ColumnIndices, start_converter: RawConverter | None = None
+    ) -> abc.Callable[[str], bool]:
+        """
+        Build a predicate for the raw log lines of a log with the provided column mapping.
+
+        If provided, `start_converter` normalizes raw drop start times prior to their comparison,
+        e.g. for logs with a legacy timestamp format.
+        """
+        return _compile_filter(
+            indices, self.uids, self.since, self.until, "na", ",", str.casefold, start_converter
+        )
+
+    def compile_bytes(
+        self, indices: ColumnIndices, start_converter: RawConverter | None = None
+    ) -> abc.Callable[[bytes], bool]:
+        """Build a predicate for the undecoded lines of a log with the provided column mapping."""
+        uids = None if self.uids is None else frozenset(uid.encode() for uid in self.uids)
+        since = None if self.since is None else self.since.encode()
+        until = None if self.until is None else self.until.encode()
+
+        bytes_converter = None
+        if start_converter is not None:
+            bytes_converter = partial(_convert_bytes, start_converter)
+
+        return _compile_filter(
+            indices, uids, since, until, b"na", b",", _fold_bytes, bytes_converter
+        )
+
+
+def _fold_bytes(raw_val: bytes) -> bytes:
+    # Match `str.casefold`, which also folds non-ASCII characters, without decoding ASCII values
+    return raw_val.lower() if raw_val.isascii() else raw_val.decode().casefold().encode()
+
+
+def _convert_bytes(converter: RawConverter, raw_val: bytes) -> bytes:
+    return converter(raw_val.decode()).encode()
+
+
+def _compile_filter(
+    indices: ColumnIndices,
+    uids: abc.Collection[t.AnyStr] | None,
+    since: t.AnyStr | None,
+    until: t.AnyStr | None,
+    na: t.AnyStr,
+    sep: t.AnyStr,
+    fold: abc.Callable[[t.AnyStr], t.AnyStr],
+    start_converter: abc.Callable[[t.AnyStr], t.AnyStr] | None = None,
+) -> abc.Callable[[t.AnyStr], bool]:
+    uid_idx = indices.uid
+    start_idx = indices.start_time_utc
+
+    needed = [uid_idx] if uids is not None else []
+    if since is not None or until is not None:
+        needed.append(start_idx)
+    if -1 in needed:
+        raise KeyError("Filtered column(s) not present in log file.")
+
+    # Only split as far as is necessary to reach the filtered columns
+    max_split = max(needed, default=0) + 1
+
+    def predicate(line: t.AnyStr) -> bool:
+        raw_columns = line.split(sep, max_split)
+        if uids is not None and fold(raw_columns[uid_idx]) not in uids:
+            return False
+
+        if since is not None or until is not None:
+            start = raw_columns[start_idx]
+            if start_converter is not None:
+                start = start_converter(start)
+            if start == na:
+                return False
+            if since is not None and start < since:
+                return False
+            if until is not None and start >= until:
+                return False
+
+        return True
+
+    return predicate
+
+
+def _line_filter(
+    record_filter: RecordFilter | None,
+    schema: CompiledSchema,
+    as_bytes: bool = False,
+    line_dedup: LineDeduplicator | None = None,
+) -> abc.Callable[[t.Any], bool] | None:
+    """
+    Compile the record filter, if provided, for the raw lines of a log with the given schema.
+
+    If a `line_dedup` is provided, lines retained by the record filter are also deduplicated.
+    """
+    predicate: abc.Callable[[t.Any], bool] | None = None
+    if record_filter:
+        indices = ColumnIndices.from_header(schema.header)
+        start_converter = schema.converters.get("start_time_utc")
+        if as_bytes:
+            predicate = record_filter.compile_bytes(indices, start_converter)
+        else:
+            predicate = record_filter.compile(indices, start_converter)
+
+    if line_dedup is None or predicate is None:
+        return predicate or line_dedup
+
+    # Filter first, so lines that are filtered out aren't retained by the deduplicator
+    record_predicate = predicate
+    return lambda line: record_predicate(line) and line_dedup(line)
+
+
 T = t.TypeVar("T")
 
 
@@ -106,7 +292,7 @@ def _try_conv(in_val: str, converter: abc.Callable[[str], T]) -> T | None:
     return converter(in_val)
 
 
-@dataclass
+@dataclass(slots=True)
 class DropRecord:
     """
     Represent a Dropmate drop record.
@@ -157,24 +343,109 @@ class DropRecord:
         of the Dropmate app.
         """
         df = FauxSeries(raw_columns=log_line.split(","), indices=indices)
+        return cls.from_columns([df[col] for col in DROP_RECORD_COLUMNS])
+
+    @classmethod
+    def from_columns(cls, raw_columns: abc.Sequence[str]) -> DropRecord:
+        """Build an instance from the provided raw column values, given in field order."""
+        (
+            serial_number,
+            uid,
+            battery,
+            device_health,
+            firmware_version,
+            flight_index,
+            start_time_utc,
+            end_time_utc,
+            start_barometric_altitude_msl_ft,
+            end_barometric_altitude_msl_ft,
+            dropmate_internal_time_utc,
+            last_scanned_time_utc,
+        ) = raw_columns
 
         return cls(
-            serial_number=df["serial_number"],
-            uid=df["uid"],
-            battery=Health(df["battery"].lower()),
-            device_health=Health(df["device_health"].lower()),
-            firmware_version=float(df["firmware_version"]),
-            flight_index=_try_conv(df["flight_index"], int),
-            start_time_utc=_try_conv(df["start_time_utc"], dt.datetime.fromisoformat),
-            end_time_utc=_try_conv(df["end_time_utc"], dt.datetime.fromisoformat),
-            start_barometric_altitude_msl_ft=_try_conv(df["start_barometric_altitude_msl_ft"], int),
-            end_barometric_altitude_msl_ft=_try_conv(df["end_barometric_altitude_msl_ft"], int),
-            dropmate_internal_time_utc=dt.datetime.fromisoformat(df["dropmate_internal_time_utc"]),
-            last_scanned_time_utc=dt.datetime.fromisoformat(df["last_scanned_time_utc"]),
+            # Serial numbers & UIDs are shared by all records for a device, so share their instances
+            serial_number=sys.intern(serial_number),
+            uid=sys.intern(uid),
+            battery=Health(battery.lower()),
+            device_health=Health(device_health.lower()),
+            firmware_version=float(firmware_version),
+            flight_index=_try_conv(flight_index, int),
+            start_time_utc=_try_conv(start_time_utc, dt.datetime.fromisoformat),
+            end_time_utc=_try_conv(end_time_utc, dt.datetime.fromisoformat),
+            start_barometric_altitude_msl_ft=_try_conv(start_barometric_altitude_msl_ft, int),
+            end_barometric_altitude_msl_ft=_try_conv(end_barometric_altitude_msl_ft, int),
+            dropmate_internal_time_utc=dt.datetime.fromisoformat(dropmate_internal_time_utc),
+            last_scanned_time_utc=dt.datetime.fromisoformat(last_scanned_time_utc),
         )
 
 
-@dataclass
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _float_array() -> array[float]:
+    return array("d")
+
+
+@dataclass(slots=True)
+class ScanHistory:
+    """
+    Distinct scans of a single Dropmate, stored as parallel arrays of POSIX timestamps.
+
+    Each scan is represented by the device's `last_scanned_time_utc` & the
+    `dropmate_internal_time_utc` reported by the device at that scan. Scans are deduplicated &
+    sorted by their scanned time.
+    """
+
+    scanned: array[float] = field(default_factory=_float_array)
+    internal: array[float] = field(default_factory=_float_array)
+
+    @classmethod
+    def from_pairs(cls, scans: abc.Iterable[tuple[float, float]]) -> ScanHistory:
+        """Build a scan history from `(scanned, internal)` POSIX timestamp pairs."""
+        history = cls()
+        for scanned, internal in sorted(set(scans)):
+            history.scanned.append(scanned)
+            history.internal.append(internal)
+
+        return history
+
+    @classmethod
+    def merge(cls, *histories: ScanHistory) -> ScanHistory:
+        """Merge the provided scan histories into a new, deduplicated, scan history."""
+        return cls.from_pairs(itertools.chain.from_iterable(histories))
+
+    def __len__(self) -> int:
+        return len(self.scanned)
+
+    def __iter__(self) -> abc.Iterator[tuple[float, float]]:
+        return zip(self.scanned, self.internal, strict=True)
+
+    def drift_rate_sec_per_day(self) -> float | None:
+        """
+        Calculate the rate of change of the internal clock's offset from the scanned time.
+
+        The offset (internal - scanned) of each scan is fit against scanned time using least
+        squares; a positive rate indicates an internal clock that is running fast. If fewer than two
+        scans at distinct times are available then the rate cannot be determined & `None` is
+        returned.
+        """
+        n_scans = len(self.scanned)
+        if n_scans < 2 or self.scanned[0] == self.scanned[-1]:
+            return None
+
+        # Center on the mean scan time to avoid precision loss from the large POSIX timestamps
+        mean_scanned = math.fsum(self.scanned) / n_scans
+        x = [scanned - mean_scanned for scanned in self.scanned]
+        y = list(map(operator.sub, self.internal, self.scanned))
+        mean_y = math.fsum(y) / n_scans
+
+        sxy = math.fsum(map(operator.mul, x, y)) - mean_y * math.fsum(x)
+        sxx = math.fsum(map(operator.mul, x, x))
+        return (sxy / sxx) * SECONDS_PER_DAY
+
+
+@dataclass(slots=True)
 class Dropmate:  # noqa: D101
     uid: str
     drops: list[DropRecord]
@@ -183,6 +454,8 @@ class Dropmate:  # noqa: D101
     firmware_version: float
     dropmate_internal_time_utc: dt.datetime
     last_scanned_time_utc: dt.datetime
+    serial_number: str = ""
+    scan_history: ScanHistory = field(default_factory=ScanHistory)
 
     def __post_init__(self) -> None:
         # Empty out drops if we have an empty log record
@@ -205,6 +478,9 @@ def _group_by_uid(drop_logs: abc.Collection[DropRecord]) -> list[Dropmate]:
     dropmates = []
     for uid, logs_g in itertools.groupby(sorted_logs, key=operator.attrgetter("uid")):
         logs = list(logs_g)
+        scans = {(log.last_scanned_time_utc, log.dropmate_internal_time_utc) for log in logs}
+        # Drops may span several scans of the device, so report its clock as of the latest scan
+        last_scanned_time_utc, dropmate_internal_time_utc = max(scans)
         dropmates.append(
             Dropmate(
                 uid=uid,
@@ -215,41 +491,342 @@ def _group_by_uid(drop_logs: abc.Collection[DropRecord]) -> list[Dropmate]:
                 # It should be a safe assumption that these values are consistent across logs from
                 # the same device
                 firmware_version=logs[0].firmware_version,
-                dropmate_internal_time_utc=logs[0].dropmate_internal_time_utc,
-                last_scanned_time_utc=logs[0].last_scanned_time_utc,
+                dropmate_internal_time_utc=dropmate_internal_time_utc,
+                last_scanned_time_utc=last_scanned_time_utc,
+                serial_number=logs[0].serial_number,
+                scan_history=ScanHistory.from_pairs(
+                    (scanned.timestamp(), internal.timestamp()) for scanned, internal in scans
+                ),
             )
         )
 
     return dropmates
 
 
-def _parse_raw_log(log_lines: abc.Sequence[str]) -> list[DropRecord]:
+def convert_column(
+    raw_column: abc.Sequence[str] | abc.Sequence[bytes],
+    converter: abc.Callable[[str], T],
+    allow_na: bool = True,
+) -> list[T | None]:
+    """
+    Batch convert the provided column of raw values.
+
+    Each distinct value is only converted once, which avoids the repeated conversion of values that
+    are shared across many rows, e.g. every row from the same scan shares its scan timestamps,
+    health, and firmware values. If `allow_na` is `True`, empty (`"na"`) values are mapped to
+    `None`.
+
+    Raw values may also be provided as undecoded bytes, in which case each distinct value is decoded
+    prior to its conversion.
+    """
+    distinct: set[str | bytes] = set(raw_column)
+    lookup: dict[str | bytes, T | None] = {}
+    for raw_val in distinct:
+        val = raw_val.decode() if isinstance(raw_val, bytes) else raw_val
+        lookup[raw_val] = None if allow_na and val == "na" else converter(val)
+
+    return [lookup[raw_val] for raw_val in raw_column]
+
+
+# Columns required to build a DropRecord, in DropRecord field order
+DROP_RECORD_COLUMNS = tuple(f.name for f in fields(DropRecord))
+
+
+def _parse_columnar(log_lines: abc.Iterable[str], plan: RowPlan) -> list[DropRecord]:
+    """
+    Build drop records from the provided raw log lines by converting each column in a single batch.
+
+    See `convert_column` for details on the batch conversion.
+    """
+    # Only retain the needed columns of each row, then transpose into columns
+    picker = plan.picker()
+    rows = [picker(line) for line in log_lines]
+    if not rows:
+        return []
+
+    return _records_from_columns(list(zip(*rows, strict=True)))
+
+
+def _records_from_columns(
+    raw_columns: abc.Sequence[abc.Sequence[str]] | abc.Sequence[abc.Sequence[bytes]],
+) -> list[DropRecord]:
+    """Batch convert the provided raw columns, given in `DropRecord` field order, into records."""
+    (
+        serial_number,
+        uid,
+        battery,
+        device_health,
+        firmware_version,
+        flight_index,
+        start_time_utc,
+        end_time_utc,
+        start_barometric_altitude_msl_ft,
+        end_barometric_altitude_msl_ft,
+        dropmate_internal_time_utc,
+        last_scanned_time_utc,
+    ) = raw_columns
+
+    def _to_health(raw_val: str) -> Health:
+        return Health(raw_val.lower())
+
+    to_datetime = dt.datetime.fromisoformat
+    columns = (
+        convert_column(serial_number, sys.intern, allow_na=False),
+        convert_column(uid, sys.intern, allow_na=False),
+        convert_column(battery, _to_health, allow_na=False),
+        convert_column(device_health, _to_health, allow_na=False),
+        convert_column(firmware_version, float, allow_na=False),
+        convert_column(flight_index, int),
+        convert_column(start_time_utc, to_datetime),
+        convert_column(end_time_utc, to_datetime),
+        convert_column(start_barometric_altitude_msl_ft, int),
+        convert_column(end_barometric_altitude_msl_ft, int),
+        convert_column(dropmate_internal_time_utc, to_datetime, allow_na=False),
+        convert_column(last_scanned_time_utc, to_datetime, allow_na=False),
+    )
+
+    return [DropRecord(*vals) for vals in zip(*columns, strict=True)]
+
+
+def _parse_mapped_log(
+    buffer: mmap.mmap | io.BytesIO,
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | None = None,
+    line_dedup: LineDeduplicator | None = None,
+) -> list[DropRecord]:
+    """
+    Parse the provided memory-mapped compiled Dropmate log into a list of drop records.
+
+    Rows are scanned directly from the mapped bytes, see `iter_columns`, and only the columns
+    required to build a drop record are decoded. When batch converting, each distinct raw value in a
+    column is decoded only once, see `convert_column`. Logs already read into memory may also be
+    provided as a `BytesIO` buffer.
+
+    See `_parse_raw_log` for a description of the remaining parameters.
+    """
+    header = buffer.readline().decode().rstrip("\r\n")
+    if not header:
+        return []
+
+    schema = compile_schema(header)
+    plan = schema.plan(DROP_RECORD_COLUMNS)
+    line_filter = _line_filter(record_filter, schema, as_bytes=True, line_dedup=line_dedup)
+
+    lines: mmap.mmap | abc.Iterable[bytes] = buffer
+    if progress is not None:
+        lines = progress.track_lines(iter(buffer.readline, b""))
+
+    rows = iter_columns(lines, plan.indices, line_filter)
+    if plan.adapt is not None:
+        rows = map(plan.adapt_bytes, rows)
+    if progress is not None:
+        rows = progress.track_records(rows)
+
+    if batch_convert:
+        raw_rows = list(rows)
+        if not raw_rows:
+            return []
+
+        return _records_from_columns(list(zip(*raw_rows, strict=True)))
+
+    return [DropRecord.from_columns([field.decode() for field in row]) for row in rows]
+
+
+def _parse_raw_log(
+    log_lines: abc.Iterable[str],
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | None = None,
+    line_dedup: LineDeduplicator | None = None,
+) -> list[DropRecord]:
     """
     Parse the provided compiled Dropmate log lines into a list of drop records.
 
+    Log lines are consumed lazily, so `log_lines` may be a stream of lines from an open file.
+
+    If `batch_convert` is `True`, all log lines are split before any records are built so that each
+    column, including the timestamp columns, can be converted in a single batch. This is
+    significantly faster than converting cell by cell, and shares value instances across rows, at
+    the cost of holding all of the split rows in memory at once.
+
+    If provided, `record_filter` is applied to the raw log lines before they are decoded.
+
+    If provided, `progress` is updated with the rows read & the records remaining after filtering.
+
+    If provided, `line_dedup` skips any raw lines it has already seen, e.g. in a previous log, prior
+    to decoding them.
+
     NOTE: The provided `log_lines` is assumed to include the header line.
     """
-    indices = ColumnIndices.from_header(log_lines[0])
+    lines: abc.Iterator[str] = iter(log_lines)
+    header = next(lines, None)
+    if header is None:
+        return []
+
+    schema = compile_schema(header)
+    plan = schema.plan(DROP_RECORD_COLUMNS)
+    if progress is not None:
+        lines = progress.track_lines(lines)
+    line_filter = _line_filter(record_filter, schema, line_dedup=line_dedup)
+    if line_filter is not None:
+        lines = filter(line_filter, lines)
+    if progress is not None:
+        lines = progress.track_records(lines)
+
+    if batch_convert:
+        return _parse_columnar(lines, plan)
+
+    picker = plan.picker()
+    drop_logs = []
+    for line in lines:
+        drop_logs.append(DropRecord.from_columns(picker(line)))
 
+    return drop_logs
+
+
+def _parse_quarantined(
+    source: LogSource,
+    record_filter: RecordFilter | None,
+    rejects: list[RejectedLine],
+) -> list[DropRecord]:
+    """Parse the provided log line by line, quarantining malformed lines, see `quarantine_lines`."""
     drop_logs = []
-    for line in log_lines[1:]:
-        drop_logs.append(DropRecord.from_raw(line, indices))
+
+    def prepare(header: str) -> abc.Callable[[str], None]:
+        schema = compile_schema(header)
+        picker = schema.plan(DROP_RECORD_COLUMNS).picker()
+        line_filter = _line_filter(record_filter, schema)
+
+        def handle(line: str) -> None:
+            if line_filter is None or line_filter(line):
+                drop_logs.append(DropRecord.from_columns(picker(line)))
+
+        return handle
+
+    if not quarantine_lines(source, rejects, prepare):
+        return []
 
     return drop_logs
 
 
-def log_parse_pipeline(log_filepath: Path) -> list[Dropmate]:
-    """Parse the provided compiled Dropmate log CSV into a list of drops, grouped by device."""
-    log_lines = log_filepath.read_text().splitlines()
-    parsed_records = _parse_raw_log(log_lines)
+def _parse_source(
+    source: LogSource,
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | None = None,
+    rejects: list[RejectedLine] | None = None,
+    line_dedup: LineDeduplicator | None = None,
+) -> list[DropRecord]:
+    """
+    Parse the provided log source, memory-mapping it if possible.
+
+    If `rejects` is provided and the log can't be parsed in full, it is re-parsed line by line with
+    any malformed lines quarantined to `rejects`, see `_parse_quarantined`; lines are not
+    deduplicated when re-parsing, since the failed parse may have already marked them as seen.
+    """
+    try:
+        with source.open_mapped() as buffer:
+            if buffer is not None:
+                return _parse_mapped_log(buffer, batch_convert, record_filter, progress, line_dedup)
+
+        return _parse_raw_log(
+            source.iter_lines(), batch_convert, record_filter, progress, line_dedup
+        )
+    except (*LINE_ERRORS, *CORRUPT_LOG_ERRORS):
+        if rejects is None:
+            raise
+
+    return _parse_quarantined(source, record_filter, rejects)
+
+
+def log_parse_pipeline(
+    log_filepath: Path | LogSource,
+    batch_convert: bool = False,
+    record_filter: RecordFilter | None = None,
+    progress: ProgressTracker | ProgressCallback | None = None,
+    work_dir: WorkDir | None = None,
+    line_dedup: LineDeduplicator | None = None,
+) -> list[Dropmate]:
+    """
+    Parse the provided compiled Dropmate log CSV into a list of drops, grouped by device.
+
+    Compressed logs (`.gz`, `.xz`, `.bz2`) are decompressed while streaming; if a zip or tar archive
+    is provided then all of its members are parsed.
+
+    Uncompressed logs are memory-mapped and scanned without decoding unused columns, see
+    `_parse_mapped_log`.
+
+    Progress may be reported by providing either a callback, which receives a `ProgressReport`
+    periodically & once parsing is complete, or an existing `ProgressTracker`, e.g. to report
+    progress across multiple calls; the caller is responsible for closing a provided tracker.
+
+    If a `work_dir` is provided, the parsed records of each log are checkpointed so they can be
+    reused by a resumed run, and malformed lines are quarantined to the work directory rather than
+    aborting the run; see `WorkDir` for details.
+
+    If a `line_dedup` is provided, raw lines it has already seen are skipped before being decoded;
+    sharing one across calls skips the rows repeated across overlapping logs. Checkpointed results
+    must not depend on the previous logs, so lines are not deduplicated if a `work_dir` is provided.
+
+    See `_parse_raw_log` for a description of `batch_convert` and `record_filter`.
+    """
+    if isinstance(log_filepath, LogSource):
+        sources = [log_filepath]
+    else:
+        sources = expand_log_path(log_filepath)
+
+    tracker = as_tracker(progress, sources)
+    parsed_records = []
+    with sequential_archive_reads():
+        for source in sources:
+            if work_dir is None:
+                parsed_records.extend(
+                    _parse_source(
+                        source, batch_convert, record_filter, tracker, line_dedup=line_dedup
+                    )
+                )
+            else:
+                parse = partial(_parse_source, source, batch_convert, record_filter, tracker)
+                params = ("parse", filter_key(record_filter))
+                parsed_records.extend(work_dir.run(source, params, parse))
+
+            if tracker is not None:
+                tracker.finish_file()
+
+    if tracker is not None and tracker is not progress:
+        tracker.close()
 
     return _group_by_uid(parsed_records)
 
 
 def merge_dropmates(dropmates: abc.Sequence[Dropmate]) -> list[Dropmate]:
-    """Merge a collection of potentially overlapping `Dropmate` devices into a new list."""
+    """
+    Merge a collection of potentially overlapping `Dropmate` devices into a new list.
+
+    Drop records are deduplicated by UID & flight index, so the scan histories of the provided
+    devices are merged separately to retain every distinct scan of each device. Each merged device
+    reports its internal & scanned times as of its latest scan.
+    """
     all_drops = set()
+    scan_histories: dict[str, list[ScanHistory]] = defaultdict(list)
+    latest_scans: dict[str, tuple[dt.datetime, dt.datetime]] = {}
     for dropmate in dropmates:
         all_drops.update(dropmate.drops)
+        scan_histories[dropmate.uid].append(dropmate.scan_history)
+
+        scan = (dropmate.last_scanned_time_utc, dropmate.dropmate_internal_time_utc)
+        latest_scans[dropmate.uid] = max(latest_scans.get(dropmate.uid, scan), scan)
+
+    merged = _group_by_uid(all_drops)
+    for dropmate in merged:
+        dropmate.scan_history = ScanHistory.merge(
+            dropmate.scan_history, *scan_histories[dropmate.uid]
+        )
+        # The latest scan may only be present on a duplicate drop record discarded by the merge
+        dropmate.last_scanned_time_utc, dropmate.dropmate_internal_time_utc = max(
+            (dropmate.last_scanned_time_utc, dropmate.dropmate_internal_time_utc),
+            latest_scans[dropmate.uid],
+        )
 
-    return _group_by_uid(all_drops)
+    return merged
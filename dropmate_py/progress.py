@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import datetime as dt
+import itertools
+import math
+import time
+import typing as t
+from collections import abc
+from dataclasses import dataclass
+
+from dropmate_py.log_io import LogSource
+
+BYTES_PER_MB = 1024 * 1024
+
+# Lines are counted in batches so the tracker only runs once per batch rather than once per line
+TRACK_BATCH_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class ProgressReport:
+    """
+    Snapshot of the progress of a log processing run.
+
+    `rows` counts every data row read from the logs, while `records` only counts the rows that
+    passed any record filter. `bytes_read` is the size of the log data read so far; for compressed
+    logs this is the decompressed size.
+
+    `n_files` & `total_bytes` are `None` if they are not known ahead of time.
+    """
+
+    files_done: int
+    n_files: int | None
+    rows: int
+    records: int
+    bytes_read: int
+    total_bytes: int | None
+    elapsed_sec: float
+    final: bool = False
+
+    @property
+    def mb_per_sec(self) -> float:  # noqa: D102
+        return self.bytes_read / BYTES_PER_MB / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    @property
+    def rows_per_sec(self) -> float:  # noqa: D102
+        return self.rows / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    @property
+    def records_per_sec(self) -> float:  # noqa: D102
+        return self.records / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    @property
+    def eta_sec(self) -> float | None:
+        """
+        Estimate the remaining processing time from the progress made so far.
+
+        Progress is measured in bytes if the total size of the logs is known, otherwise in files. If
+        no progress has been made yet then no estimate is available & `None` is returned.
+        """
+        if self.final:
+            return 0.0
+
+        if self.total_bytes:
+            done_frac = self.bytes_read / self.total_bytes
+        elif self.n_files:
+            done_frac = self.files_done / self.n_files
+        else:
+            return None
+
+        if done_frac <= 0:
+            return None
+
+        return max(self.elapsed_sec * (1 - done_frac) / done_frac, 0.0)
+
+    def __str__(self) -> str:
+        n_files = "?" if self.n_files is None else self.n_files
+        eta = self.eta_sec
+        eta_pretty = "?" if eta is None else str(dt.timedelta(seconds=round(eta)))
+        return (
+            f"Files: {self.files_done}/{n_files} | Rows: {self.rows:,} | "
+            f"{self.mb_per_sec:.1f} MB/s | {self.records_per_sec:,.0f} records/s | "
+            f"ETA: {eta_pretty}"
+        )
+
+
+ProgressCallback = abc.Callable[[ProgressReport], None]
+
+# Rows, records, & bytes processed, see `ProgressTracker.add`
+ProgressCounts = tuple[int, int, int]
+
+
+class ProgressTracker:
+    """
+    Track the progress of a log processing run & periodically report it to a callback.
+
+    Rows are counted by wrapping the raw line iterator of each log, see `track_lines`, and records
+    by wrapping the filtered rows, see `track_records`; each processed log must be marked with
+    `finish_file`. Counts are accumulated in batches, and the callback is invoked at most once every
+    `interval_sec` seconds, so tracking adds negligible overhead to the processing loop. A final
+    report is always issued by `close`.
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        n_files: int | None = None,
+        total_bytes: int | None = None,
+        interval_sec: float = 0.5,
+        clock: abc.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.callback = callback
+        self.n_files = n_files
+        self.total_bytes = total_bytes
+        self.interval_sec = interval_sec
+
+        self._clock = clock
+        self._start = clock()
+        self._last_report = self._start
+
+        self.files_done = 0
+        self.rows = 0
+        self.records = 0
+        self.bytes_read = 0
+
+    @classmethod
+    def for_sources(
+        cls,
+        sources: abc.Collection[LogSource],
+        callback: ProgressCallback,
+        interval_sec: float = 0.5,
+    ) -> ProgressTracker:
+        """
+        Build a tracker for processing the provided log sources.
+
+        The total size of the logs is only known ahead of time if none of the sources are
+        compressed or streamed from stdin, otherwise the ETA is estimated from the number of files
+        processed.
+        """
+        total_bytes = None
+        if not any(source.is_compressed or source.is_stdin for source in sources):
+            total_bytes = sum(source.path.stat().st_size for source in sources)
+
+        return cls(
+            callback, n_files=len(sources), total_bytes=total_bytes, interval_sec=interval_sec
+        )
+
+    @classmethod
+    def counter(cls) -> ProgressTracker:
+        """
+        Build a tracker that only counts, without reporting.
+
+        Counting trackers are intended for use inside of a worker, where reports can't be issued;
+        the worker's `counts` are then added to the reporting tracker, see `add`.
+        """
+        return cls(lambda report: None, interval_sec=math.inf)
+
+    @property
+    def counts(self) -> ProgressCounts:  # noqa: D102
+        return (self.rows, self.records, self.bytes_read)
+
+    def snapshot(self, final: bool = False) -> ProgressReport:  # noqa: D102
+        return ProgressReport(
+            files_done=self.files_done,
+            n_files=self.n_files,
+            rows=self.rows,
+            records=self.records,
+            bytes_read=self.bytes_read,
+            total_bytes=self.total_bytes,
+            elapsed_sec=self._clock() - self._start,
+            final=final,
+        )
+
+    def _maybe_report(self) -> None:
+        now = self._clock()
+        if now - self._last_report >= self.interval_sec:
+            self._last_report = now
+            self.callback(self.snapshot())
+
+    def track_lines(self, lines: abc.Iterable[t.AnyStr]) -> abc.Iterator[t.AnyStr]:
+        """
+        Count the rows & bytes of the provided raw log lines as they are consumed.
+
+        Byte lines are expected to retain their line endings, as read from a memory-mapped log,
+        while text lines are expected to have them stripped, as yielded by `LogSource.iter_lines`.
+        """
+        line_iter = iter(lines)
+        while batch := list(itertools.islice(line_iter, TRACK_BATCH_SIZE)):
+            n_bytes = sum(map(len, batch))
+            if isinstance(batch[0], str):
+                n_bytes += len(batch)
+
+            self.rows += len(batch)
+            self.bytes_read += n_bytes
+            self._maybe_report()
+            yield from batch
+
+    def track_records(self, records: abc.Iterable[t.Any]) -> abc.Iterator[t.Any]:
+        """Count the provided records, e.g. the log rows remaining after filtering, as consumed."""
+        record_iter = iter(records)
+        while batch := list(itertools.islice(record_iter, TRACK_BATCH_SIZE)):
+            self.records += len(batch)
+            yield from batch
+
+    def add(self, rows: int = 0, records: int = 0, n_bytes: int = 0) -> None:
+        """Add counts for log data processed outside of the tracked iterators, e.g. in a pool."""
+        self.rows += rows
+        self.records += records
+        self.bytes_read += n_bytes
+        self._maybe_report()
+
+    def finish_file(self) -> None:
+        """Mark a log as fully processed."""
+        self.files_done += 1
+        self._maybe_report()
+
+    def close(self) -> None:
+        """Issue the final progress report."""
+        self.callback(self.snapshot(final=True))
+
+
+def as_tracker(
+    progress: ProgressTracker | ProgressCallback | None,
+    sources: abc.Collection[LogSource],
+) -> ProgressTracker | None:
+    """
+    Build a tracker for the provided sources if a bare callback was provided.
+
+    Existing trackers are passed through, so a single tracker may span multiple pipeline calls.
+    """
+    if progress is None or isinstance(progress, ProgressTracker):
+        return progress
+
+    return ProgressTracker.for_sources(sources, progress)
+
+
+def print_progress(report: ProgressReport, out: t.TextIO) -> None:
+    """Rewrite a single progress line on the provided terminal stream, e.g. `sys.stderr`."""
+    end = "\n" if report.final else ""
+    # Pad the line so any leftovers from a longer previous report are overwritten
+    print(f"\r{report!s:<100}", end=end, file=out, flush=True)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import statistics
+from collections import abc
+from dataclasses import dataclass
+
+from dropmate_py.audit_errors import AuditErrorP, DropRecordError, DropmateAuditErrorBase
+from dropmate_py.log_io import LogSource, iter_columns
+from dropmate_py.parser import RecordFilter, _line_filter
+from dropmate_py.schema import compile_schema
+
+# UIDs are hashed to 64-bit integers; fractional samples are taken from the low end of this space
+_HASH_BITS = 64
+_HASH_SPACE = 2**_HASH_BITS
+
+
+def _normalize_uid(uid: str) -> str:
+    # Match the UID normalization of `RecordFilter`
+    return uid.strip().casefold()
+
+
+def uid_hash(uid: str, seed: int = 0) -> int:
+    """
+    Hash the provided Dropmate UID to a uniformly distributed 64-bit integer.
+
+    Hashes are keyed by `seed`, so each seed selects an independent sample of a fleet, while the
+    same seed always selects the same sample regardless of the order in which UIDs are seen.
+    """
+    digest = hashlib.blake2b(
+        _normalize_uid(uid).encode(), digest_size=_HASH_BITS // 8, key=seed.to_bytes(8, "little")
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _scan_source_uids(source: LogSource, record_filter: RecordFilter | None) -> set[bytes | str]:
+    with source.open_mapped() as buffer:
+        if buffer is not None:
+            header = buffer.readline().decode().rstrip("\r\n")
+            if not header:
+                return set()
+
+            schema = compile_schema(header)
+            line_filter = _line_filter(record_filter, schema, as_bytes=True)
+            indices = schema.plan(("uid",)).indices
+            return {uid for (uid,) in iter_columns(buffer, indices, line_filter)}
+
+    lines = source.iter_lines()
+    header = next(lines, "")
+    if not header:
+        return set()
+
+    schema = compile_schema(header)
+    text_filter = _line_filter(record_filter, schema)
+    if text_filter is not None:
+        lines = filter(text_filter, lines)
+
+    picker = schema.plan(("uid",)).picker()
+    return {picker(line)[0] for line in lines}
+
+
+def scan_uids(
+    sources: abc.Iterable[LogSource], record_filter: RecordFilter | None = None
+) -> set[str]:
+    """
+    Collect the distinct, normalized, Dropmate UIDs present in the provided logs.
+
+    Only the raw UID column of each line is read; no other columns are decoded. If provided,
+    `record_filter` is applied to the raw lines, so only the UIDs of matching records are collected.
+
+    NOTE: Compressed logs are decompressed in full to be scanned.
+    """
+    raw_uids: set[bytes | str] = set()
+    for source in sources:
+        raw_uids.update(_scan_source_uids(source, record_filter))
+
+    return {_normalize_uid(uid.decode() if isinstance(uid, bytes) else uid) for uid in raw_uids}
+
+
+@dataclass(frozen=True)
+class UidSample:
+    """
+    Sample of Dropmate UIDs drawn from a fleet of `population` devices.
+
+    UIDs are normalized, see `scan_uids`, so they may be provided directly to a `RecordFilter` in
+    order to only decode the records of sampled devices.
+    """
+
+    uids: frozenset[str]
+    population: int
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def record_filter(self, record_filter: RecordFilter | None = None) -> RecordFilter:
+        """Restrict the provided record filter, if any, to the sampled UIDs."""
+        if record_filter is None:
+            return RecordFilter(uids=self.uids)
+
+        return RecordFilter(uids=self.uids, since=record_filter.since, until=record_filter.until)
+
+
+def sample_uids(
+    uids: abc.Collection[str],
+    n: int | None = None,
+    frac: float | None = None,
+    seed: int = 0,
+) -> UidSample:
+    """
+    Draw a uniform random sample of the provided UIDs, of either size `n` or fraction `frac`.
+
+    Samples are drawn by hashing each UID, see `uid_hash`:
+        * `n` - The `n` UIDs with the smallest hashes are sampled (bottom-k sampling), equivalent to
+        reservoir sampling the UIDs while streaming them in any order
+        * `frac` - UIDs whose hash falls in the lowest `frac` of the hash space are sampled, so the
+        sample size is approximately `frac` of the population
+
+    Since samples depend only on the UIDs & `seed`, the devices sampled from a fleet are stable
+    across runs, and a device is sampled or not regardless of which logs its records appear in.
+    """
+    if (n is None) == (frac is None):
+        raise ValueError("Exactly one of a sample size or sample fraction must be specified.")
+
+    if n is not None:
+        if n < 1:
+            raise ValueError(f"Sample size must be at least 1, received: {n}")
+
+        sampled = heapq.nsmallest(n, uids, key=lambda uid: uid_hash(uid, seed))
+    elif frac is not None:
+        if not 0 < frac <= 1:
+            raise ValueError(f"Sample fraction must be in (0, 1], received: {frac}")
+
+        threshold = frac * _HASH_SPACE
+        sampled = [uid for uid in uids if uid_hash(uid, seed) < threshold]
+
+    return UidSample(uids=frozenset(sampled), population=len(uids))
+
+
+@dataclass(frozen=True)
+class ErrorRateEstimate:
+    """
+    Estimated fleet-wide rate of devices flagged by an audit error type, from a sample of devices.
+
+    `lower` & `upper` are the bounds of the Wilson score confidence interval of `rate`, see
+    `wilson_interval`.
+    """
+
+    error_type: str
+    n_flagged: int
+    n_sampled: int
+    population: int
+    rate: float
+    lower: float
+    upper: float
+
+    @property
+    def estimated_devices(self) -> float:
+        """Estimated number of flagged devices across the full fleet."""
+        return self.rate * self.population
+
+    def __str__(self) -> str:
+        return (
+            f"{self.error_type}: {self.rate:.1%} of devices "
+            f"({self.lower:.1%} - {self.upper:.1%}), {self.n_flagged}/{self.n_sampled} sampled, "
+            f"~{self.estimated_devices:.0f} of {self.population} devices"
+        )
+
+
+def wilson_interval(
+    n_flagged: int, n_sampled: int, population: int, confidence: float = 0.95
+) -> tuple[float, float]:
+    """
+    Calculate the Wilson score interval of a proportion observed in a sample without replacement.
+
+    A finite population correction is applied by inflating the effective sample size, so the
+    interval narrows as the sample approaches the full population and collapses to the observed
+    proportion if every device was sampled.
+    """
+    rate = n_flagged / n_sampled
+    if n_sampled >= population:
+        return rate, rate
+
+    n_eff = n_sampled * (population - 1) / (population - n_sampled)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z**2 / n_eff
+    center = (rate + z**2 / (2 * n_eff)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / n_eff + z**2 / (4 * n_eff**2)) / denominator
+
+    return max(center - half_width, 0.0), min(center + half_width, 1.0)
+
+
+def estimate_error_rates(
+    found_errs: abc.Iterable[AuditErrorP], sample: UidSample, confidence: float = 0.95
+) -> list[ErrorRateEstimate]:
+    """
+    Estimate the fleet-wide rate of each audit error type found when auditing a sample of devices.
+
+    Rates are the proportion of sampled devices flagged at least once by each error type, so e.g. a
+    device with several short drops contributes once to the rate of `AltitudeLossError`. Estimates
+    are sorted by error type.
+    """
+    flagged: dict[str, set[str]] = {}
+    for err in found_errs:
+        if isinstance(err, (DropmateAuditErrorBase, DropRecordError)):
+            uid = _normalize_uid(err.device.uid)
+            flagged.setdefault(type(err).__name__, set()).add(uid)
+
+    n_sampled = len(sample)
+    if n_sampled == 0:
+        return []
+
+    estimates = []
+    for error_type, uids in sorted(flagged.items()):
+        lower, upper = wilson_interval(len(uids), n_sampled, sample.population, confidence)
+        estimates.append(
+            ErrorRateEstimate(
+                error_type=error_type,
+                n_flagged=len(uids),
+                n_sampled=n_sampled,
+                population=sample.population,
+                rate=len(uids) / n_sampled,
+                lower=lower,
+                upper=upper,
+            )
+        )
+
+    return estimates
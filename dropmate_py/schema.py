@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import operator
+from collections import abc
+from dataclasses import dataclass, field
+
+LEGACY_TIMESTAMP_FORMAT = r"%Y-%b-%dT%H-%M-%SZ"
+TIMESTAMP_COLUMNS = (
+    "start_time_utc",
+    "end_time_utc",
+    "dropmate_internal_time_utc",
+    "last_scanned_time_utc",
+)
+
+RawConverter = abc.Callable[[str], str]
+
+
+class UnsupportedSchemaError(KeyError):
+    """Raised when a log's schema is recognized but cannot provide a required column."""
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_legacy_timestamp(raw_timestamp: str) -> str:
+    """
+    Convert a legacy Dropmate app timestamp, e.g. `2023-Apr-20T14-48-53Z`, to ISO-8601.
+
+    Values that aren't legacy timestamps, e.g. ISO-8601 timestamps or `"na"`, are passed through
+    unchanged. Scan timestamps are shared by every row of a scan, so conversions are cached.
+    """
+    if not raw_timestamp[5:6].isalpha():
+        return raw_timestamp
+
+    parsed = dt.datetime.strptime(raw_timestamp, LEGACY_TIMESTAMP_FORMAT)
+    return parsed.strftime(r"%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass(frozen=True, eq=False)
+class SchemaAdapter:
+    """
+    Adapt the header of a legacy or app-specific Dropmate log to the current log schema.
+
+    An adapter applies to any log whose header contains all of the columns in its `signature`; an
+    empty signature applies to all logs. Adapters may provide:
+        * `renames` - Map legacy column names to their current names, if not already present
+        * `derived` - Map a column to an existing column whose values it takes, if not present
+        * `defaults` - Constant raw values for columns that are not present
+        * `converters` - Normalize the raw values of a column, e.g. a legacy timestamp format
+        * `unsupported` - Map columns that these logs cannot provide, if not present, to the reason
+
+    Column names are given in their normalized (stripped, lowercase) form.
+    """
+
+    name: str
+    signature: frozenset[str] = frozenset()
+    renames: abc.Mapping[str, str] = field(default_factory=dict)
+    derived: abc.Mapping[str, str] = field(default_factory=dict)
+    defaults: abc.Mapping[str, str] = field(default_factory=dict)
+    converters: abc.Mapping[str, RawConverter] = field(default_factory=dict)
+    unsupported: abc.Mapping[str, str] = field(default_factory=dict)
+
+
+_LEGACY_TIMESTAMPS = dict.fromkeys(TIMESTAMP_COLUMNS, normalize_legacy_timestamp)
+
+# Scan timestamp columns were renamed in later app versions, alongside the timestamp format
+LEGACY_SCAN_TIMES = SchemaAdapter(
+    name="legacy-scan-times",
+    signature=frozenset(("dropmate_internal_time", "last_scanned_time")),
+    renames={
+        "dropmate_internal_time": "dropmate_internal_time_utc",
+        "last_scanned_time": "last_scanned_time_utc",
+    },
+    converters=_LEGACY_TIMESTAMPS,
+)
+
+# Exports that predate device health & firmware reporting; a firmware version of 0 ensures these
+# devices are still flagged by the firmware audit rather than silently passing it, while their
+# device health is left unknown so the health audit skips them rather than clearing them. The
+# earliest of these exports also lack scan timestamps, which can't be recovered without faking the
+# device clock audit, so these are rejected as unsupported rather than as a malformed log
+_NO_SCAN_TIMES = "legacy prior_flights exports without scan timestamps are not supported"
+LEGACY_PRIOR_FLIGHTS = SchemaAdapter(
+    name="legacy-prior-flights",
+    signature=frozenset(("prior_flights",)),
+    defaults={"device_health": "unknown", "firmware_version": "0"},
+    converters=_LEGACY_TIMESTAMPS,
+    unsupported={
+        "dropmate_internal_time_utc": _NO_SCAN_TIMES,
+        "last_scanned_time_utc": _NO_SCAN_TIMES,
+    },
+)
+
+# Some exports omit the serial number, which is only used for display, so fall back to the UID
+MISSING_SERIAL_NUMBER = SchemaAdapter(
+    name="missing-serial-number",
+    derived={"serial_number": "uid"},
+)
+
+SCHEMA_ADAPTERS = (LEGACY_SCAN_TIMES, LEGACY_PRIOR_FLIGHTS, MISSING_SERIAL_NUMBER)
+
+
+@dataclass(frozen=True)
+class RowPlan:
+    """
+    Decode plan for selecting columns from the raw lines of a log.
+
+    `indices` are the raw columns to pick from each line. If the log requires adapting, `adapt`
+    maps the picked values to the selected columns, filling in defaults & applying converters;
+    otherwise it is `None` and the picked values are the selected columns, so logs with a current
+    header are decoded exactly as before.
+    """
+
+    indices: tuple[int, ...]
+    adapt: abc.Callable[[abc.Sequence[str]], list[str]] | None = None
+
+    def picker(self) -> abc.Callable[[str], abc.Sequence[str]]:
+        """Build a function selecting the planned columns from a raw log line."""
+        getter = operator.itemgetter(*self.indices)
+        # itemgetter returns a bare value rather than a tuple when only selecting one item
+        single_column = len(self.indices) == 1
+        adapt = self.adapt
+
+        def pick(line: str) -> abc.Sequence[str]:
+            picked = getter(line.split(","))
+            if single_column:
+                picked = (picked,)
+
+            return picked if adapt is None else adapt(picked)
+
+        return pick
+
+    def adapt_bytes(self, row: abc.Sequence[bytes]) -> tuple[bytes, ...]:
+        """Adapt a row of undecoded values picked from a memory-mapped log."""
+        if self.adapt is None:
+            return tuple(row)
+
+        return tuple(val.encode() for val in self.adapt([val.decode() for val in row]))
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """
+    Schema of a log header after applying all matching adapters, see `compile_schema`.
+
+    `header` is the normalized header with any renames applied, so it may be provided directly to
+    `ColumnIndices.from_header`.
+    """
+
+    header: str
+    adapters: tuple[str, ...]
+    positions: abc.Mapping[str, int]
+    derived: abc.Mapping[str, str]
+    defaults: abc.Mapping[str, str]
+    converters: abc.Mapping[str, RawConverter]
+    unsupported: abc.Mapping[str, str] = field(default_factory=dict)
+
+    def plan(self, columns: abc.Sequence[str]) -> RowPlan:
+        """
+        Plan the selection of the provided columns, in order, from each raw line of the log.
+
+        A `KeyError` is raised if a column is neither present in the log nor provided by an adapter,
+        or an `UnsupportedSchemaError` if a matching adapter knows that these logs can't provide it.
+        """
+        indices: list[int] = []
+        steps: list[tuple[int, RawConverter | None] | str] = []
+        needs_adapting = False
+        for col in columns:
+            source = col if col in self.positions else self.derived.get(col, col)
+            if source in self.positions:
+                converter = self.converters.get(col)
+                needs_adapting |= converter is not None
+                steps.append((len(indices), converter))
+                indices.append(self.positions[source])
+            elif col in self.defaults:
+                needs_adapting = True
+                steps.append(self.defaults[col])
+            elif col in self.unsupported:
+                raise UnsupportedSchemaError(
+                    f"Column {col} not present in log file: {self.unsupported[col]}."
+                )
+            else:
+                raise KeyError(f"Column {col} not present in log file.")
+
+        if not needs_adapting:
+            return RowPlan(tuple(indices))
+
+        def adapt(picked: abc.Sequence[str]) -> list[str]:
+            adapted = []
+            for step in steps:
+                if isinstance(step, str):
+                    adapted.append(step)
+                else:
+                    idx, converter = step
+                    adapted.append(picked[idx] if converter is None else converter(picked[idx]))
+
+            return adapted
+
+        return RowPlan(tuple(indices), adapt)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_signature(
+    signature: tuple[str, ...], adapters: tuple[SchemaAdapter, ...]
+) -> CompiledSchema:
+    col_names = list(signature)
+    present = set(col_names)
+    applied = []
+    derived: dict[str, str] = {}
+    defaults: dict[str, str] = {}
+    converters: dict[str, RawConverter] = {}
+    unsupported: dict[str, str] = {}
+    for adapter in adapters:
+        if not adapter.signature <= present:
+            continue
+
+        renames = {
+            legacy_name: name
+            for legacy_name, name in adapter.renames.items()
+            if legacy_name in present and name not in present
+        }
+        col_names = [renames.get(col, col) for col in col_names]
+        present = set(col_names)
+
+        adapter_derived = {
+            col: src
+            for col, src in adapter.derived.items()
+            if col not in present and src in present
+        }
+        adapter_defaults = {col: val for col, val in adapter.defaults.items() if col not in present}
+        adapter_converters = {
+            col: conv for col, conv in adapter.converters.items() if col in present
+        }
+
+        # Only record adapters that changed the schema, so current headers list none
+        if renames or adapter_derived or adapter_defaults or adapter_converters:
+            applied.append(adapter.name)
+
+        unsupported.update(
+            (col, reason) for col, reason in adapter.unsupported.items() if col not in present
+        )
+        derived.update(adapter_derived)
+        defaults.update(adapter_defaults)
+        converters.update(adapter_converters)
+
+    # Duplicate columns resolve to the last occurrence, matching `ColumnIndices.from_header`
+    positions = {col: idx for idx, col in enumerate(col_names)}
+    return CompiledSchema(
+        header=",".join(col_names),
+        adapters=tuple(applied),
+        positions=positions,
+        derived=derived,
+        defaults=defaults,
+        converters=converters,
+        unsupported=unsupported,
+    )
+
+
+def compile_schema(
+    header: str, adapters: tuple[SchemaAdapter, ...] = SCHEMA_ADAPTERS
+) -> CompiledSchema:
+    """
+    Compile the schema of a log from its header line, applying all matching adapters in order.
+
+    Schemas are keyed by the header's signature, its normalized column names, and compiled once per
+    distinct signature, so a directory of mixed app version exports only pays to compile each of
+    its distinct headers once.
+    """
+    signature = tuple(col.strip().lower() for col in header.rstrip("\r\n").split(","))
+    return _compile_signature(signature, adapters)
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import sys
+import threading
+import typing as t
+from collections import abc
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from dropmate_py.audit_errors import AuditErrorP, DropRecordError, DropmateAuditErrorBase
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.dedup import skip_duplicate_logs
+from dropmate_py.fleet import DropmateFleet
+from dropmate_py.log_io import iter_log_sources
+from dropmate_py.parser import DropRecord, Dropmate, log_parse_pipeline, merge_dropmates
+
+AuditThresholds = tuple[int, int, float, int, float | None]
+
+
+def drop_to_json(drop_record: DropRecord) -> dict[str, t.Any]:
+    """Build a JSON-serializable representation of the provided drop record."""
+    return {
+        "flight_index": drop_record.flight_index,
+        "start_time_utc": _isoformat(drop_record.start_time_utc),
+        "end_time_utc": _isoformat(drop_record.end_time_utc),
+        "start_barometric_altitude_msl_ft": drop_record.start_barometric_altitude_msl_ft,
+        "end_barometric_altitude_msl_ft": drop_record.end_barometric_altitude_msl_ft,
+    }
+
+
+def dropmate_to_json(dropmate: Dropmate, include_drops: bool = True) -> dict[str, t.Any]:
+    """Build a JSON-serializable representation of the provided Dropmate."""
+    serialized: dict[str, t.Any] = {
+        "uid": dropmate.uid,
+        "serial_number": dropmate.serial_number,
+        "battery": dropmate.battery.value,
+        "device_health": dropmate.device_health.value,
+        "firmware_version": dropmate.firmware_version,
+        "dropmate_internal_time_utc": _isoformat(dropmate.dropmate_internal_time_utc),
+        "last_scanned_time_utc": _isoformat(dropmate.last_scanned_time_utc),
+        "n_drops": len(dropmate.drops),
+        "n_scans": len(dropmate.scan_history),
+        "drift_rate_sec_per_day": dropmate.scan_history.drift_rate_sec_per_day(),
+    }
+    if include_drops:
+        serialized["drops"] = [drop_to_json(drop) for drop in dropmate.drops]
+
+    return serialized
+
+
+def audit_error_to_json(err: AuditErrorP) -> dict[str, t.Any]:
+    """Build a JSON-serializable representation of the provided audit error."""
+    serialized: dict[str, t.Any] = {"type": type(err).__name__, "message": str(err)}
+    if isinstance(err, (DropmateAuditErrorBase, DropRecordError)):
+        serialized["uid"] = err.device.uid
+    if isinstance(err, DropRecordError):
+        serialized["flight_index"] = err.drop_record.flight_index
+        serialized["val"] = err.val
+
+    return serialized
+
+
+def _isoformat(timestamp: dt.datetime | None) -> str | None:
+    return None if timestamp is None else timestamp.isoformat()
+
+
+def _parse_datetime(timestamp: str) -> dt.datetime:
+    """Parse the provided ISO-8601 timestamp; timezone-naive timestamps are assumed to be UTC."""
+    parsed = dt.datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+
+    return parsed
+
+
+class FleetState:
+    """
+    In-memory Dropmate fleet loaded from a directory of logs.
+
+    Logs are located & parsed using the same semantics as `dropmate audit-bulk`: all logs matching
+    `log_pattern` are parsed, skipping exact duplicate log files if specified, and then merged using
+    `merge_dropmates`. The modification time & size of each source file are tracked so the fleet
+    can be reloaded when they change, see `reload_if_changed`.
+
+    Audit results are cached per set of thresholds until the fleet is next reloaded.
+    """
+
+    def __init__(
+        self, log_dir: Path, log_pattern: str = "*.csv", skip_duplicates: bool = True
+    ) -> None:
+        self.log_dir = log_dir
+        self.log_pattern = log_pattern
+        self.skip_duplicates = skip_duplicates
+
+        self._lock = threading.Lock()
+        self._audit_cache: dict[AuditThresholds, list[AuditErrorP]] = {}
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        self.fleet = DropmateFleet([])
+        self.loaded_at = dt.datetime.now(dt.timezone.utc)
+        self.reload()
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for source in iter_log_sources(self.log_dir, self.log_pattern):
+            try:
+                stat = source.path.stat()
+            except FileNotFoundError:
+                # Deleted since being located, so treat it as removed
+                continue
+
+            snapshot[source.path] = (stat.st_mtime_ns, stat.st_size)
+
+        return snapshot
+
+    def reload(self) -> None:
+        """
+        Parse & index all logs matching the log pattern, replacing the current fleet.
+
+        If the logs can't be parsed, the current fleet is kept and the logs aren't reloaded by
+        `reload_if_changed` until they change again.
+        """
+        with self._lock:
+            self._snapshot = self._take_snapshot()
+            sources = list(iter_log_sources(self.log_dir, self.log_pattern))
+            if self.skip_duplicates:
+                sources, _ = skip_duplicate_logs(sources)
+
+            compiled_logs: list[Dropmate] = []
+            for source in sources:
+                compiled_logs.extend(log_parse_pipeline(source))
+
+            # Swap in the new fleet in one step so in-flight requests see a consistent fleet
+            self.fleet = DropmateFleet(merge_dropmates(compiled_logs))
+            self._audit_cache = {}
+            self.loaded_at = dt.datetime.now(dt.timezone.utc)
+
+    def reload_if_changed(self) -> bool:
+        """Reload the fleet if any logs were added, removed, or modified since the last load."""
+        if self._take_snapshot() == self._snapshot:
+            return False
+
+        self.reload()
+        return True
+
+    def audit(
+        self,
+        min_alt_loss_ft: int,
+        min_delta_to_next_sec: int,
+        min_firmware: float,
+        max_scanned_time_delta_sec: int,
+        max_drift_rate_sec_per_day: float | None = None,
+    ) -> list[AuditErrorP]:
+        """Audit the loaded fleet, reusing cached results for previously seen thresholds."""
+        thresholds = (
+            min_alt_loss_ft,
+            min_delta_to_next_sec,
+            min_firmware,
+            max_scanned_time_delta_sec,
+            max_drift_rate_sec_per_day,
+        )
+        audit_cache = self._audit_cache
+        if thresholds not in audit_cache:
+            audit_cache[thresholds] = audit_pipeline(
+                self.fleet,
+                min_alt_loss_ft=min_alt_loss_ft,
+                min_delta_to_next_sec=min_delta_to_next_sec,
+                min_firmware=min_firmware,
+                max_scanned_time_delta_sec=max_scanned_time_delta_sec,
+                max_drift_rate_sec_per_day=max_drift_rate_sec_per_day,
+            )
+
+        return audit_cache[thresholds]
+
+
+class QueryError(ValueError):
+    """Raised for malformed query requests, reported to the client as a 400 response."""
+
+
+class FleetRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answer JSON queries against the in-memory fleet.
+
+    The following `GET` endpoints are supported:
+        * `/health` - Fleet summary
+        * `/audit` - Audit results, thresholds may be overridden using the `min_alt_loss_ft`,
+        `min_delta_to_next_sec`, `min_firmware`, `max_scanned_time_delta_sec`, and
+        `max_drift_rate_sec_per_day` query parameters
+        * `/devices/<uid>` - A single device & its drops
+        * `/devices` - Devices filtered by one of the `serial_number`, `scanned_before`,
+        `scanned_since`, `below_firmware`, or `at_or_above_firmware` query parameters
+        * `/drops` - Drops whose start time is in the window given by the `start` (inclusive) and
+        `end` (exclusive) query parameters
+    """
+
+    server: FleetServer
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Route the request to its endpoint & write the JSON response."""
+        url = urlsplit(self.path)
+        params = {key: vals[-1] for key, vals in parse_qs(url.query).items()}
+        route = url.path.rstrip("/")
+
+        try:
+            if route == "/health":
+                status, body = HTTPStatus.OK, self._health()
+            elif route == "/audit":
+                status, body = HTTPStatus.OK, self._audit(params)
+            elif route == "/devices":
+                status, body = HTTPStatus.OK, self._devices(params)
+            elif route.startswith("/devices/"):
+                status, body = self._device(unquote(route.removeprefix("/devices/")))
+            elif route == "/drops":
+                status, body = HTTPStatus.OK, self._drops(params)
+            else:
+                status, body = HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {url.path}"}
+        except QueryError as e:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: t.Any) -> None:  # noqa: A002
+        """Suppress per-request logging unless the server is verbose."""
+        if self.server.verbose:  # pragma: no cover
+            super().log_message(format, *args)
+
+    def _health(self) -> dict[str, t.Any]:
+        state = self.server.state
+        fleet = state.fleet
+        return {
+            "status": "ok",
+            "n_devices": len(fleet),
+            "n_drops": sum(len(dropmate.drops) for dropmate in fleet),
+            "loaded_at": state.loaded_at.isoformat(),
+        }
+
+    def _audit(self, params: dict[str, str]) -> dict[str, t.Any]:
+        thresholds: dict[str, t.Any] = dict(self.server.default_thresholds)
+        for name, converter in (
+            ("min_alt_loss_ft", int),
+            ("min_delta_to_next_sec", int),
+            ("min_firmware", float),
+            ("max_scanned_time_delta_sec", int),
+            ("max_drift_rate_sec_per_day", float),
+        ):
+            if name in params:
+                thresholds[name] = _convert_param(params, name, converter)
+
+        found_errs = self.server.state.audit(**thresholds)
+        return {
+            "thresholds": thresholds,
+            "n_errors": len(found_errs),
+            "errors": [audit_error_to_json(err) for err in found_errs],
+        }
+
+    def _device(self, uid: str) -> tuple[HTTPStatus, dict[str, t.Any]]:
+        dropmate = self.server.state.fleet.get(uid)
+        if dropmate is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown UID: {uid}"}
+
+        return HTTPStatus.OK, dropmate_to_json(dropmate)
+
+    def _devices(self, params: dict[str, str]) -> dict[str, t.Any]:
+        fleet = self.server.state.fleet
+        queries: dict[str, abc.Callable[[str], list[Dropmate]]] = {
+            "serial_number": fleet.by_serial,
+            "scanned_before": lambda val: fleet.scanned_before(_parse_datetime(val)),
+            "scanned_since": lambda val: fleet.scanned_since(_parse_datetime(val)),
+            "below_firmware": lambda val: fleet.below_firmware(float(val)),
+            "at_or_above_firmware": lambda val: fleet.at_or_above_firmware(float(val)),
+        }
+
+        specified = [name for name in queries if name in params]
+        if len(specified) != 1:
+            raise QueryError(f"Exactly one device query must be specified: {', '.join(queries)}")
+
+        (name,) = specified
+        dropmates = _convert_param(params, name, queries[name])
+        return {
+            "devices": [dropmate_to_json(dropmate, include_drops=False) for dropmate in dropmates]
+        }
+
+    def _drops(self, params: dict[str, str]) -> dict[str, t.Any]:
+        if "start" not in params or "end" not in params:
+            raise QueryError("Both start & end query parameters must be specified.")
+
+        start = _convert_param(params, "start", _parse_datetime)
+        end = _convert_param(params, "end", _parse_datetime)
+        return {
+            "drops": [
+                {"uid": dropmate.uid, **drop_to_json(drop)}
+                for dropmate, drop in self.server.state.fleet.drops_in_window(start, end)
+            ]
+        }
+
+
+T = t.TypeVar("T")
+
+
+def _convert_param(params: dict[str, str], name: str, converter: abc.Callable[[str], T]) -> T:
+    try:
+        return converter(params[name])
+    except ValueError:
+        raise QueryError(f"Invalid value for {name}: {params[name]}") from None
+
+
+class FleetServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering queries against an in-memory fleet.
+
+    If `poll_interval_sec` is specified, the fleet's log directory is polled for changes in a
+    background thread and reloaded as necessary; see `FleetState.reload_if_changed`.
+
+    `default_thresholds` are the audit thresholds used by `/audit` unless overridden by the request,
+    as keyword arguments to `audit_pipeline`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        state: FleetState,
+        default_thresholds: abc.Mapping[str, float | None],
+        poll_interval_sec: float | None = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, FleetRequestHandler)
+        self.state = state
+        self.default_thresholds = dict(default_thresholds)
+        self.verbose = verbose
+
+        self._stop_polling = threading.Event()
+        self._poller: threading.Thread | None = None
+        if poll_interval_sec is not None:
+            self._poller = threading.Thread(
+                target=self._poll, args=(poll_interval_sec,), daemon=True
+            )
+            self._poller.start()
+
+    def _poll(self, poll_interval_sec: float) -> None:
+        while not self._stop_polling.wait(poll_interval_sec):
+            try:
+                self.state.reload_if_changed()
+            except Exception as e:
+                # Logs may be malformed or mid-write; keep serving the previous fleet until fixed
+                print(f"Failed to reload logs, serving the previous fleet: {e!r}", file=sys.stderr)
+
+    def server_close(self) -> None:
+        """Stop polling for log changes & close the server."""
+        self._stop_polling.set()
+        if self._poller is not None:
+            self._poller.join()
+
+        super().server_close()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import bisect
+from collections import abc
+from dataclasses import dataclass
+
+from dropmate_py.parser import Dropmate
+
+
+def _count_below(sorted_vals: abc.Sequence[float], threshold: float) -> int:
+    """Count the values strictly below the provided threshold."""
+    return bisect.bisect_left(sorted_vals, threshold)
+
+
+def _count_above(sorted_vals: abc.Sequence[float], threshold: float) -> int:
+    """Count the values strictly above the provided threshold."""
+    return len(sorted_vals) - bisect.bisect_right(sorted_vals, threshold)
+
+
+@dataclass(frozen=True)
+class AuditQuantities:
+    """
+    Sorted audited quantities for a collection of Dropmates, as checked by `audit_pipeline`.
+
+    Each quantity is computed once, after which the number of drops and devices that would be
+    flagged at any threshold can be counted with a binary search:
+        * `altitude_losses_ft` - Altitude loss of each drop
+        * `start_deltas_sec` - Absolute time between the start of each drop & the end of the
+        device's previous drop
+        * `clock_deltas_sec` - Absolute delta between each device's internal & scanned clocks
+        * `firmware_versions` - Firmware version of each device
+
+    The `device_min_*` quantities are the per-device minima of the corresponding drop quantities,
+    which are used to count the devices with at least one flagged drop.
+
+    NOTE: As with `audit_pipeline`, devices without any drops do not contribute any drop quantities.
+    """
+
+    altitude_losses_ft: list[int]
+    device_min_altitude_losses_ft: list[int]
+    start_deltas_sec: list[float]
+    device_min_start_deltas_sec: list[float]
+    clock_deltas_sec: list[float]
+    firmware_versions: list[float]
+
+    @classmethod
+    def from_dropmates(cls, dropmates: abc.Iterable[Dropmate]) -> AuditQuantities:
+        """Compute the audited quantities for the provided Dropmates."""
+        altitude_losses = []
+        device_min_altitude_losses = []
+        start_deltas = []
+        device_min_start_deltas = []
+        clock_deltas = []
+        firmware_versions = []
+        for dropmate in dropmates:
+            firmware_versions.append(dropmate.firmware_version)
+            internal_timedelta = (
+                dropmate.last_scanned_time_utc - dropmate.dropmate_internal_time_utc
+            )
+            clock_deltas.append(abs(internal_timedelta.total_seconds()))
+
+            if not dropmate.drops:
+                continue
+
+            # Once we've excluded empty logs we can't have any None values in our DropRecords
+            device_losses = []
+            for drop_record in dropmate.drops:
+                start = drop_record.start_barometric_altitude_msl_ft
+                end = drop_record.end_barometric_altitude_msl_ft
+                device_losses.append(start - end)  # type: ignore[operator]
+            altitude_losses.extend(device_losses)
+            device_min_altitude_losses.append(min(device_losses))
+
+            device_deltas = []
+            for prev_rec, next_rec in zip(dropmate.drops, dropmate.drops[1:], strict=False):
+                next_start = next_rec.start_time_utc
+                prev_end = prev_rec.end_time_utc
+                start_delta = (next_start - prev_end).total_seconds()  # type: ignore[operator]
+                device_deltas.append(abs(start_delta))
+            if device_deltas:
+                start_deltas.extend(device_deltas)
+                device_min_start_deltas.append(min(device_deltas))
+
+        return cls(
+            altitude_losses_ft=sorted(altitude_losses),
+            device_min_altitude_losses_ft=sorted(device_min_altitude_losses),
+            start_deltas_sec=sorted(start_deltas),
+            device_min_start_deltas_sec=sorted(device_min_start_deltas),
+            clock_deltas_sec=sorted(clock_deltas),
+            firmware_versions=sorted(firmware_versions),
+        )
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """
+    Number of devices & drops flagged by an audit at a single threshold value.
+
+    `n_drops` is `None` for device-level audits.
+    """
+
+    threshold: float
+    n_devices: int
+    n_drops: int | None = None
+
+
+@dataclass(frozen=True)
+class SweepResult:  # noqa: D101
+    audit: str
+    parameter: str
+    points: list[SweepPoint]
+
+
+def sweep_thresholds(
+    dropmates: abc.Iterable[Dropmate],
+    min_alt_loss_ft: abc.Iterable[int] = (),
+    min_delta_to_next_sec: abc.Iterable[int] = (),
+    min_firmware: abc.Iterable[float] = (),
+    max_scanned_time_delta_sec: abc.Iterable[int] = (),
+) -> list[SweepResult]:
+    """
+    Count the devices & drops flagged by each audit for each of the provided threshold values.
+
+    Audited quantities are computed once, see `AuditQuantities`, so the cost of the sweep is roughly
+    that of a single audit regardless of the size of the threshold grids. Counts match those of the
+    corresponding errors reported by `audit_pipeline`.
+
+    Results are only provided for audits with at least one threshold value specified.
+    """
+    quantities = AuditQuantities.from_dropmates(dropmates)
+
+    results = []
+    alt_loss_grid = sorted(min_alt_loss_ft)
+    if alt_loss_grid:
+        points = [
+            SweepPoint(
+                threshold=threshold,
+                n_devices=_count_below(quantities.device_min_altitude_losses_ft, threshold),
+                n_drops=_count_below(quantities.altitude_losses_ft, threshold),
+            )
+            for threshold in alt_loss_grid
+        ]
+        results.append(SweepResult("Altitude loss", "min_alt_loss_ft", points))
+
+    delta_grid = sorted(min_delta_to_next_sec)
+    if delta_grid:
+        points = [
+            SweepPoint(
+                threshold=threshold,
+                n_devices=_count_below(quantities.device_min_start_deltas_sec, threshold),
+                n_drops=_count_below(quantities.start_deltas_sec, threshold),
+            )
+            for threshold in delta_grid
+        ]
+        results.append(SweepResult("Time between drops", "min_delta_to_next_sec", points))
+
+    clock_grid = sorted(max_scanned_time_delta_sec)
+    if clock_grid:
+        points = [
+            SweepPoint(
+                threshold=threshold,
+                n_devices=_count_above(quantities.clock_deltas_sec, threshold),
+            )
+            for threshold in clock_grid
+        ]
+        results.append(SweepResult("Internal clock delta", "max_scanned_time_delta_sec", points))
+
+    firmware_grid = sorted(min_firmware)
+    if firmware_grid:
+        points = [
+            SweepPoint(
+                threshold=threshold,
+                n_devices=_count_below(quantities.firmware_versions, threshold),
+            )
+            for threshold in firmware_grid
+        ]
+        results.append(SweepResult("Outdated firmware", "min_firmware", points))
+
+    return results
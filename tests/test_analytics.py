@@ -0,0 +1,101 @@
+import datetime as dt
+import io
+import json
+from functools import partial
+
+import pytest
+
+from dropmate_py import parser
+from dropmate_py.analytics import DeviceStats, StatsFormat, fleet_stats, write_stats
+
+DATE_P = partial(dt.datetime, year=2023, month=4, second=0, tzinfo=dt.timezone.utc)
+
+DROP_RECORD_P = partial(
+    parser.DropRecord,
+    serial_number="cereal",
+    firmware_version=5.1,
+    start_barometric_altitude_msl_ft=1000,
+    dropmate_internal_time_utc=DATE_P(day=30, hour=12, minute=30),
+    last_scanned_time_utc=DATE_P(day=30, hour=12, minute=30),
+)
+
+DROPMATE_P = partial(
+    parser.Dropmate,
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    firmware_version=5.1,
+    dropmate_internal_time_utc=DATE_P(day=30, hour=12, minute=30),
+    last_scanned_time_utc=DATE_P(day=30, hour=12, minute=30),
+)
+
+GOOD = parser.Health.GOOD
+POOR = parser.Health.POOR
+
+
+def _drop(
+    uid: str,
+    flight_index: int,
+    day: int,
+    duration_min: int,
+    end_alt: int,
+    battery: parser.Health = GOOD,
+    device_health: parser.Health = GOOD,
+) -> parser.DropRecord:
+    return DROP_RECORD_P(
+        uid=uid,
+        flight_index=flight_index,
+        battery=battery,
+        device_health=device_health,
+        start_time_utc=DATE_P(day=day, hour=10, minute=0),
+        end_time_utc=DATE_P(day=day, hour=10, minute=duration_min),
+        end_barometric_altitude_msl_ft=end_alt,
+    )
+
+
+@pytest.fixture
+def fleet() -> list[parser.Dropmate]:
+    return [
+        DROPMATE_P(
+            uid="A1",
+            drops=[
+                _drop("A1", 1, 1, 2, 0, battery=GOOD),
+                _drop("A1", 2, 8, 4, 500, battery=POOR, device_health=POOR),
+                _drop("A1", 3, 15, 6, 900, battery=GOOD),
+                _drop("A1", 4, 15, 8, 900, battery=POOR),
+            ],
+        ),
+        DROPMATE_P(uid="A2", drops=[]),
+        # Device's first drop is poor, which should not be counted as a degradation from the
+        # previous device's final drop
+        DROPMATE_P(uid="A3", drops=[_drop("A3", 1, 1, 3, 800, battery=POOR)]),
+    ]
+
+
+def test_fleet_stats(fleet: list[parser.Dropmate]) -> None:
+    assert fleet_stats(fleet) == [
+        DeviceStats(
+            uid="A1",
+            n_drops=4,
+            drops_per_week=2.0,
+            total_altitude_loss_ft=1700,
+            mean_descent_duration_sec=300,
+            battery_degradations=2,
+            device_health_degradations=1,
+        ),
+        DeviceStats("A2", 0, None, 0, None, 0, 0),
+        DeviceStats("A3", 1, 1.0, 200, 180, 0, 0),
+    ]
+
+
+def test_write_stats(fleet: list[parser.Dropmate]) -> None:
+    stats = fleet_stats(fleet)
+
+    buff = io.StringIO()
+    write_stats(stats, buff, StatsFormat.CSV)
+    csv_lines = buff.getvalue().splitlines()
+    assert csv_lines[0].startswith("uid,n_drops,drops_per_week")
+    assert csv_lines[2] == "A2,0,,0,,0,0"
+
+    buff = io.StringIO()
+    write_stats(stats, buff, StatsFormat.JSON)
+    assert json.loads(buff.getvalue())[0]["battery_degradations"] == 2
@@ -0,0 +1,137 @@
+import asyncio
+import gzip
+import time
+import typing as t
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py import async_pipeline
+from dropmate_py.async_pipeline import consolidate_drop_records_async, log_parse_pipeline_async
+from dropmate_py.log_io import LogSource, iter_log_sources
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import RecordFilter, log_parse_pipeline
+from dropmate_py.progress import ProgressReport
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,good,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path: Path) -> Path:
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+
+    # Duplicate drops across logs are dropped by consolidation
+    for idx in range(5):
+        (log_dir / f"log_{idx}.csv").write_text(SAMPLE_LOG.replace("A", "ABCDE"[idx]))
+    (log_dir / "log_dupe.csv").write_text(SAMPLE_LOG)
+    with gzip.open(log_dir / "log_gz.csv.gz", "wt") as f:
+        f.write(SAMPLE_LOG.replace("A", "G"))
+    (log_dir / "log_empty.csv").write_text("")
+
+    return log_dir
+
+
+@pytest.mark.parametrize("batch_convert", (False, True))
+def test_parse_pipeline_parity(log_dir: Path, batch_convert: bool) -> None:
+    sources = list(iter_log_sources(log_dir, "*.csv"))
+    record_filter = RecordFilter(uids={"A1", "C2", "G1"})
+
+    truth = []
+    for source in sources:
+        truth.extend(log_parse_pipeline(source, batch_convert, record_filter))
+
+    dropmates = asyncio.run(
+        log_parse_pipeline_async(sources, batch_convert, record_filter, max_concurrent_reads=2)
+    )
+    assert dropmates == truth
+
+
+def test_consolidate_parity(log_dir: Path, tmp_path: Path) -> None:
+    truth_filepath = tmp_path / "truth.csv"
+    truth = consolidate_drop_records(log_dir, "*.csv", truth_filepath)
+    assert len(truth) == 18
+
+    out_filepath = tmp_path / "out.csv"
+    consolidated = asyncio.run(
+        consolidate_drop_records_async(log_dir, "*.csv", out_filepath, max_concurrent_reads=2)
+    )
+    assert consolidated == truth
+    assert out_filepath.read_bytes() == truth_filepath.read_bytes()
+
+
+def test_consolidate_process_pool(log_dir: Path, tmp_path: Path) -> None:
+    out_filepath = tmp_path / "out.csv"
+    truth = consolidate_drop_records(log_dir, "*.csv", out_filepath, write_file=False)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        consolidated = asyncio.run(
+            consolidate_drop_records_async(
+                log_dir, "*.csv", out_filepath, write_file=False, executor=executor
+            )
+        )
+
+    assert consolidated == truth
+
+
+def test_async_progress(log_dir: Path, tmp_path: Path) -> None:
+    sync_reports: list[ProgressReport] = []
+    consolidate_drop_records(
+        log_dir, "*.csv", tmp_path / "out.csv", write_file=False, progress=sync_reports.append
+    )
+
+    reports: list[ProgressReport] = []
+    asyncio.run(
+        consolidate_drop_records_async(
+            log_dir, "*.csv", tmp_path / "out.csv", write_file=False, progress=reports.append
+        )
+    )
+    final, truth = reports[-1], sync_reports[-1]
+    assert final.final
+    assert (final.files_done, final.rows, final.records, final.bytes_read) == (
+        truth.files_done,
+        truth.rows,
+        truth.records,
+        truth.bytes_read,
+    )
+    assert final.files_done == 8
+
+
+def test_reads_bounded_by_parsing(log_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    in_flight = []
+    max_in_flight = 0
+    read_sources = async_pipeline._read_sources
+    parse_log_data = async_pipeline._parse_log_data
+
+    def tracking_read(sources: t.Sequence[LogSource]) -> list[bytes]:
+        nonlocal max_in_flight
+        in_flight.append(sources)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        return read_sources(sources)
+
+    def slow_parse(log_data: t.Sequence[bytes], *args: t.Any) -> t.Any:
+        time.sleep(0.02)
+        in_flight.pop()
+        return parse_log_data(log_data, *args)
+
+    monkeypatch.setattr(async_pipeline, "_read_sources", tracking_read)
+    monkeypatch.setattr(async_pipeline, "_parse_log_data", slow_parse)
+
+    # Reads are much faster than parsing, but only logs with a free slot may be read
+    sources = list(iter_log_sources(log_dir, "*.csv"))
+    with ThreadPoolExecutor(1) as executor:
+        dropmates = asyncio.run(
+            log_parse_pipeline_async(sources, max_concurrent_reads=2, executor=executor)
+        )
+
+    assert len(dropmates) == 14
+    assert max_in_flight == 2
@@ -0,0 +1,137 @@
+import datetime as dt
+import json
+import typing as t
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from dropmate_py import audit_cache, audit_errors, parser
+
+DATE_P = partial(dt.datetime, year=2023, month=4, day=20, second=0, tzinfo=dt.timezone.utc)
+
+DROP_RECORD_P = partial(
+    parser.DropRecord,
+    serial_number="cereal",
+    uid="ABC123",
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    firmware_version=5.1,
+    flight_index=1,
+    start_time_utc=DATE_P(hour=11, minute=00),
+    end_time_utc=DATE_P(hour=11, minute=30),
+    start_barometric_altitude_msl_ft=1000,
+    end_barometric_altitude_msl_ft=900,
+    dropmate_internal_time_utc=DATE_P(hour=12, minute=30),
+    last_scanned_time_utc=DATE_P(hour=12, minute=30),
+)
+
+DROPMATE_P = partial(
+    parser.Dropmate,
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    firmware_version=5.1,
+    dropmate_internal_time_utc=DATE_P(hour=14, minute=30),
+    last_scanned_time_utc=DATE_P(hour=12, minute=30),
+)
+
+AUDIT_P = partial(
+    audit_cache.cached_audit_pipeline,
+    min_alt_loss_ft=200,
+    min_delta_to_next_sec=600,
+    min_firmware=5.1,
+    max_scanned_time_delta_sec=3600,
+)
+
+
+def _sample_fleet() -> list[parser.Dropmate]:
+    return [
+        DROPMATE_P(uid="A1", drops=[DROP_RECORD_P(uid="A1")]),
+        DROPMATE_P(uid="A2", drops=[DROP_RECORD_P(uid="A2")]),
+        DROPMATE_P(uid="A3", drops=[]),
+    ]
+
+
+def test_fingerprint_tracks_drop_set() -> None:
+    dropmate = DROPMATE_P(uid="A1", drops=[DROP_RECORD_P(uid="A1")])
+    base_fingerprint = audit_cache.fingerprint_dropmate(dropmate)
+    assert audit_cache.fingerprint_dropmate(dropmate) == base_fingerprint
+
+    dropmate.drops.append(DROP_RECORD_P(uid="A1", flight_index=2))
+    assert audit_cache.fingerprint_dropmate(dropmate) != base_fingerprint
+
+
+def test_cached_audit_reuses_unchanged(tmp_path: Path) -> None:
+    cache_file = tmp_path / "audit_cache.json"
+
+    first_errs, store = AUDIT_P(_sample_fleet(), cache_filepath=cache_file)
+    assert (store.n_audited, store.n_reused) == (3, 0)
+
+    second_errs, store = AUDIT_P(_sample_fleet(), cache_filepath=cache_file)
+    assert (store.n_audited, store.n_reused) == (0, 3)
+    assert [str(err) for err in second_errs] == [str(err) for err in first_errs]
+    assert any(isinstance(err, audit_errors.AltitudeLossError) for err in second_errs)
+
+
+def test_cached_audit_reaudits_changed(tmp_path: Path) -> None:
+    cache_file = tmp_path / "audit_cache.json"
+    AUDIT_P(_sample_fleet(), cache_filepath=cache_file)
+
+    fleet = _sample_fleet()
+    fleet[0].drops.append(DROP_RECORD_P(uid="A1", flight_index=2))
+    _, store = AUDIT_P(fleet, cache_filepath=cache_file)
+    assert (store.n_audited, store.n_reused) == (1, 2)
+
+    errs, store = AUDIT_P(fleet, cache_filepath=cache_file, min_alt_loss_ft=50)
+    assert (store.n_audited, store.n_reused) == (3, 0)
+    assert not any(isinstance(err, audit_errors.AltitudeLossError) for err in errs)
+
+
+def test_cache_version_mismatch_discarded(tmp_path: Path) -> None:
+    cache_file = tmp_path / "audit_cache.json"
+    cache_file.write_text('{"version": -1, "devices": {"A1": {}}}')
+
+    store = audit_cache.AuditResultStore.load(cache_file)
+    assert store.devices == {}
+
+
+def test_interrupted_save_keeps_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache_file = tmp_path / "audit_cache.json"
+    AUDIT_P(_sample_fleet(), cache_filepath=cache_file)
+    saved = cache_file.read_text()
+
+    def interrupted_dump(obj: t.Any, f: t.TextIO) -> None:
+        f.write('{"version": ')
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(json, "dump", interrupted_dump)
+    store = audit_cache.AuditResultStore.load(cache_file)
+    with pytest.raises(KeyboardInterrupt):
+        store.save()
+
+    assert cache_file.read_text() == saved
+    assert list(tmp_path.iterdir()) == [cache_file]
+
+
+def test_cache_updated_device_fields() -> None:
+    dropmate = DROPMATE_P(uid="A1", drops=[])
+    base_fingerprint = audit_cache.fingerprint_dropmate(dropmate)
+    updated = replace(dropmate, battery=parser.Health.POOR)
+    assert audit_cache.fingerprint_dropmate(updated) != base_fingerprint
+
+
+def test_cached_drift_rate_findings(tmp_path: Path) -> None:
+    cache_file = tmp_path / "audit_cache.json"
+    fleet = _sample_fleet()
+    fleet[0].scan_history = parser.ScanHistory.from_pairs([(0.0, 0.0), (86_400.0, 86_460.0)])
+
+    first_errs, _ = AUDIT_P(fleet, cache_filepath=cache_file, max_drift_rate_sec_per_day=30)
+    second_errs, store = AUDIT_P(fleet, cache_filepath=cache_file, max_drift_rate_sec_per_day=30)
+    assert (store.n_audited, store.n_reused) == (0, 3)
+    assert [str(err) for err in second_errs] == [str(err) for err in first_errs]
+    assert any(isinstance(err, audit_errors.ClockDriftRateError) for err in second_errs)
+
+    fleet[0].scan_history = parser.ScanHistory.from_pairs([(0.0, 0.0)])
+    _, store = AUDIT_P(fleet, cache_filepath=cache_file, max_drift_rate_sec_per_day=30)
+    assert (store.n_audited, store.n_reused) == (1, 2)
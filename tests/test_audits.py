@@ -145,6 +145,29 @@ def test_audit_dropmate(dropmate: parser.Dropmate, n_expected_errors: int) -> No
     assert len(reported_errors) == n_expected_errors
 
 
+DRIFT_RATE_AUDIT_CASES = (
+    (None, 0),
+    (20.0, 0),
+    (5.0, 1),
+)
+
+
+@pytest.mark.parametrize(("max_drift_rate", "n_expected_errors"), DRIFT_RATE_AUDIT_CASES)
+def test_audit_dropmate_drift_rate(max_drift_rate: float | None, n_expected_errors: int) -> None:
+    # Internal clock drifts 10 seconds/day, but is never far enough off to trip the delta audit
+    scan_history = parser.ScanHistory.from_pairs(
+        [(0.0, 0.0), (86_400.0, 86_410.0), (172_800.0, 172_820.0)]
+    )
+    dropmate = DROPMATE_P(scan_history=scan_history)
+    reported_errors = audits._audit_dropmate(
+        dropmate=dropmate,
+        min_firmware=5.1,
+        max_scanned_time_delta_sec=3600,
+        max_drift_rate_sec_per_day=max_drift_rate,
+    )
+    assert len(reported_errors) == n_expected_errors
+
+
 def test_audit_pipeline() -> None:
     dropmates = [
         DROPMATE_P(),
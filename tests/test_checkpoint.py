@@ -0,0 +1,151 @@
+import csv
+import gzip
+import os
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.checkpoint import WorkDir
+from dropmate_py.log_io import iter_log_sources
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import RecordFilter, log_parse_pipeline
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,good,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+MALFORMED_LINES = (
+    "cereal3,A3,Good,good,5.1,true,true",
+    "cereal3,A3,Good,good,abc,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16",
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path: Path) -> Path:
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+
+    (log_dir / "log_1.csv").write_text(SAMPLE_LOG)
+    (log_dir / "log_2.csv").write_text(SAMPLE_LOG.replace("A", "B") + "\n".join(MALFORMED_LINES))
+    with gzip.open(log_dir / "log_3.csv.gz", "wt") as f:
+        f.write(SAMPLE_LOG.replace("A", "C") + "\n".join(MALFORMED_LINES))
+
+    # Truncated compressed streams can't be read in full, so the entire log is rejected
+    (log_dir / "log_4.csv.gz").write_bytes(gzip.compress(SAMPLE_LOG.encode())[:50])
+    (log_dir / "log_5.csv").write_text("uid,flight_index\nA5,1\n")
+
+    return log_dir
+
+
+def _parse_all(log_dir: Path, work_dir: WorkDir | None = None) -> list[tuple[str, int | None]]:
+    drops: list[tuple[str, int | None]] = []
+    for source in iter_log_sources(log_dir, "*.csv"):
+        for dropmate in log_parse_pipeline(source, work_dir=work_dir):
+            drops.extend((drop.uid, drop.flight_index) for drop in dropmate.drops)
+
+    return sorted(drops)
+
+
+def test_malformed_line_raises_without_work_dir(log_dir: Path) -> None:
+    with pytest.raises(IndexError):
+        log_parse_pipeline(log_dir / "log_2.csv")
+
+
+def test_malformed_lines_quarantined(log_dir: Path, tmp_path: Path) -> None:
+    work_dir = WorkDir(tmp_path / "work")
+    drops = _parse_all(log_dir, work_dir)
+    assert {uid[0] for uid, _ in drops} == {"A", "B", "C"}
+    assert len(drops) == 9
+
+    rejects_filepath = work_dir.write_rejects()
+    with rejects_filepath.open(newline="") as f:
+        rejects = {(Path(row["source"]).name, row["line_number"]) for row in csv.DictReader(f)}
+
+    truth_rejects = {
+        ("log_2.csv", "5"),
+        ("log_2.csv", "6"),
+        ("log_3.csv.gz", "5"),
+        ("log_3.csv.gz", "6"),
+        ("log_4.csv.gz", "0"),
+        ("log_5.csv", "1"),
+    }
+    assert rejects == truth_rejects
+
+
+def test_resume_reuses_checkpoints(log_dir: Path, tmp_path: Path) -> None:
+    work_path = tmp_path / "work"
+    first_drops = _parse_all(log_dir, WorkDir(work_path))
+
+    work_dir = WorkDir(work_path, resume=True)
+    assert _parse_all(log_dir, work_dir) == first_drops
+    assert (work_dir.n_resumed, work_dir.n_processed) == (5, 0)
+    assert len(work_dir.rejects) == 6
+
+    # Modified logs are reprocessed
+    log_filepath = log_dir / "log_1.csv"
+    log_filepath.write_text(SAMPLE_LOG.replace("A2", "A9"))
+    stat = log_filepath.stat()
+    os.utime(log_filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    work_dir = WorkDir(work_path, resume=True)
+    assert ("A9", 1) in _parse_all(log_dir, work_dir)
+    assert (work_dir.n_resumed, work_dir.n_processed) == (4, 1)
+
+    # Checkpoints are discarded unless resuming
+    work_dir = WorkDir(work_path)
+    _parse_all(log_dir, work_dir)
+    assert (work_dir.n_resumed, work_dir.n_processed) == (0, 5)
+
+
+def test_checkpoint_keyed_by_filter(log_dir: Path, tmp_path: Path) -> None:
+    work_dir = WorkDir(tmp_path / "work")
+    log_filepath = log_dir / "log_1.csv"
+    log_parse_pipeline(log_filepath, work_dir=work_dir)
+
+    filtered = log_parse_pipeline(
+        log_filepath, record_filter=RecordFilter(uids={"A2"}), work_dir=work_dir
+    )
+    assert [dropmate.uid for dropmate in filtered] == ["A2"]
+    assert (work_dir.n_resumed, work_dir.n_processed) == (0, 2)
+
+
+def test_consolidate_checkpoints(log_dir: Path, tmp_path: Path) -> None:
+    # Duplicates across logs must still be dropped when consolidated from checkpoints
+    (log_dir / "log_6.csv").write_text(SAMPLE_LOG)
+    (log_dir / "log_5.csv").unlink()
+    (log_dir / "log_2.csv").write_text(SAMPLE_LOG.replace("A", "B"))
+    (log_dir / "log_3.csv.gz").unlink()
+    (log_dir / "log_4.csv.gz").unlink()
+
+    out_filepath = tmp_path / "out.csv"
+    truth = consolidate_drop_records(log_dir, "*.csv", out_filepath, write_file=False)
+    assert len(truth) == 6
+
+    work_path = tmp_path / "work"
+    work_dir = WorkDir(work_path)
+    assert consolidate_drop_records(log_dir, "*.csv", out_filepath, work_dir=work_dir) == truth
+
+    work_dir = WorkDir(work_path, resume=True)
+    assert consolidate_drop_records(log_dir, "*.csv", out_filepath, work_dir=work_dir) == truth
+    assert (work_dir.n_resumed, work_dir.n_processed) == (3, 0)
+
+
+def test_consolidate_quarantines(log_dir: Path, tmp_path: Path) -> None:
+    work_dir = WorkDir(tmp_path / "work")
+    consolidated = consolidate_drop_records(
+        log_dir, "*.csv", tmp_path / "out.csv", write_file=False, work_dir=work_dir
+    )
+    # Lines with all of the consolidated columns are kept, even if other columns are malformed
+    assert len(consolidated) == 10
+    assert {(Path(reject.source).name, reject.line_number) for reject in work_dir.rejects} == {
+        ("log_2.csv", 5),
+        ("log_3.csv.gz", 5),
+        ("log_4.csv.gz", 0),
+        ("log_5.csv", 1),
+    }
@@ -1,7 +1,22 @@
+import io
+import json
+from dataclasses import asdict
 from pathlib import Path
 from textwrap import dedent
 
-from dropmate_py.log_utils import consolidate_drop_records
+import pytest
+
+from dropmate_py.log_utils import (
+    FULL_CONSOLIDATED_HEADERS,
+    PartitionManifest,
+    PartitionScheme,
+    consolidate_drop_records,
+    partition_key,
+    select_partitions,
+    write_partitioned,
+    write_records,
+)
+from dropmate_py.parser import RecordFilter, log_parse_pipeline
 
 SAMPLE_LOG_NEW_HEADER = dedent(
     """\
@@ -85,3 +100,166 @@ def test_consolidated_record_sorting(tmp_path: Path) -> None:
         tmp_path, log_pattern="dropmate_records_*", out_filepath=Path(), write_file=False
     )
     assert consolidated == TRUTH_CONSOLIDATED_TEN_RECORDS
+
+
+def test_consolidate_record_filter(tmp_path: Path) -> None:
+    new_header_log = tmp_path / "dropmate_records_new_header.csv"
+    new_header_log.write_text(SAMPLE_LOG_NEW_HEADER)
+
+    consolidated = consolidate_drop_records(
+        tmp_path,
+        log_pattern="dropmate_records_*",
+        out_filepath=Path(),
+        write_file=False,
+        record_filter=RecordFilter(uids=["ABC123"], since="2023-04-20T16:00:00Z"),
+    )
+    assert [rec.split(",")[1] for rec in consolidated] == ["2", "3"]
+
+
+PARTITION_KEY_CASES = (
+    (PartitionScheme.UID_PREFIX, "abc123", "2023-04-20T15:24:00Z", "ABC"),
+    (PartitionScheme.DATE, "abc123", "2023-04-20T15:24:00Z", "2023-04-20"),
+    (PartitionScheme.DATE, "abc123", "na", "undated"),
+)
+
+
+@pytest.mark.parametrize(("scheme", "uid", "start_time_utc", "truth_key"), PARTITION_KEY_CASES)
+def test_partition_key(
+    scheme: PartitionScheme, uid: str, start_time_utc: str, truth_key: str
+) -> None:
+    assert partition_key(uid, start_time_utc, scheme, prefix_length=3) == truth_key
+
+
+def test_partition_key_uid_hash_stable() -> None:
+    key = partition_key("abc123", "na", PartitionScheme.UID_HASH, n_partitions=4)
+    assert key == partition_key("ABC123", "na", PartitionScheme.UID_HASH, n_partitions=4)
+    assert 0 <= int(key) < 4
+
+
+def test_consolidate_partitioned(tmp_path: Path) -> None:
+    new_header_log = tmp_path / "dropmate_records_new_header.csv"
+    new_header_log.write_text(SAMPLE_LOG_NEW_HEADER)
+    legacy_header_log = tmp_path / "dropmate_records_legacy_header.csv"
+    legacy_header_log.write_text(SAMPLE_LOG_LEGACY_HEADER)
+
+    out_log = tmp_path / "out_log.csv"
+    consolidate_drop_records(
+        tmp_path,
+        log_pattern="dropmate_records_*",
+        out_filepath=out_log,
+        partition_by=PartitionScheme.UID_PREFIX,
+        prefix_length=6,
+    )
+
+    partition_dir = tmp_path / "out_log"
+    assert not out_log.exists()
+    assert sorted(p.name for p in partition_dir.glob("*.csv")) == ["ABC123.csv", "ABC456.csv"]
+
+    truth_lines = TRUTH_CONSOLIDATED.splitlines()
+    partitioned_lines = (partition_dir / "ABC123.csv").read_text().splitlines()
+    assert partitioned_lines == truth_lines[:4]
+
+    manifest = PartitionManifest.from_file(partition_dir / "ABC123.manifest.json")
+    assert manifest.n_rows == 3
+    assert (manifest.min_uid, manifest.max_uid) == ("abc123", "abc123")
+    assert manifest.min_start_time_utc == "2023-04-20T15:24:00Z"
+    assert manifest.max_start_time_utc == "2023-04-20T16:20:00Z"
+
+    selected = select_partitions(partition_dir, RecordFilter(uids=["ABC456"]))
+    assert [p.name for p in selected] == ["ABC456.csv"]
+    selected = select_partitions(partition_dir, RecordFilter(since="2023-04-20T15:00:00"))
+    assert [p.name for p in selected] == ["ABC123.csv"]
+
+
+SAMPLE_LOG_NO_DROPS = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    0,def789,Good,good,5.1,true,true,0,0,0,na,na,na,na,na,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    0,abc123,Good,good,5.1,true,true,3,0,3,1,2023-04-20T15:24:00Z,2023-04-20T15:25:00Z,1500,300,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    0,abc123,Good,good,5.1,true,true,3,0,3,2,2023-04-21T16:18:00Z,2023-04-21T16:19:00Z,1400,200,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+def test_consolidate_partitioned_by_date_no_drops(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_no_drops.csv").write_text(SAMPLE_LOG_NO_DROPS)
+
+    out_log = tmp_path / "out_log.csv"
+    consolidated = consolidate_drop_records(
+        tmp_path,
+        log_pattern="dropmate_records_*",
+        out_filepath=out_log,
+        partition_by=PartitionScheme.DATE,
+    )
+    assert [rec.split(",", 2)[:2] for rec in consolidated] == [
+        ["abc123", "1"],
+        ["abc123", "2"],
+        ["def789", "na"],
+    ]
+
+    partition_dir = tmp_path / "out_log"
+    assert sorted(p.name for p in partition_dir.glob("*.csv")) == [
+        "2023-04-20.csv",
+        "2023-04-21.csv",
+        "undated.csv",
+    ]
+
+    manifest = PartitionManifest.from_file(partition_dir / "undated.manifest.json")
+    assert (manifest.n_rows, manifest.min_uid) == (1, "def789")
+    assert manifest.min_start_time_utc is None
+
+
+def test_partition_manifest_outside_dir_rejected(tmp_path: Path) -> None:
+    partition_dir = tmp_path / "partitions"
+    partition_dir.mkdir()
+    outside = tmp_path / "precious.csv"
+    outside.write_text("keep me")
+
+    manifest = PartitionManifest(
+        partition="0000",
+        filename="../precious.csv",
+        n_rows=1,
+        min_uid="abc123",
+        max_uid="abc123",
+        min_start_time_utc=None,
+        max_start_time_utc=None,
+    )
+    (partition_dir / "0000.manifest.json").write_text(json.dumps(asdict(manifest)))
+
+    with pytest.raises(ValueError, match="bare filename"):
+        select_partitions(partition_dir, RecordFilter(uids=["abc123"]))
+
+    # Rewriting the partitions only removes the files named by the manifests themselves
+    write_partitioned(
+        TRUTH_CONSOLIDATED.splitlines()[1:],
+        partition_dir,
+        keep_headers=TRUTH_CONSOLIDATED.splitlines()[0].split(","),
+        scheme=PartitionScheme.UID_HASH,
+    )
+    assert outside.read_text() == "keep me"
+    assert all("../" not in m.read_text() for m in partition_dir.glob("*.manifest.json"))
+
+
+def test_write_records() -> None:
+    out = io.StringIO()
+    write_records(TRUTH_CONSOLIDATED.splitlines()[1:], out)
+    assert out.getvalue() == TRUTH_CONSOLIDATED
+
+
+def test_consolidate_full_auditable(tmp_path: Path) -> None:
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "dropmate_records_ten_records.csv").write_text(SAMPLE_LOG_TEN_RECORDS)
+
+    out_log = tmp_path / "out_log.csv"
+    consolidate_drop_records(
+        log_dir,
+        log_pattern="dropmate_records_*",
+        out_filepath=out_log,
+        keep_headers=FULL_CONSOLIDATED_HEADERS,
+    )
+
+    # Fully consolidated logs retain every column required to parse the original drop records
+    assert log_parse_pipeline(out_log) == log_parse_pipeline(
+        log_dir / "dropmate_records_ten_records.csv"
+    )
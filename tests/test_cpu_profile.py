@@ -0,0 +1,95 @@
+import cProfile
+import io
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.cpu_profile import CommandProfiler, collapsed_stacks, top_functions
+from dropmate_py.mem_profile import synthetic_log_lines
+from dropmate_py.parser import log_parse_pipeline
+
+
+def _inner() -> int:
+    return sum(range(10_000))
+
+
+def _outer() -> int:
+    return sum(_inner() for _ in range(50))
+
+
+@pytest.fixture
+def synthetic_log(tmp_path: Path) -> Path:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text("\n".join(synthetic_log_lines(n_devices=50)))
+    return log_filepath
+
+
+def _parse_and_audit(log_filepath: Path) -> None:
+    audit_pipeline(
+        log_parse_pipeline(log_filepath),
+        min_alt_loss_ft=200,
+        min_delta_to_next_sec=600,
+        min_firmware=5,
+        max_scanned_time_delta_sec=3600,
+    )
+
+
+def test_top_functions(synthetic_log: Path) -> None:
+    profiler = cProfile.Profile()
+    profiler.runcall(_parse_and_audit, synthetic_log)
+    stats = pstats.Stats(profiler)
+    assert len(top_functions(stats, n=5)) == 5
+
+    timings = top_functions(stats, n=100)
+    assert {timing.module for timing in timings} <= {"parser", "audits", "log_utils"}
+    assert {"log_parse_pipeline", "audit_pipeline"} <= {timing.function for timing in timings}
+
+    cumulative_times = [timing.cumulative_time for timing in timings]
+    assert cumulative_times == sorted(cumulative_times, reverse=True)
+
+
+def test_collapsed_stacks() -> None:
+    profiler = cProfile.Profile()
+    profiler.runcall(_outer)
+    stacks = dict(line.rsplit(" ", 1) for line in collapsed_stacks(pstats.Stats(profiler)))
+
+    inner_stacks = [stack for stack in stacks if stack.endswith("(_inner)")]
+    assert len(inner_stacks) == 1
+    assert "(_outer);" in inner_stacks[0]
+    assert all(weight.isdigit() for weight in stacks.values())
+
+
+def test_command_profiler(tmp_path: Path, synthetic_log: Path) -> None:
+    profiler = CommandProfiler(tmp_path / "dropmate_audit")
+    profiler.start()
+    _parse_and_audit(synthetic_log)
+
+    report = io.StringIO()
+    timings = profiler.finish(out=report)
+    assert timings
+    assert "Top" in report.getvalue()
+
+    assert profiler.pstats_filepath == tmp_path / "dropmate_audit.pstats"
+    stats = pstats.Stats(str(profiler.pstats_filepath))
+    assert top_functions(stats) == timings
+
+    collapsed = profiler.collapsed_filepath.read_text().splitlines()
+    assert any("(log_parse_pipeline)" in line for line in collapsed)
+
+
+def test_cli_profiling_lazily_imported() -> None:
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, dropmate_py.cli; print('cProfile' in sys.modules or 'pstats' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert imported.stdout.strip() == "False"
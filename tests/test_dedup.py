@@ -0,0 +1,104 @@
+import gzip
+from pathlib import Path
+
+from dropmate_py.dedup import DuplicateLog, LineDeduplicator, skip_duplicate_logs
+from dropmate_py.log_io import LogSource
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import log_parse_pipeline, merge_dropmates
+
+HEADER = "serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version"
+LINE_A1 = "0,ABC123,Good,good,5.1,true,true,2,0,2,1,2023-04-20T15:24:00Z,2023-04-20T15:25:00Z,1500,300,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16"
+LINE_A2 = "0,ABC123,Good,good,5.1,true,true,2,0,2,2,2023-04-20T16:18:00Z,2023-04-20T16:19:00Z,1400,200,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16"
+LINE_B1 = "0,DEF456,Good,good,5.1,true,true,1,0,1,1,2023-04-20T14:00:00Z,2023-04-20T14:01:00Z,1500,300,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16"
+
+SAMPLE_LOG_A = f"{HEADER}\n{LINE_A1}\n{LINE_A2}\n"
+# Shares a record with log A; differs only in its last character so the logs have the same size
+SAMPLE_LOG_A_ALT = f"{HEADER}\n{LINE_A1}\n{LINE_A2[:-1]}7\n"
+SAMPLE_LOG_OVERLAP = f"{HEADER}\n{LINE_A2}\n{LINE_B1}\n"
+
+
+def test_distinct_logs_kept(tmp_path: Path) -> None:
+    log_a = tmp_path / "log_a.csv"
+    log_a.write_text(SAMPLE_LOG_A)
+    log_alt = tmp_path / "log_alt.csv"
+    log_alt.write_text(SAMPLE_LOG_A_ALT)
+    assert log_a.stat().st_size == log_alt.stat().st_size
+
+    sources = [LogSource(log_a), LogSource(log_alt)]
+    assert skip_duplicate_logs(sources) == (sources, [])
+
+
+def test_duplicate_logs_skipped(tmp_path: Path) -> None:
+    log_paths = [tmp_path / f"log_{idx}.csv" for idx in range(4)]
+    log_paths[0].write_text(SAMPLE_LOG_A)
+    log_paths[1].write_text(SAMPLE_LOG_OVERLAP)
+    log_paths[2].write_text(SAMPLE_LOG_A)
+    log_paths[3].write_text(SAMPLE_LOG_OVERLAP)
+
+    kept, duplicates = skip_duplicate_logs(LogSource(path) for path in log_paths)
+    assert kept == [LogSource(log_paths[0]), LogSource(log_paths[1])]
+    assert duplicates == [
+        DuplicateLog(log_paths[2], original=log_paths[0]),
+        DuplicateLog(log_paths[3], original=log_paths[1]),
+    ]
+    assert str(duplicates[0]) == f"{log_paths[2]} (duplicate of {log_paths[0]})"
+
+
+def test_duplicate_archive_skipped(tmp_path: Path) -> None:
+    compressed = gzip.compress(SAMPLE_LOG_A.encode(), mtime=0)
+    (tmp_path / "log_a.csv.gz").write_bytes(compressed)
+    (tmp_path / "log_b.csv.gz").write_bytes(compressed)
+
+    # Archive members are skipped along with their duplicate archive
+    sources = [
+        LogSource(tmp_path / "log_a.csv.gz"),
+        LogSource(tmp_path / "log_b.csv.gz", member="log_b.csv"),
+    ]
+    kept, duplicates = skip_duplicate_logs(sources)
+    assert kept == sources[:1]
+    assert duplicates == [DuplicateLog(tmp_path / "log_b.csv.gz", tmp_path / "log_a.csv.gz")]
+
+
+def test_line_deduplicator() -> None:
+    line_dedup = LineDeduplicator()
+    assert line_dedup(LINE_A1)
+    assert line_dedup(LINE_A2.encode())
+
+    # Text & raw lines are interchangeable
+    assert not line_dedup(LINE_A1.encode())
+    assert not line_dedup(LINE_A2)
+    assert line_dedup.n_skipped == 2
+
+
+def test_parse_dedup_lines(tmp_path: Path) -> None:
+    log_a = tmp_path / "log_a.csv"
+    log_a.write_text(SAMPLE_LOG_A)
+    log_overlap = tmp_path / "log_overlap.csv.gz"
+    log_overlap.write_bytes(gzip.compress(SAMPLE_LOG_OVERLAP.encode()))
+
+    line_dedup = LineDeduplicator()
+    deduped = log_parse_pipeline(log_a, line_dedup=line_dedup)
+    deduped.extend(log_parse_pipeline(log_overlap, line_dedup=line_dedup))
+    assert line_dedup.n_skipped == 1
+
+    # The overlapping log only contributes its new record
+    assert [dropmate.uid for dropmate in deduped] == ["ABC123", "DEF456"]
+
+    full = log_parse_pipeline(log_a) + log_parse_pipeline(log_overlap)
+    assert merge_dropmates(deduped) == merge_dropmates(full)
+
+
+def test_consolidate_sources(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_a.csv").write_text(SAMPLE_LOG_A)
+    (tmp_path / "dropmate_records_b.csv").write_text(SAMPLE_LOG_OVERLAP)
+
+    # Only the provided sources are consolidated, rather than every log matching the pattern
+    out_log = tmp_path / "out_log.csv"
+    consolidate_drop_records(
+        tmp_path,
+        log_pattern="dropmate_records_*",
+        out_filepath=out_log,
+        sources=[LogSource(tmp_path / "dropmate_records_a.csv")],
+    )
+    assert "DEF456" not in out_log.read_text()
+    assert out_log.read_text().count("ABC123") == 2
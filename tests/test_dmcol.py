@@ -0,0 +1,110 @@
+import struct
+from dataclasses import astuple
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.dmcol import DmcolFleet, load_dmcol, write_dmcol
+from dropmate_py.parser import Dropmate, Health, log_parse_pipeline
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Poor,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-21T12:30:10Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,poor,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    cereal3,Ä3,Good,unknown,5.1,true,true,0,0,0,na,na,na,na,na,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+@pytest.fixture
+def dropmates(tmp_path: Path) -> list[Dropmate]:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LOG, encoding="utf-8")
+    return log_parse_pipeline(log_filepath)
+
+
+def _as_tuples(dropmates: list[Dropmate]) -> list[tuple]:
+    return [
+        (
+            *astuple(dropmate)[:1],
+            [astuple(drop) for drop in dropmate.drops],
+            *astuple(dropmate)[2:-1],
+            list(dropmate.scan_history),
+        )
+        for dropmate in dropmates
+    ]
+
+
+def test_dmcol_round_trip(dropmates: list[Dropmate], tmp_path: Path) -> None:
+    dmcol_filepath = tmp_path / "fleet.dmcol"
+    write_dmcol(dropmates, dmcol_filepath)
+
+    with load_dmcol(dmcol_filepath) as fleet:
+        assert (len(fleet), fleet.n_drops, fleet.n_scans) == (3, 3, 4)
+        assert [fleet.uid(idx) for idx in range(len(fleet))] == ["A1", "A2", "Ä3"]
+        assert list(fleet.columns["flight_index"]) == [1, 2, 1]
+        assert list(fleet.columns["drop_uid"]) == [0, 0, 1]
+        assert list(fleet.columns["drop_offsets"]) == [0, 2, 3, 3]
+        assert fleet.drop_range(2) == range(3, 3)
+
+        assert _as_tuples(list(fleet)) == _as_tuples(dropmates)
+        assert fleet[2].drops == []
+        assert fleet[2].device_health is Health.UNKNOWN
+
+        with pytest.raises(IndexError):
+            fleet[3]
+
+
+def test_dmcol_audit(dropmates: list[Dropmate], tmp_path: Path) -> None:
+    dmcol_filepath = tmp_path / "fleet.dmcol"
+    write_dmcol(dropmates, dmcol_filepath)
+
+    audit_kwargs = {
+        "min_alt_loss_ft": 200,
+        "min_delta_to_next_sec": 600,
+        "min_firmware": 5,
+        "max_scanned_time_delta_sec": 3600,
+        "max_drift_rate_sec_per_day": 1,
+    }
+    truth = [str(err) for err in audit_pipeline(dropmates, **audit_kwargs)]
+    with DmcolFleet(dmcol_filepath) as fleet:
+        found = [str(err) for err in audit_pipeline(fleet, **audit_kwargs)]
+
+    assert found
+    assert found == truth
+
+
+def test_dmcol_empty_fleet(tmp_path: Path) -> None:
+    dmcol_filepath = tmp_path / "fleet.dmcol"
+    write_dmcol([], dmcol_filepath)
+    with load_dmcol(dmcol_filepath) as fleet:
+        assert list(fleet) == []
+
+
+INVALID_CASES = (
+    (b"", "empty"),
+    (b"NOTDMCOL" + bytes(64), "Not a dmcol file"),
+    (struct.pack("<6sHQQQI4x", b"DMCOL\x00", 99, 0, 0, 0, 0), "Unsupported dmcol version"),
+    (struct.pack("<6sHQQQI4x", b"DMCOL\x00", 1, 0, 0, 0, 0), "missing columns"),
+)
+
+
+@pytest.mark.parametrize(("contents", "match"), INVALID_CASES)
+def test_dmcol_invalid(tmp_path: Path, contents: bytes, match: str) -> None:
+    dmcol_filepath = tmp_path / "fleet.dmcol"
+    dmcol_filepath.write_bytes(contents)
+    with pytest.raises(ValueError, match=match):
+        load_dmcol(dmcol_filepath)
+
+
+def test_dmcol_truncated(dropmates: list[Dropmate], tmp_path: Path) -> None:
+    dmcol_filepath = tmp_path / "fleet.dmcol"
+    write_dmcol(dropmates, dmcol_filepath)
+    dmcol_filepath.write_bytes(dmcol_filepath.read_bytes()[:-16])
+
+    with pytest.raises(ValueError, match="Truncated"):
+        load_dmcol(dmcol_filepath)
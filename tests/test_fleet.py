@@ -0,0 +1,126 @@
+import datetime as dt
+from functools import partial
+
+import pytest
+
+from dropmate_py import parser
+from dropmate_py.fleet import DropmateFleet
+
+DATE_P = partial(dt.datetime, year=2023, month=4, second=0, tzinfo=dt.timezone.utc)
+
+DROP_RECORD_P = partial(
+    parser.DropRecord,
+    serial_number="cereal",
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    firmware_version=5.1,
+    end_time_utc=DATE_P(day=20, hour=11, minute=30),
+    start_barometric_altitude_msl_ft=1000,
+    end_barometric_altitude_msl_ft=0,
+    dropmate_internal_time_utc=DATE_P(day=20, hour=12, minute=30),
+    last_scanned_time_utc=DATE_P(day=20, hour=12, minute=30),
+)
+
+DROPMATE_P = partial(
+    parser.Dropmate,
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    dropmate_internal_time_utc=DATE_P(day=20, hour=12, minute=30),
+)
+
+
+@pytest.fixture
+def fleet() -> DropmateFleet:
+    return DropmateFleet(
+        [
+            DROPMATE_P(
+                uid="A1",
+                serial_number="s1",
+                firmware_version=5.1,
+                last_scanned_time_utc=DATE_P(day=20, hour=12, minute=0),
+                drops=[
+                    DROP_RECORD_P(
+                        uid="A1", flight_index=1, start_time_utc=DATE_P(day=18, hour=1, minute=0)
+                    ),
+                    DROP_RECORD_P(
+                        uid="A1", flight_index=2, start_time_utc=DATE_P(day=19, hour=1, minute=0)
+                    ),
+                ],
+            ),
+            DROPMATE_P(
+                uid="A2",
+                serial_number="s2",
+                firmware_version=4.0,
+                last_scanned_time_utc=DATE_P(day=22, hour=12, minute=0),
+                drops=[
+                    DROP_RECORD_P(
+                        uid="A2", flight_index=1, start_time_utc=DATE_P(day=19, hour=2, minute=0)
+                    ),
+                ],
+            ),
+            DROPMATE_P(
+                uid="A3",
+                serial_number="s1",
+                firmware_version=5.0,
+                last_scanned_time_utc=DATE_P(day=21, hour=12, minute=0),
+                drops=[],
+            ),
+        ]
+    )
+
+
+def test_uid_lookup(fleet: DropmateFleet) -> None:
+    assert len(fleet) == 3
+    assert "A1" in fleet
+    assert fleet["A2"].uid == "A2"
+    assert fleet.get("B1") is None
+    assert [dm.uid for dm in fleet] == ["A1", "A2", "A3"]
+
+
+def test_serial_lookup(fleet: DropmateFleet) -> None:
+    assert [dm.uid for dm in fleet.by_serial("s1")] == ["A1", "A3"]
+    assert fleet.by_serial("s3") == []
+
+
+def test_drops_in_window(fleet: DropmateFleet) -> None:
+    in_window = fleet.drops_in_window(
+        DATE_P(day=19, hour=0, minute=0), DATE_P(day=20, hour=0, minute=0)
+    )
+    assert [(dm.uid, drop.flight_index) for dm, drop in in_window] == [("A1", 2), ("A2", 1)]
+
+    # Window end is exclusive
+    in_window = fleet.drops_in_window(
+        DATE_P(day=18, hour=0, minute=0), DATE_P(day=19, hour=1, minute=0)
+    )
+    assert [(dm.uid, drop.flight_index) for dm, drop in in_window] == [("A1", 1)]
+
+
+def test_scanned_queries(fleet: DropmateFleet) -> None:
+    cutoff = DATE_P(day=21, hour=12, minute=0)
+    assert [dm.uid for dm in fleet.scanned_before(cutoff)] == ["A1"]
+    assert [dm.uid for dm in fleet.scanned_since(cutoff)] == ["A3", "A2"]
+
+
+def test_firmware_queries(fleet: DropmateFleet) -> None:
+    assert [dm.uid for dm in fleet.below_firmware(5.1)] == ["A2", "A3"]
+    assert [dm.uid for dm in fleet.at_or_above_firmware(5.0)] == ["A3", "A1"]
+
+
+def test_duplicate_uids_merged() -> None:
+    dropmates = [
+        DROPMATE_P(
+            uid="A1",
+            firmware_version=5.1,
+            last_scanned_time_utc=DATE_P(day=20, hour=12, minute=0),
+            drops=[
+                DROP_RECORD_P(
+                    uid="A1", flight_index=idx, start_time_utc=DATE_P(day=18, hour=idx, minute=0)
+                )
+            ],
+        )
+        for idx in (1, 2, 1)
+    ]
+
+    fleet = DropmateFleet(dropmates)
+    assert len(fleet) == 1
+    assert len(fleet["A1"].drops) == 2
@@ -0,0 +1,273 @@
+import gzip
+import io
+import lzma
+import os
+import sys
+import tarfile
+import typing as t
+import zipfile
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py import parser
+from dropmate_py.log_io import (
+    LogSource,
+    STDIN_PATH,
+    iter_columns,
+    iter_log_sources,
+    sequential_archive_reads,
+)
+from dropmate_py.log_utils import consolidate_drop_records
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A2,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+def test_compressed_source_iter_lines(tmp_path: Path) -> None:
+    gz_log = tmp_path / "log.csv.gz"
+    gz_log.write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+    xz_log = tmp_path / "log.csv.xz"
+    xz_log.write_bytes(lzma.compress(SAMPLE_LOG.encode()))
+
+    assert list(LogSource(gz_log).iter_lines()) == SAMPLE_LOG.splitlines()
+    assert list(LogSource(xz_log).iter_lines()) == SAMPLE_LOG.splitlines()
+
+
+def test_compressed_parse_pipeline(tmp_path: Path) -> None:
+    gz_log = tmp_path / "log.csv.gz"
+    gz_log.write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+
+    grouped_records = parser.log_parse_pipeline(gz_log)
+    assert [rec.uid for rec in grouped_records] == ["A1", "A2"]
+
+
+def test_archive_parse_pipeline(tmp_path: Path) -> None:
+    zip_log = tmp_path / "logs.zip"
+    with zipfile.ZipFile(zip_log, "w") as archive:
+        archive.writestr("a/log_1.csv", SAMPLE_LOG)
+        archive.writestr("a/log_2.csv", SAMPLE_LOG.replace("A1", "A3"))
+
+    grouped_records = parser.log_parse_pipeline(zip_log)
+    assert [rec.uid for rec in grouped_records] == ["A1", "A2", "A3"]
+    assert len(grouped_records[1].drops) == 2
+
+
+def test_iter_log_sources_archive_members(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_plain.csv").write_text(SAMPLE_LOG)
+    (tmp_path / "dropmate_records_gz.csv.gz").write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as archive:
+        archive.writestr("nested/dropmate_records_zip.csv", SAMPLE_LOG)
+        archive.writestr("nested/readme.txt", "not a log")
+
+    member_log = tmp_path / "dropmate_records_tar.csv"
+    member_log.write_text(SAMPLE_LOG)
+    with tarfile.open(tmp_path / "bundle.tar.gz", "w:gz") as tar:
+        tar.add(member_log, arcname="dropmate_records_tar.csv")
+    member_log.unlink()
+
+    sources = list(iter_log_sources(tmp_path, "dropmate_records_*"))
+    assert sorted(s.member or s.path.name for s in sources) == [
+        "dropmate_records_gz.csv.gz",
+        "dropmate_records_plain.csv",
+        "dropmate_records_tar.csv",
+        "nested/dropmate_records_zip.csv",
+    ]
+
+    for source in sources:
+        assert list(source.iter_lines()) == SAMPLE_LOG.splitlines()
+
+
+def _write_multi_member_tar(tar_filepath: Path, uid_prefix: str = "B") -> None:
+    with tarfile.open(tar_filepath, "w:gz") as tar:
+        for idx in range(5):
+            member_log = SAMPLE_LOG.replace("A1", f"{uid_prefix}{idx}").encode()
+            info = tarfile.TarInfo(f"dropmate_records_{idx}.csv")
+            info.size = len(member_log)
+            tar.addfile(info, io.BytesIO(member_log))
+
+
+@pytest.fixture
+def multi_member_tar(tmp_path: Path) -> Path:
+    tar_filepath = tmp_path / "bundle.tar.gz"
+    _write_multi_member_tar(tar_filepath)
+    return tar_filepath
+
+
+def test_tar_members_single_pass(monkeypatch: pytest.MonkeyPatch, multi_member_tar: Path) -> None:
+    tar_opens = []
+    tar_open = tarfile.open
+
+    def counting_open(*args: t.Any, **kwargs: t.Any) -> tarfile.TarFile:
+        tar_opens.append(kwargs.get("mode"))
+        return tar_open(*args, **kwargs)
+
+    monkeypatch.setattr(tarfile, "open", counting_open)
+    grouped_records = parser.log_parse_pipeline(multi_member_tar)
+    assert [rec.uid for rec in grouped_records] == ["A2", "B0", "B1", "B2", "B3", "B4"]
+
+    # One pass to list the members & one to read them, regardless of the number of members
+    assert len(tar_opens) == 2
+
+
+def test_tar_members_out_of_order(multi_member_tar: Path) -> None:
+    sources = list(iter_log_sources(multi_member_tar.parent, "dropmate_records_*"))
+    assert len(sources) == 5
+
+    # Members behind the stream start a new pass, members opened concurrently get their own pass
+    with sources[3].open() as later, sources[1].open() as earlier:
+        assert "B3" in later.read()
+        assert "B1" in earlier.read()
+
+    for idx, source in reversed(list(enumerate(sources))):
+        assert f"B{idx}" in "\n".join(source.iter_lines())
+
+
+def test_tar_streams_closed(monkeypatch: pytest.MonkeyPatch, multi_member_tar: Path) -> None:
+    open_tars = set()
+    tar_open = tarfile.open
+    tar_close = tarfile.TarFile.close
+
+    def tracking_open(*args: t.Any, **kwargs: t.Any) -> tarfile.TarFile:
+        tar = tar_open(*args, **kwargs)
+        open_tars.add(tar)
+        return tar
+
+    def tracking_close(tar: tarfile.TarFile) -> None:
+        open_tars.discard(tar)
+        tar_close(tar)
+
+    monkeypatch.setattr(tarfile, "open", tracking_open)
+    monkeypatch.setattr(tarfile.TarFile, "close", tracking_close)
+    sources = list(iter_log_sources(multi_member_tar.parent, "dropmate_records_*"))
+
+    # Partially read members don't leave their archive open, with or without a shared pass
+    with sources[0].open() as f:
+        f.readline()
+    assert not open_tars
+
+    with sequential_archive_reads():
+        for source in sources[:3]:
+            with source.open() as f:
+                f.readline()
+
+        assert len(open_tars) == 1
+
+    assert not open_tars
+
+
+def test_tar_modified_during_pass(multi_member_tar: Path) -> None:
+    sources = list(iter_log_sources(multi_member_tar.parent, "dropmate_records_*"))
+    with sequential_archive_reads():
+        assert "B0" in "\n".join(sources[0].iter_lines())
+
+        _write_multi_member_tar(multi_member_tar, uid_prefix="NEW")
+        stat = multi_member_tar.stat()
+        os.utime(multi_member_tar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert "NEW1" in "\n".join(sources[1].iter_lines())
+
+
+def test_tar_member_missing_raises(multi_member_tar: Path) -> None:
+    with pytest.raises(KeyError, match="not found"):
+        with LogSource(multi_member_tar, "missing.csv").open():
+            pass
+
+
+def test_consolidate_compressed_logs(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_1.csv.gz").write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as archive:
+        archive.writestr("dropmate_records_2.csv", SAMPLE_LOG.replace("A2", "A3"))
+
+    consolidated = consolidate_drop_records(
+        tmp_path, log_pattern="dropmate_records_*", out_filepath=Path(), write_file=False
+    )
+    assert [rec.split(",")[0] for rec in consolidated] == ["A1", "A2", "A3"]
+
+
+def test_open_mapped_unmappable(tmp_path: Path) -> None:
+    gz_log = tmp_path / "log.csv.gz"
+    gz_log.write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+    empty_log = tmp_path / "empty.csv"
+    empty_log.touch()
+
+    for log_filepath in (gz_log, empty_log):
+        with LogSource(log_filepath).open_mapped() as buffer:
+            assert buffer is None
+
+
+def test_iter_columns(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_bytes(SAMPLE_LOG.replace("\n", "\r\n").encode())
+
+    with LogSource(log_filepath).open_mapped() as buffer:
+        assert buffer is not None
+        buffer.readline()
+        assert list(iter_columns(buffer, [19, 1])) == [(b"1.5.16", b"A1"), (b"1.5.16", b"A2")]
+
+        buffer.seek(0)
+        buffer.readline()
+        rows = iter_columns(buffer, [1], line_filter=lambda line: b"A2" in line)
+        assert list(rows) == [(b"A2",)]
+
+
+@pytest.mark.parametrize("batch_convert", (False, True))
+def test_mapped_parse_matches_streamed(tmp_path: Path, batch_convert: bool) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LOG.replace("A1", "a1"))
+    record_filter = parser.RecordFilter(uids=["A1"])
+
+    mapped = parser.log_parse_pipeline(log_filepath, batch_convert, record_filter)
+    streamed = parser._group_by_uid(
+        parser._parse_raw_log(LogSource(log_filepath).iter_lines(), batch_convert, record_filter)
+    )
+    assert mapped == streamed
+    assert [rec.uid for rec in mapped] == ["a1"]
+
+
+def test_consolidate_mapped_and_compressed_dedup(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_1.csv").write_text(SAMPLE_LOG)
+    (tmp_path / "dropmate_records_2.csv.gz").write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+
+    consolidated = consolidate_drop_records(
+        tmp_path, log_pattern="dropmate_records_*", out_filepath=Path(), write_file=False
+    )
+    assert consolidated == [
+        "A1,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0",
+        "A2,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0",
+    ]
+
+
+@pytest.fixture
+def sample_stdin(monkeypatch: pytest.MonkeyPatch) -> io.TextIOWrapper:
+    stdin = io.TextIOWrapper(io.BytesIO(SAMPLE_LOG.encode()))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    return stdin
+
+
+def test_stdin_source(sample_stdin: io.TextIOWrapper) -> None:
+    source = LogSource(STDIN_PATH)
+    assert source.is_stdin
+    assert source.name == "<stdin>"
+
+    with source.open_mapped() as buffer:
+        assert buffer is None
+
+    assert list(source.iter_lines()) == SAMPLE_LOG.splitlines()
+    assert not sample_stdin.closed
+
+
+def test_iter_log_sources_stdin() -> None:
+    assert list(iter_log_sources(STDIN_PATH, "*.csv")) == [LogSource(STDIN_PATH)]
+
+
+@pytest.mark.usefixtures("sample_stdin")
+def test_stdin_parse_pipeline() -> None:
+    grouped_records = parser.log_parse_pipeline(STDIN_PATH)
+    assert [rec.uid for rec in grouped_records] == ["A1", "A2"]
@@ -160,6 +160,85 @@ def test_merge_dropomates() -> None:
     assert len(merged) == 3
 
 
+SAMPLE_RESCANNED_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,3,2023-04-22T11:00:00Z,2023-04-22T11:30:00Z,1000,0,2023-04-22T12:30:20Z,2023-04-22T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+def test_group_by_uid_scan_history() -> None:
+    dropmates = parser._group_by_uid(parser._parse_raw_log(SAMPLE_RESCANNED_LOG.splitlines()))
+    scan_history = dropmates[0].scan_history
+
+    assert len(scan_history) == 2
+    assert scan_history.drift_rate_sec_per_day() == pytest.approx(10)
+
+
+def test_merge_dropmates_scan_history() -> None:
+    first_scan, second_scan = (
+        parser._group_by_uid(parser._parse_raw_log([SAMPLE_RESCANNED_LOG.splitlines()[0], line]))
+        for line in SAMPLE_RESCANNED_LOG.splitlines()[1::2]
+    )
+    assert len(first_scan[0].scan_history) == 1
+
+    merged = parser.merge_dropmates([*first_scan, *second_scan, *first_scan])
+    assert len(merged[0].scan_history) == 2
+    assert merged[0].scan_history.drift_rate_sec_per_day() == pytest.approx(10)
+
+
+LATEST_SCANNED_TIME = dt.datetime(2023, 4, 22, 12, 30, tzinfo=dt.timezone.utc)
+LATEST_INTERNAL_TIME = dt.datetime(2023, 4, 22, 12, 30, 20, tzinfo=dt.timezone.utc)
+
+
+def test_group_by_uid_latest_scan() -> None:
+    dropmates = parser._group_by_uid(parser._parse_raw_log(SAMPLE_RESCANNED_LOG.splitlines()))
+    assert dropmates[0].last_scanned_time_utc == LATEST_SCANNED_TIME
+    assert dropmates[0].dropmate_internal_time_utc == LATEST_INTERNAL_TIME
+
+
+def test_merge_dropmates_latest_scan() -> None:
+    header, first_drop, *_, rescanned_drop = SAMPLE_RESCANNED_LOG.splitlines()
+    # Rescan the first drop, so the latest scan is only retained if its duplicate record is kept
+    rescanned_drop = rescanned_drop.replace(",3,2023-04-22T11:00:00Z", ",1,2023-04-20T11:00:00Z")
+    first_scan, second_scan = (
+        parser._group_by_uid(parser._parse_raw_log([header, line]))
+        for line in (first_drop, rescanned_drop)
+    )
+
+    for dropmates in ([*first_scan, *second_scan], [*second_scan, *first_scan]):
+        merged = parser.merge_dropmates(dropmates)
+        assert len(merged[0].drops) == 1
+        assert merged[0].last_scanned_time_utc == LATEST_SCANNED_TIME
+        assert merged[0].dropmate_internal_time_utc == LATEST_INTERNAL_TIME
+
+
+SCAN_HISTORY_CASES: tuple[tuple[list[tuple[float, float]], float | None], ...] = (
+    ([], None),
+    ([(0.0, 10.0)], None),
+    ([(0.0, 10.0), (0.0, 20.0)], None),
+    ([(0.0, 0.0), (86_400.0, 86_410.0), (172_800.0, 172_820.0)], 10),
+    ([(1.7e9 + 172_800, 1.7e9 + 172_800), (1.7e9, 1.7e9 + 60)], -30),
+)
+
+
+@pytest.mark.parametrize(("scans", "truth_rate"), SCAN_HISTORY_CASES)
+def test_scan_history_drift_rate(
+    scans: list[tuple[float, float]], truth_rate: float | None
+) -> None:
+    scan_history = parser.ScanHistory.from_pairs(scans)
+    assert list(scan_history) == sorted(scans)
+
+    drift_rate = scan_history.drift_rate_sec_per_day()
+    if truth_rate is None:
+        assert drift_rate is None
+    else:
+        assert drift_rate == pytest.approx(truth_rate)
+
+
 SAMPLE_EMPTY_RECORD = "0,e123456067a65241,good,good,5.1,on,on,0,0,0,na,na,na,na,na,2023-04-20T13:02:41Z,2023-04-20T17:49:09Z,iPhone 14 Pro Max,16.6,1.4"
 EMPTY_LOG_NONE_COLS = {
     "flight_index",
@@ -189,3 +268,81 @@ def test_empty_dropmate_zero_len() -> None:
     )
 
     assert len(dm) == 0
+
+
+def test_convert_column() -> None:
+    raw_column = ["2023-04-20T12:30:00Z", "na", "2023-04-20T12:30:00Z"]
+    converted = parser.convert_column(raw_column, dt.datetime.fromisoformat)
+
+    truth_ts = dt.datetime(2023, 4, 20, 12, 30, tzinfo=dt.timezone.utc)
+    assert converted == [truth_ts, None, truth_ts]
+    assert converted[0] is converted[2]
+
+
+def test_convert_column_disallow_na_raises() -> None:
+    with pytest.raises(ValueError):
+        parser.convert_column(["5.1", "na"], float, allow_na=False)
+
+
+def test_batch_convert_parse_matches_serial() -> None:
+    log_lines = SAMPLE_CONSOLIDATED_LOG.splitlines()
+    log_lines.append(SAMPLE_EMPTY_RECORD)
+
+    serial_records = parser._parse_raw_log(log_lines)
+    batch_records = parser._parse_raw_log(log_lines, batch_convert=True)
+    assert len(batch_records) == len(serial_records)
+    for serial, batch in zip(serial_records, batch_records, strict=True):
+        for i in fields(serial):
+            assert getattr(serial, i.name) == getattr(batch, i.name), f"Mismatch for field {i.name}"
+
+
+def test_batch_convert_missing_column_raises() -> None:
+    log_lines = [SAMPLE_FULL_HEADER.replace("device_health", "foo"), SAMPLE_DATA_LINE]
+    with pytest.raises(KeyError):
+        parser._parse_raw_log(log_lines, batch_convert=True)
+
+
+NORMALIZE_TIMESTAMP_CASES = (
+    ("2023-04-20", "2023-04-20"),
+    ("2023-04-20T11:00", "2023-04-20T11:00:00"),
+    ("2023-04-20T11:00:00Z", "2023-04-20T11:00:00"),
+    ("2023-04-20T13:00:00+02:00", "2023-04-20T11:00:00"),
+)
+
+
+@pytest.mark.parametrize(("timestamp", "truth_normalized"), NORMALIZE_TIMESTAMP_CASES)
+def test_normalize_timestamp(timestamp: str, truth_normalized: str) -> None:
+    assert parser.normalize_timestamp(timestamp) == truth_normalized
+
+
+SAMPLE_FILTER_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-19T11:00:00Z,2023-04-19T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A2,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A3,Good,good,5.1,true,true,0,0,0,na,na,na,na,na,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+RECORD_FILTER_CASES = (
+    (parser.RecordFilter(), [("A1", 1), ("A1", 2), ("A2", 1), ("A3", None)]),
+    (parser.RecordFilter(uids=["a1", "A3"]), [("A1", 1), ("A1", 2), ("A3", None)]),
+    (parser.RecordFilter(since="2023-04-20"), [("A1", 2), ("A2", 1)]),
+    (parser.RecordFilter(until="2023-04-20"), [("A1", 1)]),
+    (parser.RecordFilter(until="2023-04-20T11:00:00Z"), [("A1", 1)]),
+    (parser.RecordFilter(since="2023-04-20T11:00:00Z"), [("A1", 2), ("A2", 1)]),
+    (parser.RecordFilter(uids=["A2"], since="2023-04-20", until="2023-04-21"), [("A2", 1)]),
+)
+
+
+@pytest.mark.parametrize(("record_filter", "truth_keys"), RECORD_FILTER_CASES)
+def test_record_filter(record_filter: parser.RecordFilter, truth_keys: list[tuple]) -> None:
+    parsed = parser._parse_raw_log(SAMPLE_FILTER_LOG.splitlines(), record_filter=record_filter)
+    assert [(rec.uid, rec.flight_index) for rec in parsed] == truth_keys
+
+
+def test_record_filter_missing_column_raises() -> None:
+    indices = parser.ColumnIndices.from_header(SAMPLE_FULL_HEADER.replace("start_time_utc", "foo"))
+    with pytest.raises(KeyError):
+        parser.RecordFilter(since="2023-04-20").compile(indices)
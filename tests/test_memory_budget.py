@@ -0,0 +1,69 @@
+import tracemalloc
+
+import pytest
+
+from dropmate_py import mem_profile
+
+# Memory budgets per input drop record, in bytes
+# Budgets are set with some headroom above measured usage; if a change legitimately increases
+# memory usage then these should be updated along with the change
+BYTES_PER_RECORD_BUDGET = {
+    "parse": 600,
+    "parse_batch": 400,
+    "merge": 100,
+    "audit": 50,
+    "consolidate": 250,
+}
+PEAK_BYTES_PER_RECORD_BUDGET = {
+    "parse": 600,
+    "parse_batch": 1_500,
+    "merge": 250,
+    "audit": 50,
+    "consolidate": 600,
+}
+
+
+@pytest.fixture(scope="module")
+def stage_memory() -> dict[str, mem_profile.StageMemory]:
+    return {stage.stage: stage for stage in mem_profile.profile_pipeline(n_devices=200)}
+
+
+@pytest.mark.parametrize(("stage", "budget"), BYTES_PER_RECORD_BUDGET.items())
+def test_retained_memory_budget(
+    stage_memory: dict[str, mem_profile.StageMemory], stage: str, budget: int
+) -> None:
+    measured = stage_memory[stage]
+    assert measured.bytes_per_record <= budget
+
+
+@pytest.mark.parametrize(("stage", "budget"), PEAK_BYTES_PER_RECORD_BUDGET.items())
+def test_peak_memory_budget(
+    stage_memory: dict[str, mem_profile.StageMemory], stage: str, budget: int
+) -> None:
+    measured = stage_memory[stage]
+    assert measured.peak_bytes_per_record <= budget
+
+
+def test_synthetic_log_lines() -> None:
+    log_lines = mem_profile.synthetic_log_lines(n_devices=3, drops_per_device=2)
+    assert len(log_lines) == 7
+    assert log_lines[0] == mem_profile.SYNTHETIC_HEADER
+
+
+def test_trace_stage_preserves_tracing() -> None:
+    tracemalloc.start()
+    try:
+        stage = mem_profile.trace_stage("alloc", 1, lambda: [0] * 1_000)
+        assert tracemalloc.is_tracing()
+        assert stage.retained_bytes > 0
+    finally:
+        tracemalloc.stop()
+
+    assert not tracemalloc.is_tracing()
+    mem_profile.trace_stage("alloc", 1, lambda: None)
+    assert not tracemalloc.is_tracing()
+
+
+def test_peak_rss() -> None:
+    rss = mem_profile.peak_rss_bytes()
+    assert rss is None or rss > 0
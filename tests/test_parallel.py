@@ -0,0 +1,88 @@
+import gzip
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parallel import bucket_index, consolidate_drop_records_parallel
+from dropmate_py.parser import RecordFilter
+from dropmate_py.progress import ProgressReport
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,good,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path: Path) -> Path:
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+
+    for idx in range(12):
+        log = SAMPLE_LOG.replace("A", "ABCDEF"[idx % 6])
+        # Later duplicates of a drop disagree with the first occurrence, so first-seen must win
+        if idx >= 6:
+            log = log.replace(",1000,", f",{idx}000,")
+        (log_dir / f"log_{idx:02d}.csv").write_text(log)
+
+    with gzip.open(log_dir / "log_gz.csv.gz", "wt") as f:
+        f.write(SAMPLE_LOG.replace("A", "G"))
+
+    return log_dir
+
+
+@pytest.mark.parametrize("n_buckets", (1, 3, 64))
+def test_parallel_consolidate_matches_serial(log_dir: Path, tmp_path: Path, n_buckets: int) -> None:
+    truth_filepath = tmp_path / "truth.csv"
+    truth = consolidate_drop_records(log_dir, "*.csv", truth_filepath)
+    assert len(truth) == 21
+
+    out_filepath = tmp_path / "out.csv"
+    consolidated = consolidate_drop_records_parallel(
+        log_dir, "*.csv", out_filepath, max_workers=2, n_buckets=n_buckets
+    )
+    assert consolidated == truth
+    assert out_filepath.read_bytes() == truth_filepath.read_bytes()
+
+
+def test_parallel_consolidate_filter_progress(log_dir: Path, tmp_path: Path) -> None:
+    record_filter = RecordFilter(uids={"a1", "G2"})
+    truth_reports: list[ProgressReport] = []
+    truth = consolidate_drop_records(
+        log_dir,
+        "*.csv",
+        tmp_path / "out.csv",
+        write_file=False,
+        record_filter=record_filter,
+        progress=truth_reports.append,
+    )
+
+    reports: list[ProgressReport] = []
+    consolidated = consolidate_drop_records_parallel(
+        log_dir,
+        "*.csv",
+        tmp_path / "out.csv",
+        write_file=False,
+        record_filter=record_filter,
+        max_workers=2,
+        progress=reports.append,
+    )
+    assert consolidated == truth
+
+    final, truth_final = reports[-1], truth_reports[-1]
+    assert final.final
+    assert (final.files_done, final.rows, final.bytes_read) == (
+        truth_final.files_done,
+        truth_final.rows,
+        truth_final.bytes_read,
+    )
+
+
+def test_bucket_index_ignores_flight_index() -> None:
+    assert bucket_index((b"A1", b"1"), 64) == bucket_index((b"A1", b"2"), 64)
@@ -0,0 +1,116 @@
+import gzip
+import itertools
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.log_io import iter_log_sources
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import RecordFilter, log_parse_pipeline
+from dropmate_py.progress import ProgressReport, ProgressTracker
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,good,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+N_BODY_BYTES = len(SAMPLE_LOG) - len(SAMPLE_LOG.splitlines()[0]) - 1
+
+
+def test_tracker_throttles_reports() -> None:
+    reports: list[ProgressReport] = []
+    now = [0.0]
+    tracker = ProgressTracker(reports.append, n_files=2, interval_sec=1, clock=lambda: now[-1])
+
+    lines = list(tracker.track_lines(["abc"] * 10_000))
+    assert len(lines) == 10_000
+    assert reports == []
+
+    now.append(2)
+    tracker.finish_file()
+    assert len(reports) == 1
+    assert (reports[0].files_done, reports[0].rows, reports[0].bytes_read) == (1, 10_000, 40_000)
+    assert reports[0].eta_sec == pytest.approx(2)
+
+    tracker.close()
+    assert reports[-1].final
+    assert reports[-1].eta_sec == 0
+
+
+ETA_CASES = (
+    (ProgressReport(0, 4, 0, 0, 0, None, 1), None),
+    (ProgressReport(1, 4, 0, 0, 0, None, 1), 3),
+    (ProgressReport(1, 4, 0, 0, 25, 100, 1), 3),
+    (ProgressReport(1, None, 0, 0, 25, None, 1), None),
+)
+
+
+@pytest.mark.parametrize(("report", "truth_eta"), ETA_CASES)
+def test_report_eta(report: ProgressReport, truth_eta: float | None) -> None:
+    assert report.eta_sec == truth_eta
+
+
+@pytest.fixture
+def log_dir(tmp_path: Path) -> Path:
+    (tmp_path / "log_1.csv").write_text(SAMPLE_LOG)
+    with gzip.open(tmp_path / "log_2.csv.gz", "wt") as f:
+        f.write(SAMPLE_LOG.replace("A", "B"))
+
+    return tmp_path
+
+
+def test_parse_pipeline_progress(log_dir: Path) -> None:
+    reports: list[ProgressReport] = []
+    record_filter = RecordFilter(uids={"A1", "B1"})
+    sources = list(iter_log_sources(log_dir, "*.csv"))
+    tracker = ProgressTracker.for_sources(sources, reports.append)
+    assert tracker.total_bytes is None
+
+    for source in sources:
+        log_parse_pipeline(source, record_filter=record_filter, progress=tracker)
+
+    tracker.close()
+    final = reports[-1]
+    assert (final.files_done, final.n_files, final.rows, final.records) == (2, 2, 6, 4)
+    assert final.bytes_read == 2 * N_BODY_BYTES
+
+
+@pytest.mark.parametrize("batch_convert", (False, True))
+def test_parse_pipeline_progress_callback(tmp_path: Path, batch_convert: bool) -> None:
+    log_filepath = tmp_path / "log_1.csv"
+    log_filepath.write_text(SAMPLE_LOG)
+
+    reports: list[ProgressReport] = []
+    log_parse_pipeline(log_filepath, batch_convert=batch_convert, progress=reports.append)
+    final = reports[-1]
+    assert final.final
+    assert (final.files_done, final.rows, final.records) == (1, 3, 3)
+    assert final.total_bytes == len(SAMPLE_LOG)
+
+
+def test_consolidate_progress(log_dir: Path) -> None:
+    reports: list[ProgressReport] = []
+    consolidated = consolidate_drop_records(
+        log_dir,
+        "*.csv",
+        log_dir / "out.csv",
+        write_file=False,
+        record_filter=RecordFilter(uids={"A2", "B2"}),
+        progress=reports.append,
+    )
+    assert len(consolidated) == 2
+
+    final = reports[-1]
+    assert (final.files_done, final.rows, final.records) == (2, 6, 2)
+    assert final.bytes_read == 2 * N_BODY_BYTES
+
+
+def test_track_records_batches() -> None:
+    tracker = ProgressTracker(lambda report: None)
+    records = tracker.track_records(range(10_000))
+    assert list(itertools.islice(records, 10)) == list(range(10))
+    assert tracker.records == 4096
@@ -0,0 +1,178 @@
+import gzip
+import typing as t
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.audit_errors import AltitudeLossError, EmptyDropLogError
+from dropmate_py.log_io import LogSource, iter_log_sources
+from dropmate_py.parser import RecordFilter, log_parse_pipeline
+from dropmate_py.sampling import (
+    UidSample,
+    estimate_error_rates,
+    sample_uids,
+    scan_uids,
+    uid_hash,
+    wilson_interval,
+)
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    0,ABC123,Good,good,5.1,true,true,2,0,2,1,2023-04-20T15:24:00Z,2023-04-20T15:25:00Z,1500,300,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    0,ABC123,Good,good,5.1,true,true,2,0,2,2,2023-04-20T16:18:00Z,2023-04-20T16:19:00Z,1400,200,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    0,abc456,Good,good,5.1,true,true,1,0,1,1,2023-04-20T14:00:00Z,2023-04-20T14:01:00Z,1500,300,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    0,DEF789,Good,good,5.1,true,true,0,0,0,na,na,na,na,na,2023-04-20T16:13:01Z,2023-04-20T16:13:31.061Z,SM S901U1,31,1.5.16
+    """
+)
+
+FLEET_UIDS = [f"uid{idx:04d}" for idx in range(1_000)]
+
+
+def test_scan_uids(tmp_path: Path) -> None:
+    (tmp_path / "log_a.csv").write_text(SAMPLE_LOG)
+    (tmp_path / "log_b.csv.gz").write_bytes(gzip.compress(SAMPLE_LOG.encode()))
+
+    uids = scan_uids(iter_log_sources(tmp_path, "log_*.csv"))
+    assert uids == {"abc123", "abc456", "def789"}
+
+
+def test_scan_uids_filtered(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LOG)
+
+    record_filter = RecordFilter(since="2023-04-20T15:00:00Z")
+    assert scan_uids([LogSource(log_filepath)], record_filter) == {"abc123"}
+
+
+def test_scan_uids_empty_log(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.touch()
+    assert scan_uids([LogSource(log_filepath)]) == set()
+
+
+def test_uid_hash_normalized() -> None:
+    assert uid_hash("ABC123") == uid_hash(" abc123")
+    assert uid_hash("abc123", seed=1) != uid_hash("abc123")
+
+
+def test_sample_size() -> None:
+    sample = sample_uids(FLEET_UIDS, n=100)
+    assert len(sample) == 100
+    assert sample.population == len(FLEET_UIDS)
+
+
+def test_sample_order_independent() -> None:
+    assert sample_uids(FLEET_UIDS, n=50) == sample_uids(FLEET_UIDS[::-1], n=50)
+    assert sample_uids(FLEET_UIDS, n=50) != sample_uids(FLEET_UIDS, n=50, seed=1)
+
+
+def test_sample_larger_than_population() -> None:
+    sample = sample_uids(FLEET_UIDS[:10], n=100)
+    assert sample.uids == frozenset(FLEET_UIDS[:10])
+
+
+def test_sample_frac() -> None:
+    sample = sample_uids(FLEET_UIDS, frac=0.2)
+    assert 150 < len(sample) < 250
+
+    # Fractional samples are nested, so increasing the fraction only adds devices
+    assert sample.uids <= sample_uids(FLEET_UIDS, frac=0.5).uids
+    assert len(sample_uids(FLEET_UIDS, frac=1)) == len(FLEET_UIDS)
+
+
+SAMPLE_SPEC_CASES: tuple[tuple[dict[str, float], str], ...] = (
+    ({}, "Exactly one"),
+    ({"n": 10, "frac": 0.1}, "Exactly one"),
+    ({"n": 0}, "at least 1"),
+    ({"frac": 0}, r"\(0, 1\]"),
+    ({"frac": 1.5}, r"\(0, 1\]"),
+)
+
+
+@pytest.mark.parametrize(("kwargs", "match"), SAMPLE_SPEC_CASES)
+def test_sample_spec_raises(kwargs: dict[str, t.Any], match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        sample_uids(FLEET_UIDS, **kwargs)
+
+
+def test_sample_record_filter(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LOG)
+
+    sample = UidSample(uids=frozenset(("abc123", "def789")), population=3)
+    record_filter = sample.record_filter(RecordFilter(since="2023-04-20T15:00:00Z"))
+    assert record_filter.since == "2023-04-20T15:00:00"
+
+    dropmates = log_parse_pipeline(log_filepath, record_filter=record_filter)
+    assert [dropmate.uid for dropmate in dropmates] == ["ABC123"]
+
+
+@pytest.mark.parametrize("log_filename", ("log.csv", "log.csv.gz"))
+def test_sample_non_ascii_uid(tmp_path: Path, log_filename: str) -> None:
+    log_filepath = tmp_path / log_filename
+    log = SAMPLE_LOG.replace("abc456", "Ä3")
+    log_filepath.write_bytes(
+        gzip.compress(log.encode()) if log_filename.endswith(".gz") else log.encode()
+    )
+
+    # Sampled UIDs are normalized, so must still select their records from the undecoded log
+    sample = sample_uids(scan_uids(iter_log_sources(tmp_path, log_filename)), frac=1)
+    assert "ä3" in sample.uids
+
+    dropmates = log_parse_pipeline(log_filepath, record_filter=sample.record_filter())
+    assert sorted(dropmate.uid for dropmate in dropmates) == ["ABC123", "DEF789", "Ä3"]
+
+
+def test_wilson_interval() -> None:
+    # Reference interval for 10/100 without a finite population correction
+    lower, upper = wilson_interval(10, 100, population=10**12)
+    assert lower == pytest.approx(0.0552, abs=1e-4)
+    assert upper == pytest.approx(0.1744, abs=1e-4)
+
+
+def test_wilson_interval_finite_population() -> None:
+    lower, upper = wilson_interval(10, 100, population=200)
+    unbounded_lower, unbounded_upper = wilson_interval(10, 100, population=10**12)
+    assert unbounded_lower < lower < 0.1 < upper < unbounded_upper
+
+
+def test_wilson_interval_full_population() -> None:
+    assert wilson_interval(10, 100, population=100) == (0.1, 0.1)
+
+
+def test_wilson_interval_no_errors() -> None:
+    lower, upper = wilson_interval(0, 100, population=10_000)
+    assert lower == 0
+    assert 0 < upper < 0.05
+
+
+def test_estimate_error_rates(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LOG)
+    abc123, _, def789 = log_parse_pipeline(log_filepath)
+
+    found_errs = [
+        EmptyDropLogError(def789),
+        AltitudeLossError(abc123, abc123.drops[0], 100),
+        AltitudeLossError(abc123, abc123.drops[1], 100),
+    ]
+    sample = UidSample(uids=frozenset(("abc123", "abc456", "def789")), population=30)
+    estimates = estimate_error_rates(found_errs, sample)
+
+    assert [estimate.error_type for estimate in estimates] == [
+        "AltitudeLossError",
+        "EmptyDropLogError",
+    ]
+
+    # Multiple errors of the same type for a device are only counted once
+    altitude_loss = estimates[0]
+    assert altitude_loss.n_flagged == 1
+    assert altitude_loss.rate == pytest.approx(1 / 3)
+    assert altitude_loss.estimated_devices == pytest.approx(10)
+    assert altitude_loss.lower < altitude_loss.rate < altitude_loss.upper
+
+
+def test_estimate_error_rates_empty_sample() -> None:
+    assert estimate_error_rates([], UidSample(uids=frozenset(), population=10)) == []
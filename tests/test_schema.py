@@ -0,0 +1,231 @@
+import datetime as dt
+import gzip
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.checkpoint import WorkDir
+from dropmate_py.log_utils import consolidate_drop_records
+from dropmate_py.parser import Health, RecordFilter, log_parse_pipeline
+from dropmate_py.schema import (
+    CompiledSchema,
+    SchemaAdapter,
+    UnsupportedSchemaError,
+    compile_schema,
+    normalize_legacy_timestamp,
+)
+
+CURRENT_HEADER = "serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version"
+
+SAMPLE_LEGACY_SCAN_TIMES = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time,last_scanned_time
+    0,ABC123,good,good,5.1,on,on,2,0,2,1,2023-Apr-20T14-48-53Z,2023-Apr-20T14-50-00Z,1500,300,2023-Apr-20T18-09-28Z,2023-Apr-20T18-17-12Z
+    0,ABC123,good,good,5.1,on,on,2,0,2,2,2023-Apr-20T16-00-00Z,2023-Apr-20T16-02-00Z,1500,200,2023-Apr-20T18-09-28Z,2023-Apr-20T18-17-12Z
+    """
+)
+
+SAMPLE_LEGACY_PRIOR_FLIGHTS = dedent(
+    """\
+    uid,battery,prior_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc
+    DEF456,good,1,1,2023-Apr-20T14-53-00Z,2023-Apr-20T14-55-00Z,1500,200,2023-Apr-20T18-13-18Z,2023-Apr-20T18-16-56Z
+    """
+)
+
+# The earliest prior_flights exports, which also lack scan timestamps
+SAMPLE_LEGACY_NO_SCAN_TIMES = dedent(
+    """\
+    serial_number,uid,battery,log_timestamp,log_altitude,total_flights,prior_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft
+    5,E00227006796B05F,Good,on,on,7,0,0,7,1,2023-Apr-20T14-48-53Z,2023-Apr-20T14-56-07Z,5364,1444
+    """
+)
+
+SAMPLE_CURRENT = dedent(
+    f"""\
+    {CURRENT_HEADER}
+    0,ABC123,Good,good,5.1,true,true,3,0,3,3,2023-04-20T17:00:00Z,2023-04-20T17:01:00Z,1300,100,2023-04-20T18:09:28Z,2023-04-20T18:17:12Z,SM S901U1,31,1.5.16
+    """
+)
+
+
+def test_normalize_legacy_timestamp() -> None:
+    assert normalize_legacy_timestamp("2023-Apr-20T14-48-53Z") == "2023-04-20T14:48:53Z"
+
+
+NON_LEGACY_TIMESTAMPS = ("2023-04-20T14:48:53Z", "2023-04-20T14:48:53.061Z", "na", "")
+
+
+@pytest.mark.parametrize("raw_timestamp", NON_LEGACY_TIMESTAMPS)
+def test_normalize_legacy_timestamp_passthrough(raw_timestamp: str) -> None:
+    assert normalize_legacy_timestamp(raw_timestamp) == raw_timestamp
+
+
+def test_current_header_unadapted() -> None:
+    schema = compile_schema(CURRENT_HEADER)
+    assert schema.adapters == ()
+    assert schema.plan(("uid", "flight_index")).adapt is None
+
+
+def test_compile_schema_cached() -> None:
+    # Headers differing only in whitespace & case share a signature
+    assert compile_schema(CURRENT_HEADER) is compile_schema(f" {CURRENT_HEADER.upper()}\r\n")
+
+
+def test_legacy_scan_times_renamed() -> None:
+    header = SAMPLE_LEGACY_SCAN_TIMES.splitlines()[0]
+    schema = compile_schema(header)
+
+    assert schema.adapters == ("legacy-scan-times",)
+    assert "dropmate_internal_time_utc" in schema.header.split(",")
+    assert "dropmate_internal_time" not in schema.header.split(",")
+
+
+def test_rename_skipped_if_current_present() -> None:
+    header = f"{CURRENT_HEADER},last_scanned_time"
+    schema = compile_schema(header)
+
+    assert schema.header.split(",").count("last_scanned_time_utc") == 1
+    assert schema.plan(("last_scanned_time",)).indices == (len(CURRENT_HEADER.split(",")),)
+
+
+def test_plan_defaults_derived_converters() -> None:
+    schema = compile_schema(SAMPLE_LEGACY_PRIOR_FLIGHTS.splitlines()[0])
+    assert schema.adapters == ("legacy-prior-flights", "missing-serial-number")
+
+    plan = schema.plan(("serial_number", "firmware_version", "start_time_utc"))
+    pick = plan.picker()
+    assert pick(SAMPLE_LEGACY_PRIOR_FLIGHTS.splitlines()[1]) == [
+        "DEF456",
+        "0",
+        "2023-04-20T14:53:00Z",
+    ]
+
+    assert plan.adapt_bytes((b"DEF456", b"2023-Apr-20T14-53-00Z")) == (
+        b"DEF456",
+        b"0",
+        b"2023-04-20T14:53:00Z",
+    )
+
+
+def test_plan_missing_column_raises() -> None:
+    schema = compile_schema("uid,flight_index")
+    with pytest.raises(KeyError, match="start_time_utc"):
+        schema.plan(("uid", "start_time_utc"))
+
+
+def test_plan_unsupported_column_raises() -> None:
+    schema = compile_schema(SAMPLE_LEGACY_NO_SCAN_TIMES.splitlines()[0])
+    with pytest.raises(UnsupportedSchemaError, match="without scan timestamps"):
+        schema.plan(("uid", "last_scanned_time_utc"))
+
+    # Columns the adapter can provide are still planned
+    assert schema.plan(("serial_number", "device_health")).indices == (0,)
+
+
+@pytest.mark.parametrize("batch_convert", (False, True))
+def test_parse_legacy_no_scan_times_rejected(tmp_path: Path, batch_convert: bool) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_NO_SCAN_TIMES)
+
+    with pytest.raises(UnsupportedSchemaError, match="dropmate_internal_time_utc"):
+        log_parse_pipeline(log_filepath, batch_convert=batch_convert)
+
+
+def test_legacy_no_scan_times_quarantined(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_NO_SCAN_TIMES)
+    work_dir = WorkDir(tmp_path / "work")
+
+    assert log_parse_pipeline(log_filepath, work_dir=work_dir) == []
+    assert [reject.line_number for reject in work_dir.rejects] == [1]
+    assert "without scan timestamps" in work_dir.rejects[0].error
+
+
+def test_custom_adapter() -> None:
+    adapter = SchemaAdapter(
+        name="device-uid", signature=frozenset(("device_uid",)), renames={"device_uid": "uid"}
+    )
+    schema = compile_schema("device_uid,flight_index", adapters=(adapter,))
+
+    assert isinstance(schema, CompiledSchema)
+    assert schema.adapters == ("device-uid",)
+    assert schema.plan(("uid",)).indices == (0,)
+
+
+@pytest.mark.parametrize("batch_convert", (False, True))
+def test_parse_legacy_scan_times(tmp_path: Path, batch_convert: bool) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_SCAN_TIMES)
+
+    dropmates = log_parse_pipeline(log_filepath, batch_convert=batch_convert)
+    assert len(dropmates) == 1
+
+    drops = dropmates[0].drops
+    assert [drop.flight_index for drop in drops] == [1, 2]
+    assert drops[0].start_time_utc == dt.datetime(2023, 4, 20, 14, 48, 53, tzinfo=dt.timezone.utc)
+    assert drops[0].last_scanned_time_utc == dt.datetime(
+        2023, 4, 20, 18, 17, 12, tzinfo=dt.timezone.utc
+    )
+
+
+def test_parse_compressed_matches_mapped(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_PRIOR_FLIGHTS)
+    gz_filepath = tmp_path / "log.csv.gz"
+    gz_filepath.write_bytes(gzip.compress(SAMPLE_LEGACY_PRIOR_FLIGHTS.encode()))
+
+    mapped = log_parse_pipeline(log_filepath)
+    streamed = log_parse_pipeline(gz_filepath)
+    assert mapped[0].drops == streamed[0].drops
+
+    drop = mapped[0].drops[0]
+    assert drop.serial_number == "DEF456"
+    assert drop.firmware_version == 0
+    assert drop.device_health is Health.UNKNOWN
+
+
+def test_legacy_health_not_cleared(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_PRIOR_FLIGHTS.replace(",good,", ",poor,"))
+
+    # Unreported device health is neither flagged nor cleared, unlike the reported battery health
+    errs = audit_pipeline(
+        log_parse_pipeline(log_filepath),
+        min_alt_loss_ft=200,
+        min_delta_to_next_sec=600,
+        min_firmware=5,
+        max_scanned_time_delta_sec=3600,
+    )
+    assert {type(err).__name__ for err in errs} == {"BatteryHealthError", "OutdatedFirmwareError"}
+
+
+def test_record_filter_legacy_start_time(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log.csv"
+    log_filepath.write_text(SAMPLE_LEGACY_SCAN_TIMES)
+
+    record_filter = RecordFilter(since="2023-04-20T15:00:00Z")
+    dropmates = log_parse_pipeline(log_filepath, record_filter=record_filter)
+    assert [drop.flight_index for drop in dropmates[0].drops] == [2]
+
+
+TRUTH_MIXED_CONSOLIDATED = dedent(
+    """\
+    uid,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft
+    ABC123,1,2023-04-20T14:48:53Z,2023-04-20T14:50:00Z,1500,300
+    ABC123,2,2023-04-20T16:00:00Z,2023-04-20T16:02:00Z,1500,200
+    ABC123,3,2023-04-20T17:00:00Z,2023-04-20T17:01:00Z,1300,100
+    DEF456,1,2023-04-20T14:53:00Z,2023-04-20T14:55:00Z,1500,200
+    """
+)
+
+
+def test_consolidate_mixed_versions(tmp_path: Path) -> None:
+    (tmp_path / "dropmate_records_a.csv").write_text(SAMPLE_LEGACY_SCAN_TIMES)
+    (tmp_path / "dropmate_records_b.csv").write_text(SAMPLE_LEGACY_PRIOR_FLIGHTS)
+    (tmp_path / "dropmate_records_c.csv").write_text(SAMPLE_CURRENT)
+
+    out_log = tmp_path / "out_log.csv"
+    consolidate_drop_records(tmp_path, log_pattern="dropmate_records_*", out_filepath=out_log)
+    assert out_log.read_text() == TRUTH_MIXED_CONSOLIDATED
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+import typing as t
+import urllib.error
+import urllib.request
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from dropmate_py import parser
+from dropmate_py import server as server_module
+from dropmate_py.log_io import LogSource
+from dropmate_py.parser import Dropmate
+from dropmate_py.server import FleetServer, FleetState
+
+SAMPLE_LOG = dedent(
+    """\
+    serial_number,uid,battery,device_health,firmware_version,log_timestamp,log_altitude,total_flights,flights_over_18kft,recorded_flights,flight_index,start_time_utc,end_time_utc,start_barometric_altitude_msl_ft,end_barometric_altitude_msl_ft,dropmate_internal_time_utc,last_scanned_time_utc,scan_device_type,scan_device_os,dropmate_app_version
+    cereal,A1,Good,good,5.1,true,true,3,0,3,1,2023-04-20T11:00:00Z,2023-04-20T11:30:00Z,1000,0,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal,A1,Good,good,5.1,true,true,3,0,3,2,2023-04-20T13:00:00Z,2023-04-20T13:30:00Z,1000,900,2023-04-20T12:30:00Z,2023-04-20T12:30:00Z,SM S901U1,31,1.5.16
+    cereal2,A2,Good,good,4.0,true,true,3,0,3,1,2023-04-21T11:00:00Z,2023-04-21T11:30:00Z,1000,0,2023-04-21T12:30:00Z,2023-04-21T12:30:00Z,SM S901U1,31,1.5.16
+    """
+)
+
+DEFAULT_THRESHOLDS = {
+    "min_alt_loss_ft": 200,
+    "min_delta_to_next_sec": 600,
+    "min_firmware": 5,
+    "max_scanned_time_delta_sec": 3600,
+}
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> t.Generator[FleetServer, None, None]:
+    (tmp_path / "log_1.csv").write_text(SAMPLE_LOG)
+
+    fleet_server = FleetServer(("127.0.0.1", 0), FleetState(tmp_path), DEFAULT_THRESHOLDS)
+    thread = threading.Thread(
+        target=fleet_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield fleet_server
+
+    fleet_server.shutdown()
+    fleet_server.server_close()
+    thread.join()
+
+
+def _get(server: FleetServer, path: str) -> tuple[int, t.Any]:
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    try:
+        with urllib.request.urlopen(url) as response:  # noqa: S310
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_health(server: FleetServer) -> None:
+    status, body = _get(server, "/health")
+    assert status == 200
+    assert (body["n_devices"], body["n_drops"]) == (2, 3)
+
+
+def test_audit(server: FleetServer) -> None:
+    _, body = _get(server, "/audit")
+    assert body["n_errors"] == 2
+    assert {err["type"] for err in body["errors"]} == {"AltitudeLossError", "OutdatedFirmwareError"}
+
+    _, body = _get(server, "/audit?min_alt_loss_ft=50&min_firmware=4")
+    assert body["n_errors"] == 0
+
+
+def test_device_queries(server: FleetServer) -> None:
+    status, body = _get(server, "/devices/A1")
+    assert status == 200
+    assert [drop["flight_index"] for drop in body["drops"]] == [1, 2]
+
+    status, _ = _get(server, "/devices/B1")
+    assert status == 404
+
+    _, body = _get(server, "/devices?below_firmware=5")
+    assert [device["uid"] for device in body["devices"]] == ["A2"]
+
+    _, body = _get(server, "/devices?scanned_before=2023-04-21")
+    assert [device["uid"] for device in body["devices"]] == ["A1"]
+
+
+def test_drops_in_window(server: FleetServer) -> None:
+    _, body = _get(server, "/drops?start=2023-04-20T12:00:00&end=2023-04-22")
+    assert [(drop["uid"], drop["flight_index"]) for drop in body["drops"]] == [("A1", 2), ("A2", 1)]
+
+
+BAD_REQUESTS = (
+    "/devices?below_firmware=abc",
+    "/devices",
+    "/drops?start=2023-04-20",
+    "/audit?min_alt_loss_ft=abc",
+    "/audit?max_drift_rate_sec_per_day=abc",
+)
+
+
+@pytest.mark.parametrize("path", BAD_REQUESTS)
+def test_bad_requests(server: FleetServer, path: str) -> None:
+    status, body = _get(server, path)
+    assert status == 400
+    assert "error" in body
+
+
+def test_unknown_endpoint(server: FleetServer) -> None:
+    status, _ = _get(server, "/nope")
+    assert status == 404
+
+
+def test_reload_if_changed(tmp_path: Path) -> None:
+    log_filepath = tmp_path / "log_1.csv"
+    log_filepath.write_text(SAMPLE_LOG)
+    state = FleetState(tmp_path)
+    assert state.reload_if_changed() is False
+    state.audit(**DEFAULT_THRESHOLDS)
+
+    (tmp_path / "log_2.csv").write_text(SAMPLE_LOG.replace("A2", "A3"))
+    assert state.reload_if_changed() is True
+    assert "A3" in state.fleet
+
+    log_filepath.write_text(SAMPLE_LOG.replace("A1", "A4"))
+    stat = log_filepath.stat()
+    os.utime(log_filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert state.reload_if_changed() is True
+    assert sorted(dropmate.uid for dropmate in state.fleet) == ["A1", "A2", "A3", "A4"]
+
+
+def test_duplicate_logs_skipped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "log_1.csv").write_text(SAMPLE_LOG)
+    (tmp_path / "log_1_copy.csv").write_text(SAMPLE_LOG)
+
+    parsed = []
+
+    def log_parse_pipeline(source: LogSource) -> list[Dropmate]:
+        parsed.append(source.path.name)
+        return parser.log_parse_pipeline(source)
+
+    monkeypatch.setattr(server_module, "log_parse_pipeline", log_parse_pipeline)
+
+    state = FleetState(tmp_path)
+    assert parsed == ["log_1.csv"]
+    assert len(state.fleet) == 2
+
+    parsed.clear()
+    FleetState(tmp_path, skip_duplicates=False)
+    assert sorted(parsed) == ["log_1.csv", "log_1_copy.csv"]
+
+
+def test_vanished_log_skipped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "log_1.csv").write_text(SAMPLE_LOG)
+    state = FleetState(tmp_path)
+
+    # Simulate a log deleted between being located & its snapshot being taken
+    def iter_log_sources(log_dir: Path, log_pattern: str) -> t.Iterator[LogSource]:
+        yield LogSource(tmp_path / "log_1.csv")
+        yield LogSource(tmp_path / "log_0.csv")
+
+    monkeypatch.setattr(server_module, "iter_log_sources", iter_log_sources)
+    assert state.reload_if_changed() is False
+
+
+def _wait_for(condition: t.Callable[[], bool], timeout_sec: float = 5) -> None:
+    deadline = time.monotonic() + timeout_sec
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for condition"
+        time.sleep(0.02)
+
+
+def test_malformed_log_keeps_fleet(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    (tmp_path / "log_1.csv").write_text(SAMPLE_LOG)
+    fleet_server = FleetServer(
+        ("127.0.0.1", 0), FleetState(tmp_path), DEFAULT_THRESHOLDS, poll_interval_sec=0.05
+    )
+    thread = threading.Thread(target=fleet_server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        # A log caught mid-write fails to parse, but the previous fleet is still served
+        log_filepath = tmp_path / "log_2.csv"
+        log_filepath.write_text(SAMPLE_LOG.replace("A2", "A3")[:-120])
+        stderr = ""
+
+        def reload_failed() -> bool:
+            nonlocal stderr
+            stderr += capsys.readouterr().err
+            return "Failed to reload logs" in stderr
+
+        _wait_for(reload_failed)
+        status, body = _get(fleet_server, "/health")
+        assert status == 200
+        assert body["n_devices"] == 2
+
+        # Polling continues, picking up the log once it's complete
+        log_filepath.write_text(SAMPLE_LOG.replace("A2", "A3"))
+        _wait_for(lambda: _get(fleet_server, "/health")[1]["n_devices"] == 3)
+    finally:
+        fleet_server.shutdown()
+        fleet_server.server_close()
+        thread.join()
@@ -0,0 +1,118 @@
+import datetime as dt
+import typing as t
+from functools import partial
+
+import pytest
+
+from dropmate_py import audit_errors, parser
+from dropmate_py.audits import audit_pipeline
+from dropmate_py.sweep import AuditQuantities, SweepPoint, sweep_thresholds
+
+DATE_P = partial(dt.datetime, year=2023, month=4, day=20, second=0, tzinfo=dt.timezone.utc)
+
+DROP_RECORD_P = partial(
+    parser.DropRecord,
+    serial_number="cereal",
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    firmware_version=5.1,
+    start_barometric_altitude_msl_ft=1000,
+    dropmate_internal_time_utc=DATE_P(hour=12, minute=30),
+    last_scanned_time_utc=DATE_P(hour=12, minute=30),
+)
+
+DROPMATE_P = partial(
+    parser.Dropmate,
+    battery=parser.Health.GOOD,
+    device_health=parser.Health.GOOD,
+    last_scanned_time_utc=DATE_P(hour=12, minute=30),
+)
+
+
+def _drop(uid: str, flight_index: int, start_minute: int, end_alt: int) -> parser.DropRecord:
+    return DROP_RECORD_P(
+        uid=uid,
+        flight_index=flight_index,
+        start_time_utc=DATE_P(hour=10, minute=start_minute),
+        end_time_utc=DATE_P(hour=10, minute=start_minute + 2),
+        end_barometric_altitude_msl_ft=end_alt,
+    )
+
+
+@pytest.fixture
+def fleet() -> list[parser.Dropmate]:
+    return [
+        DROPMATE_P(
+            uid="A1",
+            firmware_version=5.1,
+            dropmate_internal_time_utc=DATE_P(hour=12, minute=40),
+            drops=[_drop("A1", 1, 0, 900), _drop("A1", 2, 5, 500), _drop("A1", 3, 30, 0)],
+        ),
+        DROPMATE_P(
+            uid="A2",
+            firmware_version=4.0,
+            dropmate_internal_time_utc=DATE_P(hour=14, minute=30),
+            drops=[_drop("A2", 1, 0, 850)],
+        ),
+        DROPMATE_P(
+            uid="A3",
+            firmware_version=5.0,
+            dropmate_internal_time_utc=DATE_P(hour=12, minute=30),
+            drops=[],
+        ),
+    ]
+
+
+def test_audit_quantities(fleet: list[parser.Dropmate]) -> None:
+    quantities = AuditQuantities.from_dropmates(fleet)
+    assert quantities.altitude_losses_ft == [100, 150, 500, 1000]
+    assert quantities.device_min_altitude_losses_ft == [100, 150]
+    assert quantities.start_deltas_sec == [180, 1380]
+    assert quantities.device_min_start_deltas_sec == [180]
+    assert quantities.clock_deltas_sec == [0, 600, 7200]
+    assert quantities.firmware_versions == [4.0, 5.0, 5.1]
+
+
+def test_sweep_thresholds(fleet: list[parser.Dropmate]) -> None:
+    results = sweep_thresholds(fleet, min_alt_loss_ft=[500, 100], max_scanned_time_delta_sec=[600])
+    assert [result.parameter for result in results] == [
+        "min_alt_loss_ft",
+        "max_scanned_time_delta_sec",
+    ]
+    assert results[0].points == [
+        SweepPoint(threshold=100, n_devices=0, n_drops=0),
+        SweepPoint(threshold=500, n_devices=2, n_drops=2),
+    ]
+    assert results[1].points == [SweepPoint(threshold=600, n_devices=1)]
+
+
+AUDIT_P = partial(
+    audit_pipeline,
+    min_alt_loss_ft=0,
+    min_delta_to_next_sec=0,
+    min_firmware=0,
+    max_scanned_time_delta_sec=10_000,
+)
+
+# Grids straddle each of the fixture's audited quantities
+SWEEP_GRIDS = (
+    ("min_alt_loss_ft", audit_errors.AltitudeLossError, (0, 100, 101, 150, 151, 500, 1001)),
+    ("min_delta_to_next_sec", audit_errors.TimeDeltaError, (0, 180, 181, 1380, 1381)),
+    ("min_firmware", audit_errors.OutdatedFirmwareError, (4.0, 5.0, 5.05, 5.1, 6)),
+    ("max_scanned_time_delta_sec", audit_errors.InternalClockDeltaError, (0, 599, 600, 7200)),
+)
+
+
+@pytest.mark.parametrize(("parameter", "err_type", "grid"), SWEEP_GRIDS)
+def test_sweep_matches_audit(
+    fleet: list[parser.Dropmate], parameter: str, err_type: type, grid: t.Any
+) -> None:
+    (result,) = sweep_thresholds(fleet, **{parameter: grid})
+
+    for point in result.points:
+        threshold: t.Any = point.threshold
+        errs = AUDIT_P(fleet, **{parameter: threshold})
+        flagged: list[t.Any] = [err for err in errs if isinstance(err, err_type)]
+        assert point.n_devices == len({err.device.uid for err in flagged})
+        if point.n_drops is not None:
+            assert point.n_drops == len(flagged)